@@ -0,0 +1,15 @@
+-- CreateTable
+CREATE TABLE "media_blobs" (
+    "hash" TEXT NOT NULL,
+    "storagePath" TEXT NOT NULL,
+    "size" INTEGER NOT NULL,
+    "mimeType" TEXT,
+    "refCount" INTEGER NOT NULL DEFAULT 0,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "media_blobs_pkey" PRIMARY KEY ("hash")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "media_blobs_storagePath_key" ON "media_blobs"("storagePath");
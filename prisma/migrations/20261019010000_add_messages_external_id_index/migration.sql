@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "messages_externalId_idx" ON "messages"("externalId");
@@ -0,0 +1,8 @@
+-- CreateIndex
+CREATE INDEX "messages_createdAt_idx" ON "messages"("createdAt");
+
+-- CreateIndex
+CREATE INDEX "finished_conversations_endTime_idx" ON "finished_conversations"("endTime");
+
+-- CreateIndex
+CREATE INDEX "finished_conversations_operatorId_endTime_idx" ON "finished_conversations"("operatorId", "endTime");
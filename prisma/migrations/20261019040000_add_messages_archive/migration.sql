@@ -0,0 +1,40 @@
+-- AlterTable
+ALTER TABLE "conversations" ADD COLUMN "archivedAt" TIMESTAMP(3);
+
+-- CreateTable
+CREATE TABLE "messages_archive" (
+    "id" TEXT NOT NULL,
+    "conversationId" TEXT NOT NULL,
+    "senderId" TEXT,
+    "content" TEXT NOT NULL,
+    "mediaType" TEXT,
+    "mediaUrl" TEXT,
+    "mediaMimeType" TEXT,
+    "mediaFileName" TEXT,
+    "mediaCaption" TEXT,
+    "mediaSize" INTEGER,
+    "mediaStoragePath" TEXT,
+    "direction" "MessageDirection" NOT NULL,
+    "via" "MessageVia" NOT NULL,
+    "externalId" TEXT,
+    "status" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL,
+    "archivedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "messages_archive_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "messages_archive_conversationId_createdAt_idx" ON "messages_archive"("conversationId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "messages_archive_createdAt_idx" ON "messages_archive"("createdAt");
+
+-- CreateIndex
+CREATE INDEX "finished_conversations_originalChatId_idx" ON "finished_conversations"("originalChatId");
+
+-- AddForeignKey
+ALTER TABLE "messages_archive" ADD CONSTRAINT "messages_archive_conversationId_fkey" FOREIGN KEY ("conversationId") REFERENCES "conversations"("id") ON DELETE RESTRICT ON UPDATE CASCADE;
+
+-- AddForeignKey
+ALTER TABLE "messages_archive" ADD CONSTRAINT "messages_archive_senderId_fkey" FOREIGN KEY ("senderId") REFERENCES "users"("id") ON DELETE SET NULL ON UPDATE CASCADE;
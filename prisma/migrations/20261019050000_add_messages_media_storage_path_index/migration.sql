@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "messages_mediaStoragePath_idx" ON "messages"("mediaStoragePath");
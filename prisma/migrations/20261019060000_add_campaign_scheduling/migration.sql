@@ -0,0 +1,8 @@
+-- AlterEnum
+ALTER TYPE "CampaignStatus" ADD VALUE 'SCHEDULED';
+
+-- AlterTable
+ALTER TABLE "campaigns" ADD COLUMN "launchAt" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "campaigns_status_scheduledAt_idx" ON "campaigns"("status", "scheduledAt");
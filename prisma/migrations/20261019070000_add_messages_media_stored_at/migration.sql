@@ -0,0 +1,8 @@
+-- AlterTable
+ALTER TABLE "messages" ADD COLUMN "mediaStoredAt" TIMESTAMP(3);
+
+-- Mídias já gravadas passam a expirar a partir da criação da mensagem
+UPDATE "messages" SET "mediaStoredAt" = "createdAt" WHERE "mediaStoragePath" IS NOT NULL;
+
+-- CreateIndex
+CREATE INDEX "messages_mediaStoredAt_id_idx" ON "messages"("mediaStoredAt", "id");
@@ -1,19 +1,32 @@
-import { Module, MiddlewareConsumer, NestModule } from '@nestjs/common';
+import {
+  DynamicModule,
+  MiddlewareConsumer,
+  Module,
+  NestModule,
+} from '@nestjs/common';
 import { ServeStaticModule } from '@nestjs/serve-static';
 import { APP_GUARD } from '@nestjs/core';
 import { ConfigModule, ConfigService } from '@nestjs/config';
 import { ThrottlerGuard, ThrottlerModule } from '@nestjs/throttler';
+import type { ServerResponse } from 'http';
 import * as path from 'path';
 
 import { AppController } from './app.controller';
 import { AppService } from './app.service';
 import configuration from './config/configuration';
 import { validationSchema } from './config/validation';
+import { AppRole, runsApi, runsScheduler, runsWorker } from './config/app-role';
 import { PrismaModule } from './prisma/prisma.module';
 import { AuthModule } from './auth/auth.module';
 import { UsersModule } from './users/users.module';
 import { ContactsModule } from './contacts/contacts.module';
 import { StorageModule } from './storage/storage.module';
+import { MediaRetentionModule } from './storage/media-retention.module';
+import { ProviderHttpModule } from './provider-http/provider-http.module';
+import { RedisModule } from './redis/redis.module';
+import { CacheModule } from './cache/cache.module';
+import { AssignmentModule } from './assignment/assignment.module';
+import { MetricsModule } from './metrics/metrics.module';
 import { ServiceInstancesModule } from './service-instances/service-instances.module';
 import { TemplatesModule } from './templates/templates.module';
 import { TabulationsModule } from './tabulations/tabulations.module';
@@ -22,78 +35,128 @@ import { MessagesModule } from './messages/messages.module';
 import { WebsocketsModule } from './websockets/websockets.module';
 import { WebhooksModule } from './webhooks/webhooks.module';
 import { CampaignsModule } from './campaigns/campaigns.module';
+import { CampaignsWorkerModule } from './campaigns/campaigns-worker.module';
 import { ReportsModule } from './reports/reports.module';
 import { DashboardModule } from './dashboard/dashboard.module';
+import { DashboardEventsModule } from './dashboard/dashboard-events.module';
 import { LoggerModule } from './logger/logger.module';
 import { SchedulerModule } from './scheduler/scheduler.module';
 import { HttpLoggerMiddleware } from './logger/http-logger.middleware';
+import { ServerTimingMiddleware } from './common/middleware/server-timing.middleware';
 import { JwtAccessGuard } from './common/guards/jwt-access.guard';
 import { RolesGuard } from './common/guards/roles.guard';
 
-@Module({
-  imports: [
-    ServeStaticModule.forRootAsync({
-      imports: [ConfigModule],
-      inject: [ConfigService],
-      useFactory: (configService: ConfigService) => [
-        {
-          rootPath: path.resolve(
-            process.cwd(),
-            configService.get<string>('storage.basePath') ?? './storage',
-          ),
-          serveRoot: '/media',
+// Criado no carregamento do módulo para que o .env já esteja em process.env
+// quando o main.ts resolver o APP_ROLE
+const configModule = ConfigModule.forRoot({
+  isGlobal: true,
+  load: [configuration],
+  validationSchema,
+});
+
+const staticMediaModule = ServeStaticModule.forRootAsync({
+  imports: [ConfigModule],
+  inject: [ConfigService],
+  useFactory: (configService: ConfigService) => {
+    const rootPath = path.resolve(
+      process.cwd(),
+      configService.get<string>('storage.basePath') ?? './storage',
+    );
+    return [
+      {
+        rootPath,
+        serveRoot: '/media',
+        serveStaticOptions: {
+          // Arquivos em media/ são endereçados por hash e nunca mudam
+          setHeaders: (res: ServerResponse, filePath: string) => {
+            if (path.relative(rootPath, filePath).startsWith(`media${path.sep}`)) {
+              res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+            }
+          },
         },
-      ],
-    }),
-    ConfigModule.forRoot({
-      isGlobal: true,
-      load: [configuration],
-      validationSchema,
-    }),
-    ThrottlerModule.forRootAsync({
-      inject: [ConfigService],
-      useFactory: (configService: ConfigService) => [{
-        ttl: configService.get<number>('throttler.ttl') ?? 60000,
-        limit: configService.get<number>('throttler.limit') ?? 30,
-      }],
-    }),
-    PrismaModule,
-    StorageModule,
-    LoggerModule,
-    AuthModule,
-    UsersModule,
-    ContactsModule,
-    ServiceInstancesModule,
-    TemplatesModule,
-    TabulationsModule,
-    ConversationsModule,
-    MessagesModule,
-    WebsocketsModule,
-    WebhooksModule,
-    CampaignsModule,
-    ReportsModule,
-    DashboardModule,
-    SchedulerModule,
-  ],
-  controllers: [AppController],
-  providers: [
-    AppService,
-    {
-      provide: APP_GUARD,
-      useClass: ThrottlerGuard,
-    },
-    {
-      provide: APP_GUARD,
-      useClass: JwtAccessGuard,
-    },
-    {
-      provide: APP_GUARD,
-      useClass: RolesGuard,
-    },
-  ],
-})
+      },
+    ];
+  },
+});
+
+// Infraestrutura usada por todos os papéis (health e /metrics incluídos)
+const coreImports = [
+  configModule,
+  PrismaModule,
+  StorageModule,
+  ProviderHttpModule,
+  RedisModule,
+  CacheModule,
+  DashboardEventsModule,
+  AssignmentModule,
+  MetricsModule,
+  LoggerModule,
+];
+
+const apiImports = [
+  staticMediaModule,
+  ThrottlerModule.forRootAsync({
+    inject: [ConfigService],
+    useFactory: (configService: ConfigService) => [{
+      ttl: configService.get<number>('throttler.ttl') ?? 60000,
+      limit: configService.get<number>('throttler.limit') ?? 30,
+    }],
+  }),
+  AuthModule,
+  UsersModule,
+  ContactsModule,
+  ServiceInstancesModule,
+  TemplatesModule,
+  TabulationsModule,
+  ConversationsModule,
+  MessagesModule,
+  WebsocketsModule,
+  WebhooksModule,
+  CampaignsModule,
+  ReportsModule,
+  DashboardModule,
+  MediaRetentionModule,
+];
+
+const apiGuards = [
+  {
+    provide: APP_GUARD,
+    useClass: ThrottlerGuard,
+  },
+  {
+    provide: APP_GUARD,
+    useClass: JwtAccessGuard,
+  },
+  {
+    provide: APP_GUARD,
+    useClass: RolesGuard,
+  },
+];
+
+@Module({})
 export class AppModule implements NestModule {
+  /**
+   * Monta a aplicação para o papel do processo (`APP_ROLE`): a API, o worker
+   * de campanhas e o scheduler podem rodar juntos (`all`) ou em processos
+   * separados, escalados de forma independente.
+   */
+  static forRoot(role: AppRole): DynamicModule {
+    return {
+      module: AppModule,
+      imports: [
+        ...coreImports,
+        ...(runsApi(role) ? apiImports : []),
+        ...(runsWorker(role) ? [CampaignsWorkerModule] : []),
+        ...(runsScheduler(role) ? [SchedulerModule] : []),
+      ],
+      controllers: [AppController],
+      providers: [AppService, ...(runsApi(role) ? apiGuards : [])],
+    };
+  }
+
   configure(consumer: MiddlewareConsumer) {
-    consumer.apply(HttpLoggerMiddleware).forRoutes('*');
+    consumer
+      .apply(ServerTimingMiddleware, HttpLoggerMiddleware)
+      .forRoutes('*');
   }
 }
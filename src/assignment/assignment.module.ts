@@ -0,0 +1,12 @@
+import { Global, Module } from '@nestjs/common';
+import { ConfigModule } from '@nestjs/config';
+
+import { OperatorAssignmentService } from './operator-assignment.service';
+
+@Global()
+@Module({
+  imports: [ConfigModule],
+  providers: [OperatorAssignmentService],
+  exports: [OperatorAssignmentService],
+})
+export class AssignmentModule {}
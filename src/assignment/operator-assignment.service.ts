@@ -0,0 +1,397 @@
+import {
+  Injectable,
+  Logger,
+  OnApplicationBootstrap,
+  OnModuleDestroy,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { ChatStatus, Prisma, User } from '@prisma/client';
+import { randomUUID } from 'crypto';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { RedisService } from '../redis/redis.service';
+
+const ASSIGNABLE_ROLES = ['OPERATOR', 'SUPERVISOR'];
+
+// Cada réplica renova o registro das suas conexões; o de uma réplica que caiu expira
+const SOCKET_HEARTBEAT_MS = 30000;
+const SOCKET_REPLICA_TTL_MS = 3 * SOCKET_HEARTBEAT_MS;
+
+/*
+ * KEYS: 1 fila (ZSET operador -> última atribuição), 2 carga (HASH), 3 capacidade (HASH),
+ *       4 online (SET), 5 sockets (HASH, total), 6 última atribuição (HASH),
+ *       7 sockets desta réplica (HASH com TTL)
+ * ARGV[1]: capacidade padrão
+ *
+ * Um operador fica na fila enquanto estiver online, com socket conectado (ou sem
+ * contagem registrada) e abaixo da capacidade. A posição é a data da última
+ * atribuição, então quem está há mais tempo sem receber conversa sai primeiro.
+ */
+const REFRESH_LUA = `
+local function refresh(op)
+  local online = redis.call('SISMEMBER', KEYS[4], op) == 1
+  local sockets = redis.call('HGET', KEYS[5], op)
+  local load = tonumber(redis.call('HGET', KEYS[2], op) or '0')
+  local capacity = tonumber(redis.call('HGET', KEYS[3], op) or ARGV[1])
+  if online and (not sockets or tonumber(sockets) > 0) and load < capacity then
+    local score = redis.call('HGET', KEYS[6], op) or '0'
+    redis.call('ZADD', KEYS[1], 'NX', score, op)
+  else
+    redis.call('ZREM', KEYS[1], op)
+  end
+end
+`;
+
+// ARGV[2]: timestamp atual
+const CLAIM_LUA = `${REFRESH_LUA}
+local head = redis.call('ZRANGE', KEYS[1], 0, 0)
+if #head == 0 then
+  return false
+end
+local op = head[1]
+redis.call('HINCRBY', KEYS[2], op, 1)
+redis.call('HSET', KEYS[6], op, ARGV[2])
+redis.call('ZREM', KEYS[1], op)
+refresh(op)
+return op
+`;
+
+// ARGV[2]: operador, ARGV[3]: timestamp atual
+const ACQUIRE_LUA = `${REFRESH_LUA}
+redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+redis.call('HSET', KEYS[6], ARGV[2], ARGV[3])
+redis.call('ZREM', KEYS[1], ARGV[2])
+refresh(ARGV[2])
+return 1
+`;
+
+// ARGV[2]: operador
+const RELEASE_LUA = `${REFRESH_LUA}
+if redis.call('HINCRBY', KEYS[2], ARGV[2], -1) < 0 then
+  redis.call('HSET', KEYS[2], ARGV[2], 0)
+end
+refresh(ARGV[2])
+return 1
+`;
+
+// ARGV[2]: operador, ARGV[3]: capacidade, ARGV[4]: '1' online / '0' offline
+const ONLINE_LUA = `${REFRESH_LUA}
+if ARGV[4] == '1' then
+  redis.call('SADD', KEYS[4], ARGV[2])
+  redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+else
+  redis.call('SREM', KEYS[4], ARGV[2])
+end
+refresh(ARGV[2])
+return 1
+`;
+
+// ARGV[2]: operador, ARGV[3]: +1 conexão / -1 desconexão, ARGV[4]: TTL da réplica (ms)
+const SOCKET_LUA = `${REFRESH_LUA}
+if redis.call('HINCRBY', KEYS[5], ARGV[2], tonumber(ARGV[3])) < 0 then
+  redis.call('HSET', KEYS[5], ARGV[2], 0)
+end
+if redis.call('HINCRBY', KEYS[7], ARGV[2], tonumber(ARGV[3])) <= 0 then
+  redis.call('HDEL', KEYS[7], ARGV[2])
+end
+redis.call('PEXPIRE', KEYS[7], ARGV[4])
+refresh(ARGV[2])
+return 1
+`;
+
+/*
+ * KEYS: 1 sockets (HASH, total), 2.. sockets de cada réplica viva
+ *
+ * Recalcula o total a partir das réplicas vivas. Operadores conhecidos ficam
+ * com 0 (e não sem contagem), para que quem fechou todas as abas continue fora
+ * da fila.
+ */
+const SOCKETS_SUM_LUA = `
+local known = redis.call('HKEYS', KEYS[1])
+for i = 1, #known do
+  redis.call('HSET', KEYS[1], known[i], 0)
+end
+for i = 2, #KEYS do
+  local entries = redis.call('HGETALL', KEYS[i])
+  for j = 1, #entries, 2 do
+    redis.call('HINCRBY', KEYS[1], entries[j], tonumber(entries[j + 1]))
+  end
+end
+return 1
+`;
+
+/**
+ * Distribuição de conversas entre operadores online.
+ *
+ * A fila de operadores disponíveis fica no Redis e a escolha é um único pop
+ * atômico (script Lua), então webhooks concorrentes nunca entregam a mesma vaga
+ * para dois chats. A fila é alimentada pelo toggle-online, pelas conexões do
+ * ChatGateway e pela abertura/fechamento de conversas, respeitando a capacidade
+ * de cada operador (`maxOpenConversations`). Se o Redis estiver indisponível,
+ * a escolha cai para a consulta no banco.
+ *
+ * As conexões são contadas no total e também por réplica (hash com TTL,
+ * renovado a cada `SOCKET_HEARTBEAT_MS`). A reconstrução periódica refaz o total
+ * somando só as réplicas vivas, descartando as conexões de réplicas que caíram
+ * sem desconectar.
+ */
+@Injectable()
+export class OperatorAssignmentService
+  implements OnApplicationBootstrap, OnModuleDestroy
+{
+  private readonly logger = new Logger(OperatorAssignmentService.name);
+  private readonly defaultCapacity: number;
+  private readonly reconcileIntervalMs: number;
+  private readonly keys: string[];
+  private readonly replicaId = randomUUID();
+  private readonly replicasKey: string;
+  private reconcileTimer: NodeJS.Timeout | null = null;
+  private heartbeatTimer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly redis: RedisService,
+    private readonly configService: ConfigService,
+  ) {
+    this.defaultCapacity =
+      this.configService.get<number>('assignment.defaultCapacity') ?? 20;
+    this.reconcileIntervalMs =
+      this.configService.get<number>('assignment.reconcileIntervalMs') ?? 300000;
+    this.replicasKey = this.redis.key('assignment', 'socket-replicas');
+    this.keys = [
+      ...['queue', 'load', 'capacity', 'online', 'sockets', 'last-assigned'].map((name) =>
+        this.redis.key('assignment', name),
+      ),
+      this.replicaSocketsKey(this.replicaId),
+    ];
+  }
+
+  onApplicationBootstrap() {
+    // Registra a réplica antes da primeira reconstrução somar as conexões
+    void this.heartbeat().then(() => this.rebuild());
+    this.heartbeatTimer = setInterval(() => void this.heartbeat(), SOCKET_HEARTBEAT_MS);
+    this.reconcileTimer = setInterval(() => void this.rebuild(), this.reconcileIntervalMs);
+  }
+
+  async onModuleDestroy() {
+    if (this.reconcileTimer) {
+      clearInterval(this.reconcileTimer);
+      this.reconcileTimer = null;
+    }
+    if (this.heartbeatTimer) {
+      clearInterval(this.heartbeatTimer);
+      this.heartbeatTimer = null;
+    }
+
+    // As conexões desta réplica saem da soma na próxima reconstrução
+    await this.redis
+      .multi()
+      .zrem(this.replicasKey, this.replicaId)
+      .del(this.replicaSocketsKey(this.replicaId))
+      .exec()
+      .catch(() => undefined);
+  }
+
+  /**
+   * Escolhe o próximo operador disponível e já contabiliza a nova conversa.
+   */
+  async claimOperator(): Promise<string | null> {
+    try {
+      const operatorId = await this.run(CLAIM_LUA, String(Date.now()));
+      return (operatorId as string | null) ?? null;
+    } catch (error: any) {
+      this.logger.warn(`Fila de operadores indisponível, usando banco: ${error.message}`);
+      return this.findAvailableOperatorInDatabase();
+    }
+  }
+
+  /**
+   * Contabiliza uma conversa atribuída diretamente a um operador (manual ou fila).
+   */
+  async recordAssignment(operatorId: string): Promise<void> {
+    await this.safeRun('registrar atribuição', ACQUIRE_LUA, operatorId, String(Date.now()));
+  }
+
+  async releaseAssignment(operatorId: string | null | undefined): Promise<void> {
+    if (!operatorId) {
+      return;
+    }
+    await this.safeRun('liberar atribuição', RELEASE_LUA, operatorId);
+  }
+
+  async setOnline(
+    user: Pick<User, 'id' | 'role' | 'isActive' | 'maxOpenConversations'>,
+    isOnline: boolean,
+  ): Promise<void> {
+    const eligible = isOnline && user.isActive && ASSIGNABLE_ROLES.includes(user.role);
+    await this.safeRun(
+      'atualizar disponibilidade',
+      ONLINE_LUA,
+      user.id,
+      String(user.maxOpenConversations ?? this.defaultCapacity),
+      eligible ? '1' : '0',
+    );
+  }
+
+  async socketConnected(userId: string): Promise<void> {
+    await this.safeRun(
+      'registrar conexão',
+      SOCKET_LUA,
+      userId,
+      '1',
+      String(SOCKET_REPLICA_TTL_MS),
+    );
+  }
+
+  async socketDisconnected(userId: string): Promise<void> {
+    await this.safeRun(
+      'registrar desconexão',
+      SOCKET_LUA,
+      userId,
+      '-1',
+      String(SOCKET_REPLICA_TTL_MS),
+    );
+  }
+
+  /**
+   * Reconstrói fila, cargas e capacidades a partir do banco e refaz o total de
+   * sockets com as réplicas vivas. Roda no boot e periodicamente para corrigir
+   * desvios; só um processo executa por vez.
+   */
+  async rebuild(): Promise<void> {
+    const lockKey = this.redis.key('assignment', 'rebuild-lock');
+
+    try {
+      const acquired = await this.redis.set(
+        lockKey,
+        '1',
+        'PX',
+        Math.max(1000, this.reconcileIntervalMs - 1000),
+        'NX',
+      );
+      if (!acquired) {
+        return;
+      }
+
+      const [operators, loads] = await Promise.all([
+        this.prisma.user.findMany({
+          where: {
+            isOnline: true,
+            isActive: true,
+            role: { in: ['OPERATOR', 'SUPERVISOR'] },
+          },
+          select: {
+            id: true,
+            maxOpenConversations: true,
+            lastConversationAssignedAt: true,
+          },
+        }),
+        this.prisma.conversation.groupBy({
+          by: ['operatorId'],
+          where: { status: ChatStatus.OPEN, operatorId: { not: null } },
+          _count: { _all: true },
+        }),
+      ]);
+
+      // Réplicas sem heartbeat recente caíram: suas conexões saem do total
+      await this.redis.zremrangebyscore(
+        this.replicasKey,
+        '-inf',
+        Date.now() - SOCKET_REPLICA_TTL_MS,
+      );
+      const replicas = await this.redis.zrange(this.replicasKey, 0, -1);
+
+      const [queueKey, loadKey, capacityKey, onlineKey, socketsKey, lastKey] = this.keys;
+      const transaction = this.redis
+        .multi()
+        .del(queueKey, loadKey, capacityKey, onlineKey)
+        .eval(
+          SOCKETS_SUM_LUA,
+          1 + replicas.length,
+          socketsKey,
+          ...replicas.map((replicaId) => this.replicaSocketsKey(replicaId)),
+        );
+
+      for (const load of loads) {
+        if (load.operatorId) {
+          transaction.hset(loadKey, load.operatorId, load._count._all);
+        }
+      }
+
+      for (const operator of operators) {
+        transaction.hset(
+          lastKey,
+          operator.id,
+          operator.lastConversationAssignedAt?.getTime() ?? 0,
+        );
+        transaction.eval(
+          ONLINE_LUA,
+          this.keys.length,
+          ...this.keys,
+          String(this.defaultCapacity),
+          operator.id,
+          String(operator.maxOpenConversations ?? this.defaultCapacity),
+          '1',
+        );
+      }
+
+      await transaction.exec();
+      this.logger.debug(`Fila de operadores reconstruída: ${operators.length} online`);
+    } catch (error: any) {
+      this.logger.error(`Erro ao reconstruir fila de operadores: ${error.message}`);
+    }
+  }
+
+  private async heartbeat(): Promise<void> {
+    try {
+      await this.redis
+        .multi()
+        .zadd(this.replicasKey, Date.now(), this.replicaId)
+        .pexpire(this.replicaSocketsKey(this.replicaId), SOCKET_REPLICA_TTL_MS)
+        .exec();
+    } catch (error: any) {
+      this.logger.warn(`Falha ao renovar registro de conexões da réplica: ${error.message}`);
+    }
+  }
+
+  private replicaSocketsKey(replicaId: string): string {
+    return this.redis.key('assignment', 'sockets', replicaId);
+  }
+
+  private run(script: string, ...args: string[]) {
+    return this.redis.eval(
+      script,
+      this.keys.length,
+      ...this.keys,
+      String(this.defaultCapacity),
+      ...args,
+    );
+  }
+
+  private async safeRun(action: string, script: string, ...args: string[]) {
+    try {
+      await this.run(script, ...args);
+    } catch (error: any) {
+      this.logger.warn(`Falha ao ${action} na fila de operadores: ${error.message}`);
+    }
+  }
+
+  private async findAvailableOperatorInDatabase(): Promise<string | null> {
+    // Operador online abaixo da capacidade, há mais tempo sem receber conversa (null primeiro)
+    const [operator] = await this.prisma.$queryRaw<{ id: string }[]>`
+      SELECT u."id"
+      FROM "users" u
+      WHERE u."isOnline" = true
+        AND u."isActive" = true
+        AND u."role"::text IN (${Prisma.join(ASSIGNABLE_ROLES)})
+        AND (
+          SELECT COUNT(*) FROM "conversations" c
+          WHERE c."operatorId" = u."id" AND c."status" = 'OPEN'
+        ) < COALESCE(u."maxOpenConversations", ${this.defaultCapacity})
+      ORDER BY u."lastConversationAssignedAt" ASC NULLS FIRST
+      LIMIT 1
+    `;
+
+    return operator?.id ?? null;
+  }
+}
@@ -1,4 +1,4 @@
-import { Injectable, UnauthorizedException } from '@nestjs/common';
+import { Injectable, Logger, UnauthorizedException } from '@nestjs/common';
 import { JwtService } from '@nestjs/jwt';
 import { ConfigService } from '@nestjs/config';
 import { User } from '@prisma/client';
@@ -13,6 +13,8 @@ import { UsersService } from '../users/users.service';
 
 @Injectable()
 export class AuthService {
+  private readonly logger = new Logger(AuthService.name);
+
   constructor(
     private readonly prisma: PrismaService,
     private readonly jwtService: JwtService,
@@ -21,19 +23,17 @@ export class AuthService {
   ) {}
 
   async login(payload: LoginDto): Promise<AuthResponseDto> {
-    console.log(`[AuthService] Tentativa de login para: ${payload.email}`);
-    
     const user = await this.prisma.user.findUnique({
       where: { email: payload.email },
     });
 
     if (!user) {
-      console.warn(`[AuthService] Usuário não encontrado: ${payload.email}`);
+      this.logger.warn(`Usuário não encontrado: ${payload.email}`);
       throw new UnauthorizedException('Credenciais inválidas');
     }
 
     if (!user.isActive) {
-      console.warn(`[AuthService] Usuário inativo: ${payload.email}`);
+      this.logger.warn(`Usuário inativo: ${payload.email}`);
       throw new UnauthorizedException('Credenciais inválidas'); // Mensagem genérica por segurança, mas log específico
     }
 
@@ -43,11 +43,11 @@ export class AuthService {
     );
 
     if (!isPasswordValid) {
-      console.warn(`[AuthService] Senha incorreta para: ${payload.email}`);
+      this.logger.warn(`Senha incorreta para: ${payload.email}`);
       throw new UnauthorizedException('Credenciais inválidas');
     }
 
-    console.log(`[AuthService] Login bem-sucedido para: ${payload.email}`);
+    this.logger.log(`Login bem-sucedido para: ${payload.email}`);
 
     const tokens = await this.generateTokens(user);
 
@@ -1,4 +1,4 @@
-import { Injectable, UnauthorizedException } from '@nestjs/common';
+import { Injectable, Logger, UnauthorizedException } from '@nestjs/common';
 import { PassportStrategy } from '@nestjs/passport';
 import { JwtFromRequestFunction, Strategy } from 'passport-jwt';
 import { ConfigService } from '@nestjs/config';
@@ -12,6 +12,8 @@ export class JwtAccessStrategy extends PassportStrategy(
   Strategy,
   'jwt-access',
 ) {
+  private readonly logger = new Logger(JwtAccessStrategy.name);
+
   constructor(
     configService: ConfigService,
     private readonly prisma: PrismaService,
@@ -44,24 +46,20 @@ export class JwtAccessStrategy extends PassportStrategy(
   }
 
   async validate(payload: JwtPayload) {
-    console.log('[JWT] Validating payload:', { sub: payload.sub, email: payload.email });
-    
     const user = await this.prisma.user.findUnique({
       where: { id: payload.sub },
     });
 
     if (!user) {
-      console.log('[JWT] User not found:', payload.sub);
+      this.logger.warn(`Token de usuário inexistente: ${payload.sub}`);
       throw new UnauthorizedException('Usuário inexistente');
     }
 
     if (!user.isActive) {
-      console.log('[JWT] User inactive:', user.email);
+      this.logger.warn(`Token de usuário inativo: ${user.email}`);
       throw new UnauthorizedException('Usuário inativo');
     }
 
-    console.log('[JWT] User validated:', user.email);
-
     return {
       id: user.id,
       email: user.email,
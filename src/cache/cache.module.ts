@@ -0,0 +1,10 @@
+import { Global, Module } from '@nestjs/common';
+
+import { CatalogCacheService } from './catalog-cache.service';
+
+@Global()
+@Module({
+  providers: [CatalogCacheService],
+  exports: [CatalogCacheService],
+})
+export class CacheModule {}
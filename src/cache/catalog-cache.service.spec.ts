@@ -0,0 +1,148 @@
+import { EventEmitter } from 'events';
+import { ConfigService } from '@nestjs/config';
+
+import { RedisService } from '../redis/redis.service';
+import { CATALOG, CatalogCacheService } from './catalog-cache.service';
+
+type FakeSubscriber = EventEmitter & {
+  subscribe: (channel: string) => Promise<void>;
+  quit: () => Promise<void>;
+  disconnect: () => void;
+};
+
+// Pub/sub em memória compartilhado entre as "réplicas" do teste
+function createBus() {
+  const subscribers = new Set<FakeSubscriber>();
+
+  const redis = {
+    key: (...parts: string[]) => ['test', ...parts].join(':'),
+    publish: async (channel: string, message: string) => {
+      for (const subscriber of subscribers) {
+        subscriber.emit('message', channel, message);
+      }
+      return subscribers.size;
+    },
+    duplicate: () => {
+      const subscriber = new EventEmitter() as FakeSubscriber;
+      subscriber.subscribe = async () => {
+        subscribers.add(subscriber);
+      };
+      subscriber.quit = async () => {
+        subscribers.delete(subscriber);
+      };
+      subscriber.disconnect = () => subscribers.delete(subscriber);
+      return subscriber;
+    },
+  };
+
+  return { redis, subscribers };
+}
+
+function createService(redis: ReturnType<typeof createBus>['redis']) {
+  const config = { get: () => undefined };
+  const service = new CatalogCacheService(
+    redis as unknown as RedisService,
+    config as unknown as ConfigService,
+  );
+  service.onModuleInit();
+  return service;
+}
+
+function deferred<T>() {
+  let resolve!: (value: T) => void;
+  const promise = new Promise<T>((res) => {
+    resolve = res;
+  });
+  return { promise, resolve };
+}
+
+describe('CatalogCacheService', () => {
+  it('não deve gravar o resultado de uma carga iniciada antes da invalidação', async () => {
+    const { redis } = createBus();
+    const service = createService(redis);
+    const stale = deferred<string>();
+
+    const first = service.getOrLoad(CATALOG.templates, 'a', () => stale.promise);
+    await service.invalidate(CATALOG.templates);
+    stale.resolve('antigo');
+
+    await expect(first).resolves.toBe('antigo');
+
+    let loads = 0;
+    const value = await service.getOrLoad(CATALOG.templates, 'a', async () => {
+      loads++;
+      return 'novo';
+    });
+
+    expect(value).toBe('novo');
+    expect(loads).toBe(1);
+
+    await service.onModuleDestroy();
+  });
+
+  it('deve compartilhar a mesma carga entre leituras simultâneas', async () => {
+    const { redis } = createBus();
+    const service = createService(redis);
+    const pending = deferred<string>();
+    let loads = 0;
+    const loader = () => {
+      loads++;
+      return pending.promise;
+    };
+
+    const first = service.getOrLoad(CATALOG.tabulations, 'lista', loader);
+    const second = service.getOrLoad(CATALOG.tabulations, 'lista', loader);
+    pending.resolve('valor');
+
+    await expect(Promise.all([first, second])).resolves.toEqual(['valor', 'valor']);
+    await expect(service.getOrLoad(CATALOG.tabulations, 'lista', loader)).resolves.toBe(
+      'valor',
+    );
+    expect(loads).toBe(1);
+
+    await service.onModuleDestroy();
+  });
+
+  it('deve invalidar o cache das outras réplicas via pub/sub', async () => {
+    const { redis } = createBus();
+    const writer = createService(redis);
+    const reader = createService(redis);
+    const other = createService(redis);
+
+    let loads = 0;
+    const load = (value: string) => async () => {
+      loads++;
+      return value;
+    };
+
+    await reader.getOrLoad(CATALOG.serviceInstances, 'x', load('v1'));
+    await other.getOrLoad(CATALOG.templates, 'y', load('t1'));
+
+    await writer.invalidate(CATALOG.serviceInstances);
+
+    await expect(
+      reader.getOrLoad(CATALOG.serviceInstances, 'x', load('v2')),
+    ).resolves.toBe('v2');
+    // Outros namespaces não são afetados
+    await expect(other.getOrLoad(CATALOG.templates, 'y', load('t2'))).resolves.toBe('t1');
+    expect(loads).toBe(3);
+
+    await Promise.all([writer, reader, other].map((service) => service.onModuleDestroy()));
+  });
+
+  it('deve descartar o cache ao reconectar no Redis', async () => {
+    const { redis, subscribers } = createBus();
+    const service = createService(redis);
+
+    await service.getOrLoad(CATALOG.templates, 'a', async () => 'v1');
+    for (const subscriber of subscribers) {
+      subscriber.emit('ready');
+    }
+
+    await expect(
+      service.getOrLoad(CATALOG.templates, 'a', async () => 'v2'),
+    ).resolves.toBe('v2');
+
+    await service.onModuleDestroy();
+  });
+});
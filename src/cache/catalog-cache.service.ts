@@ -0,0 +1,160 @@
+import {
+  Injectable,
+  Logger,
+  OnModuleDestroy,
+  OnModuleInit,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { randomUUID } from 'crypto';
+import { Redis } from 'ioredis';
+
+import { RedisService } from '../redis/redis.service';
+import { LruCache } from './lru-cache';
+
+export const CATALOG = {
+  templates: 'templates',
+  tabulations: 'tabulations',
+  serviceInstances: 'service-instances',
+} as const;
+
+export type CatalogNamespace = (typeof CATALOG)[keyof typeof CATALOG];
+
+/**
+ * Cache de leitura para cadastros que mudam pouco (templates, tabulações,
+ * instâncias de serviço).
+ *
+ * Cada processo guarda um LRU por namespace; escritas invalidam o namespace
+ * inteiro localmente e avisam as outras réplicas via pub/sub no Redis. Uma
+ * carga que começou antes da invalidação não é gravada (contador de geração),
+ * e ao reconectar no Redis o cache é descartado, já que avisos podem ter sido
+ * perdidos. O TTL limita a defasagem se o Redis ficar indisponível.
+ */
+@Injectable()
+export class CatalogCacheService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(CatalogCacheService.name);
+  private readonly origin = randomUUID();
+  private readonly channel: string;
+  private readonly caches = new Map<string, LruCache<unknown>>();
+  private readonly generations = new Map<string, number>();
+  private readonly loading = new Map<string, Promise<unknown>>();
+  private readonly maxEntries: number;
+  private readonly ttlMs: number;
+  private subscriber: Redis | null = null;
+
+  constructor(
+    private readonly redis: RedisService,
+    private readonly configService: ConfigService,
+  ) {
+    this.channel = this.redis.key('cache', 'catalog', 'invalidate');
+    this.maxEntries =
+      this.configService.get<number>('catalogCache.maxEntries') ?? 1000;
+    this.ttlMs = this.configService.get<number>('catalogCache.ttlMs') ?? 300000;
+  }
+
+  onModuleInit() {
+    // Conexão em modo subscriber não aceita outros comandos
+    this.subscriber = this.redis.duplicate();
+    this.subscriber.on('error', (error) =>
+      this.logger.warn(`Erro no canal de invalidação: ${error.message}`),
+    );
+    this.subscriber.on('ready', () => this.clearAll());
+    this.subscriber.on('message', (_channel, message: string) => {
+      const [origin, namespace] = message.split(':', 2);
+      if (origin !== this.origin && namespace) {
+        this.clear(namespace);
+      }
+    });
+    void this.subscriber
+      .subscribe(this.channel)
+      .catch((error) =>
+        this.logger.warn(`Falha ao assinar invalidações: ${error.message}`),
+      );
+  }
+
+  async onModuleDestroy() {
+    await this.subscriber?.quit().catch(() => this.subscriber?.disconnect());
+    this.subscriber = null;
+  }
+
+  /**
+   * Lê do cache ou executa `loader`; leituras simultâneas da mesma chave
+   * compartilham a mesma consulta.
+   */
+  async getOrLoad<T>(
+    namespace: CatalogNamespace,
+    key: string,
+    loader: () => Promise<T>,
+  ): Promise<T> {
+    const cache = this.getCache(namespace);
+    const cached = cache.get(key);
+    if (cached !== undefined) {
+      return cached as T;
+    }
+
+    const loadKey = `${namespace}:${key}`;
+    const pending = this.loading.get(loadKey);
+    if (pending) {
+      return pending as Promise<T>;
+    }
+
+    const generation = this.generations.get(namespace) ?? 0;
+    const load = loader()
+      .then((value) => {
+        // Não guarda resultado de uma carga anterior a uma invalidação
+        if ((this.generations.get(namespace) ?? 0) === generation && value !== undefined) {
+          cache.set(key, value);
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.loading.get(loadKey) === load) {
+          this.loading.delete(loadKey);
+        }
+      });
+
+    this.loading.set(loadKey, load);
+    return load;
+  }
+
+  /**
+   * Invalida os namespaces neste processo e nas demais réplicas.
+   */
+  async invalidate(...namespaces: CatalogNamespace[]): Promise<void> {
+    for (const namespace of namespaces) {
+      this.clear(namespace);
+      try {
+        await this.redis.publish(this.channel, `${this.origin}:${namespace}`);
+      } catch (error: any) {
+        this.logger.warn(
+          `Falha ao publicar invalidação de ${namespace}: ${error.message}`,
+        );
+      }
+    }
+  }
+
+  private getCache(namespace: string): LruCache<unknown> {
+    let cache = this.caches.get(namespace);
+    if (!cache) {
+      cache = new LruCache(this.maxEntries, this.ttlMs);
+      this.caches.set(namespace, cache);
+    }
+    return cache;
+  }
+
+  private clear(namespace: string) {
+    this.generations.set(namespace, (this.generations.get(namespace) ?? 0) + 1);
+    this.caches.get(namespace)?.clear();
+    // Cargas em andamento não devem ser reaproveitadas depois da invalidação
+    for (const loadKey of this.loading.keys()) {
+      if (loadKey.startsWith(`${namespace}:`)) {
+        this.loading.delete(loadKey);
+      }
+    }
+  }
+
+  private clearAll() {
+    for (const namespace of this.caches.keys()) {
+      this.clear(namespace);
+    }
+  }
+}
@@ -0,0 +1,25 @@
+import { LruCache } from './lru-cache';
+
+describe('LruCache', () => {
+  it('deve descartar a entrada menos usada ao passar do limite', () => {
+    const cache = new LruCache<number>(2, 60000);
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.get('a');
+    cache.set('c', 3);
+
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('c')).toBe(3);
+    expect(cache.size).toBe(2);
+  });
+
+  it('deve expirar entradas após o TTL', () => {
+    const cache = new LruCache<string>(10, 1000);
+    cache.set('a', 'x', 0);
+
+    expect(cache.get('a', 999)).toBe('x');
+    expect(cache.get('a', 1000)).toBeUndefined();
+    expect(cache.size).toBe(0);
+  });
+});
@@ -0,0 +1,34 @@
+import { compileTemplate } from './campaign-template';
+
+describe('compileTemplate', () => {
+  const contact = {
+    name: 'Maria',
+    phone: '+5511999999999',
+    cpf: '123.456.789-00',
+    additional1: 'Plano Ouro',
+    additional2: null,
+  };
+
+  it('deve substituir todos os campos do contato', () => {
+    const render = compileTemplate(
+      'Olá {{name}} ({{phone}}), CPF {{ cpf }}: {{additional1}}{{additional2}}',
+    );
+
+    expect(render(contact)).toBe(
+      'Olá Maria (+5511999999999), CPF 123.456.789-00: Plano Ouro',
+    );
+  });
+
+  it('deve manter variáveis desconhecidas', () => {
+    const render = compileTemplate('Oi {{name}}, código {{protocolo}}');
+
+    expect(render(contact)).toBe('Oi Maria, código {{protocolo}}');
+  });
+
+  it('deve reutilizar o template compilado entre contatos', () => {
+    const render = compileTemplate('{{name}}!');
+
+    expect(render(contact)).toBe('Maria!');
+    expect(render({ ...contact, name: 'João' })).toBe('João!');
+  });
+});
@@ -0,0 +1,62 @@
+export type TemplateContact = {
+  name: string;
+  phone: string;
+  cpf?: string | null;
+  additional1?: string | null;
+  additional2?: string | null;
+};
+
+export type CompiledTemplate = (contact: TemplateContact) => string;
+
+export const TEMPLATE_FIELDS = [
+  'name',
+  'phone',
+  'cpf',
+  'additional1',
+  'additional2',
+] as const;
+
+type TemplateField = (typeof TEMPLATE_FIELDS)[number];
+
+const PLACEHOLDER_REGEX = /\{\{\s*([a-zA-Z0-9_]+)\s*\}\}/g;
+
+/**
+ * Pré-compila o corpo de um template em partes fixas + campos do contato,
+ * evitando rodar as substituições por regex a cada mensagem enviada.
+ *
+ * Variáveis suportadas: {{name}}, {{phone}}, {{cpf}}, {{additional1}} e
+ * {{additional2}}. Campos vazios viram string vazia; variáveis desconhecidas
+ * são mantidas como estão.
+ */
+export function compileTemplate(body: string): CompiledTemplate {
+  const parts: Array<string | TemplateField> = [];
+  const fieldIndexes: number[] = [];
+  let lastIndex = 0;
+
+  for (const match of body.matchAll(PLACEHOLDER_REGEX)) {
+    const field = match[1];
+    if (!(TEMPLATE_FIELDS as readonly string[]).includes(field)) {
+      continue;
+    }
+
+    const start = match.index ?? 0;
+    parts.push(body.slice(lastIndex, start));
+    fieldIndexes.push(parts.length);
+    parts.push(field as TemplateField);
+    lastIndex = start + match[0].length;
+  }
+  parts.push(body.slice(lastIndex));
+
+  if (fieldIndexes.length === 0) {
+    return () => body;
+  }
+
+  return (contact) => {
+    const output = parts.slice();
+    for (const index of fieldIndexes) {
+      const value = contact[output[index] as TemplateField];
+      output[index] = value ?? '';
+    }
+    return output.join('');
+  };
+}
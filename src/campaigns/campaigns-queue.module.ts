@@ -0,0 +1,34 @@
+import { Module } from '@nestjs/common';
+import { BullModule } from '@nestjs/bullmq';
+import { ConfigService } from '@nestjs/config';
+
+/**
+ * Conexão BullMQ e fila `campaigns`, compartilhadas pela API (produtor) e pelo
+ * worker (consumidor).
+ */
+@Module({
+  imports: [
+    BullModule.forRootAsync({
+      inject: [ConfigService],
+      useFactory: (configService: ConfigService) => ({
+        connection: {
+          host: configService.get<string>('redis.host'),
+          port: configService.get<number>('redis.port'),
+          password: configService.get<string>('redis.password'),
+        },
+        prefix: configService.get<string>('bullmq.prefix'),
+      }),
+    }),
+    BullModule.registerQueue({
+      name: 'campaigns',
+      // Um erro transitório (banco, Redis) não pode encerrar a cadeia de lotes
+      // e deixar a campanha presa em PROCESSING
+      defaultJobOptions: {
+        attempts: 5,
+        backoff: { type: 'exponential', delay: 10000 },
+      },
+    }),
+  ],
+  exports: [BullModule],
+})
+export class CampaignsQueueModule {}
@@ -0,0 +1,14 @@
+import { Module } from '@nestjs/common';
+
+import { CampaignsQueueModule } from './campaigns-queue.module';
+import { CampaignsProcessor } from './campaigns.processor';
+
+/**
+ * Consumidor da fila de campanhas. Carregado nos papéis `worker` e `all`, o que
+ * permite escalar o envio de campanhas separado das réplicas da API.
+ */
+@Module({
+  imports: [CampaignsQueueModule],
+  providers: [CampaignsProcessor],
+})
+export class CampaignsWorkerModule {}
@@ -1,33 +1,14 @@
 import { Module } from '@nestjs/common';
-import { BullModule } from '@nestjs/bullmq';
-import { ConfigService } from '@nestjs/config';
 
 import { CampaignsService } from './campaigns.service';
 import { CampaignsController } from './campaigns.controller';
-import { CampaignsProcessor } from './campaigns.processor';
+import { CampaignsQueueModule } from './campaigns-queue.module';
 import { StorageModule } from '../storage/storage.module';
 
 @Module({
-  imports: [
-    BullModule.forRootAsync({
-      inject: [ConfigService],
-      useFactory: (configService: ConfigService) => ({
-        connection: {
-          host: configService.get<string>('redis.host'),
-          port: configService.get<number>('redis.port'),
-          password: configService.get<string>('redis.password'),
-        },
-        prefix: configService.get<string>('bullmq.prefix'),
-      }),
-    }),
-    BullModule.registerQueue({
-      name: 'campaigns',
-    }),
-    StorageModule,
-  ],
+  imports: [CampaignsQueueModule, StorageModule],
   controllers: [CampaignsController],
-  providers: [CampaignsService, CampaignsProcessor],
+  providers: [CampaignsService],
   exports: [CampaignsService],
 })
 export class CampaignsModule {}
-
@@ -1,169 +1,355 @@
-import { Processor, WorkerHost } from '@nestjs/bullmq';
+import { InjectQueue, Processor, WorkerHost } from '@nestjs/bullmq';
 import { Logger } from '@nestjs/common';
-import { Job } from 'bullmq';
-import { CampaignStatus } from '@prisma/client';
-import axios from 'axios';
+import { ConfigService } from '@nestjs/config';
+import { DelayedError, Job, Queue } from 'bullmq';
+import { CampaignStatus, Prisma } from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { ProviderHttpService } from '../provider-http/provider-http.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
+import { compileTemplate, CompiledTemplate } from './campaign-template';
+import {
+  isWithinSendWindow,
+  nextSendWindowStart,
+  parseSendWindow,
+  SendWindow,
+} from './send-window';
+
+export const SEND_BATCH_JOB = 'send-batch';
+
+// jobId do job atrasado criado pelo lançador de campanhas agendadas (um por campanha)
+export const launchJobId = (campaignId: string) => `campaign-launch-${campaignId}`;
+
+const DEFAULT_MESSAGE = 'Olá! Esta é uma mensagem da campanha.';
+
+// Item reivindicado por um lote e ainda não concluído
+const SENDING_STATUS = 'SENDING';
+const INTERRUPTED_ERROR = 'Envio interrompido antes da confirmação (não reenviado)';
+
+type CampaignWithRelations = Prisma.CampaignGetPayload<{
+  include: { serviceInstance: true; template: true };
+}>;
+
+type ItemResult =
+  | { id: string; status: 'SENT'; sentAt: Date }
+  | { id: string; status: 'FAILED'; errorMessage: string };
 
 @Processor('campaigns')
 export class CampaignsProcessor extends WorkerHost {
   private readonly logger = new Logger(CampaignsProcessor.name);
   private lastSentTimes: Map<string, number> = new Map();
-
-  constructor(private readonly prisma: PrismaService) {
+  private compiledTemplates: Map<string, { body: string; render: CompiledTemplate }> =
+    new Map();
+  private readonly batchSize: number;
+  private readonly maxBatchDurationMs: number;
+  private readonly sendWindow: SendWindow | null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly providerHttp: ProviderHttpService,
+    private readonly catalogCache: CatalogCacheService,
+    @InjectQueue('campaigns') private readonly campaignsQueue: Queue,
+    private readonly configService: ConfigService,
+  ) {
     super();
+    this.batchSize = this.configService.get<number>('campaigns.batchSize') ?? 50;
+    this.maxBatchDurationMs =
+      this.configService.get<number>('campaigns.maxBatchDurationMs') ?? 60000;
+    this.sendWindow = parseSendWindow(
+      this.configService.get<string>('campaigns.sendWindow'),
+      this.configService.get<string>('campaigns.timeZone') ?? 'America/Sao_Paulo',
+    );
   }
 
-  async process(job: Job<any, any, string>): Promise<any> {
+  async process(job: Job<any, any, string>, token?: string): Promise<any> {
     const { campaignId, campaignItemId } = job.data;
 
-    try {
-      // Buscar campanha e item
-      const campaign = await this.prisma.campaign.findUnique({
-        where: { id: campaignId },
-        include: {
-          serviceInstance: true,
-          template: true,
-        },
-      });
+    // Jobs antigos ('send-message') carregam um único item
+    const itemIds = campaignItemId ? [campaignItemId] : undefined;
 
-      if (!campaign) {
-        this.logger.error(`Campanha ${campaignId} não encontrada`);
-        return;
-      }
+    // Uma carga da campanha por lote; instância e template vêm do cache de cadastros
+    const campaign = await this.loadCampaign(campaignId);
 
-      // Verificar se está pausada
-      if (campaign.status === CampaignStatus.PAUSED) {
-        this.logger.log(`Campanha ${campaignId} pausada, aguardando...`);
-        await job.moveToDelayed(Date.now() + 30000); // Aguardar 30s
-        return;
-      }
+    if (!campaign) {
+      this.logger.error(`Campanha ${campaignId} não encontrada`);
+      return;
+    }
 
-      const item = await this.prisma.campaignItem.findUnique({
-        where: { id: campaignItemId },
-        include: {
-          contact: true,
-        },
+    // Job pré-agendado pelo lançador: só marca o início e abre a cadeia de
+    // lotes. Se a campanha já foi iniciada manualmente, não abre outra.
+    if (job.id === launchJobId(campaignId)) {
+      const { count } = await this.prisma.campaign.updateMany({
+        where: { id: campaignId, status: CampaignStatus.SCHEDULED },
+        data: { status: CampaignStatus.PROCESSING, startedAt: new Date() },
       });
-
-      if (!item) {
-        this.logger.error(`Item ${campaignItemId} não encontrado`);
-        return;
-      }
-
-      if (item.status !== 'PENDING') {
-        this.logger.log(`Item ${campaignItemId} já foi processado`);
+      if (count === 0) {
+        this.logger.log(`Campanha ${campaignId} já iniciada, job agendado ignorado`);
         return;
       }
+      this.logger.log(`Campanha ${campaign.name} iniciada no horário agendado`);
+      await this.campaignsQueue.add(SEND_BATCH_JOB, { campaignId });
+      return;
+    }
 
-      // Respeitar delay entre envios
-      const lastSent = this.lastSentTimes.get(campaignId) || 0;
-      const now = Date.now();
-      const timeSinceLastSent = now - lastSent;
-      const delayMs = campaign.delaySeconds * 1000;
-
-      if (timeSinceLastSent < delayMs) {
-        const waitTime = delayMs - timeSinceLastSent;
-        this.logger.log(
-          `Aguardando ${waitTime}ms antes de enviar próxima mensagem`,
-        );
-        await new Promise((resolve) => setTimeout(resolve, waitTime));
-      }
+    // Verificar se está pausada
+    if (campaign.status === CampaignStatus.PAUSED) {
+      this.logger.log(`Campanha ${campaignId} pausada, aguardando...`);
+      await job.moveToDelayed(Date.now() + 30000, token); // Aguardar 30s
+      throw new DelayedError();
+    }
 
-      // Preparar conteúdo da mensagem
-      let messageContent = campaign.template?.body || 'Olá! Esta é uma mensagem da campanha.';
-      
-      // Substituir variáveis simples no template (ex: {{name}})
-      if (campaign.template && item.contact.name) {
-        messageContent = messageContent.replace(/\{\{name\}\}/g, item.contact.name);
-        messageContent = messageContent.replace(/\{\{phone\}\}/g, item.contact.phone);
-      }
+    if (campaign.status !== CampaignStatus.PROCESSING) {
+      this.logger.log(
+        `Campanha ${campaignId} com status ${campaign.status}, lote ignorado`,
+      );
+      return;
+    }
 
+    // Fora da janela de envio: o lote espera a próxima abertura
+    if (this.sendWindow && !isWithinSendWindow(new Date(), this.sendWindow)) {
+      const opensAt = nextSendWindowStart(new Date(), this.sendWindow);
       this.logger.log(
-        `Enviando mensagem para ${item.contact.phone} (campanha: ${campaign.name})`,
+        `Campanha ${campaignId} fora da janela de envio, retomando em ${opensAt.toISOString()}`,
       );
+      await job.moveToDelayed(opensAt.getTime(), token);
+      throw new DelayedError();
+    }
 
-      // Enviar mensagem via provedor (Evolution API ou Meta)
-      try {
-        if (campaign.serviceInstance.provider === 'EVOLUTION_API') {
-          await this.sendViaEvolutionAPI(campaign, item, messageContent);
-        } else if (campaign.serviceInstance.provider === 'OFFICIAL_META') {
-          await this.sendViaMetaAPI(campaign, item, messageContent);
-        } else {
-          throw new Error('Provedor não suportado');
-        }
+    const batchSize = this.getEffectiveBatchSize(campaign.delaySeconds);
+
+    // Reivindica os próximos itens pendentes (PENDING -> SENDING) de forma
+    // atômica: outro job da mesma campanha nunca pega os mesmos itens
+    const claimed = await this.prisma.$queryRaw<{ id: string }[]>`
+      UPDATE "campaign_items" SET "status" = ${SENDING_STATUS}
+      WHERE "id" IN (
+        SELECT "id" FROM "campaign_items"
+        WHERE "campaignId" = ${campaignId}
+          AND "status" = 'PENDING'
+          ${itemIds ? Prisma.sql`AND "id" IN (${Prisma.join(itemIds)})` : Prisma.empty}
+        ORDER BY "id"
+        LIMIT ${batchSize}
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING "id"
+    `;
+
+    if (claimed.length === 0) {
+      await this.checkCampaignCompletion(campaignId);
+      return;
+    }
 
-        // Marcar como enviado
-        await this.prisma.campaignItem.update({
-          where: { id: campaignItemId },
-          data: {
-            status: 'SENT',
-            sentAt: new Date(),
-          },
-        });
+    const items = await this.prisma.campaignItem.findMany({
+      where: { id: { in: claimed.map((item) => item.id) } },
+      include: {
+        contact: true,
+      },
+      orderBy: { id: 'asc' },
+    });
+
+    const render = this.getCompiledTemplate(campaign);
+    const results: ItemResult[] = [];
+    const attempted = new Set<string>();
 
-        this.logger.log(`Mensagem enviada com sucesso: ${item.contact.phone}`);
-      } catch (error: any) {
-        this.logger.error(
-          `Falha ao enviar mensagem para ${item.contact.phone}: ${error.message}`,
-          error.stack,
-        );
-
-        // Marcar como falha
-        await this.prisma.campaignItem.update({
-          where: { id: campaignItemId },
-          data: {
+    try {
+      for (const item of items) {
+        await this.waitForSendSlot(campaign);
+        attempted.add(item.id);
+
+        let result: ItemResult;
+        try {
+          const messageContent = render(item.contact);
+
+          if (campaign.serviceInstance.provider === 'EVOLUTION_API') {
+            await this.sendViaEvolutionAPI(campaign, item, messageContent);
+          } else if (campaign.serviceInstance.provider === 'OFFICIAL_META') {
+            await this.sendViaMetaAPI(campaign, item, messageContent);
+          } else {
+            throw new Error('Provedor não suportado');
+          }
+
+          result = { id: item.id, status: 'SENT', sentAt: new Date() };
+        } catch (error: any) {
+          // Detalhes do erro do provedor já foram logados em sendVia*
+          this.logger.warn(`Falha ao enviar mensagem para ${item.contact.phone}: ${error.message}`);
+          result = {
+            id: item.id,
             status: 'FAILED',
             errorMessage: error.message || 'Erro ao enviar mensagem',
-          },
+          };
+        }
+
+        // Atualizar tempo do último envio
+        this.lastSentTimes.set(campaignId, Date.now());
+        results.push(result);
+      }
+    } finally {
+      // Itens reivindicados que nem chegaram a ser enviados voltam para a fila
+      const unattempted = items
+        .filter((item) => !attempted.has(item.id))
+        .map((item) => item.id);
+      if (unattempted.length > 0) {
+        await this.prisma.campaignItem.updateMany({
+          where: { id: { in: unattempted }, status: SENDING_STATUS },
+          data: { status: 'PENDING' },
         });
       }
 
-      // Atualizar tempo do último envio
-      this.lastSentTimes.set(campaignId, Date.now());
+      // Um único UPDATE por lote; se o processo cair antes, os itens ficam em
+      // SENDING e não são reenviados (ver checkCampaignCompletion)
+      await this.writeResults(results);
+    }
 
-      // Verificar se a campanha terminou
-      await this.checkCampaignCompletion(campaignId);
-    } catch (error) {
-      this.logger.error(`Erro ao processar job da campanha: ${error.message}`);
-      
-      // Atualizar item como falha
-      await this.prisma.campaignItem.update({
-        where: { id: campaignItemId },
-        data: {
-          status: 'FAILED',
-          errorMessage: error.message,
-        },
-      });
+    const sentCount = results.filter((r) => r.status === 'SENT').length;
+    this.logger.log(
+      `Lote da campanha ${campaign.name} processado: ${sentCount}/${results.length} enviados`,
+    );
+
+    if (!itemIds && claimed.length === batchSize) {
+      // Ainda pode haver itens pendentes: encadear o próximo lote
+      await this.campaignsQueue.add(SEND_BATCH_JOB, { campaignId });
+      return;
     }
+
+    await this.checkCampaignCompletion(campaignId);
   }
 
-  private async checkCampaignCompletion(campaignId: string): Promise<void> {
+  /**
+   * Limita a duração de cada lote para que pausas sejam respeitadas em tempo
+   * razoável mesmo com delays longos entre mensagens.
+   */
+  private getEffectiveBatchSize(delaySeconds: number): number {
+    const delayMs = delaySeconds * 1000;
+    if (delayMs <= 0) {
+      return this.batchSize;
+    }
+    return Math.max(
+      1,
+      Math.min(this.batchSize, Math.floor(this.maxBatchDurationMs / delayMs)),
+    );
+  }
+
+  private async loadCampaign(
+    campaignId: string,
+  ): Promise<CampaignWithRelations | null> {
     const campaign = await this.prisma.campaign.findUnique({
       where: { id: campaignId },
-      include: {
-        items: true,
-      },
     });
 
     if (!campaign) {
+      return null;
+    }
+
+    const [serviceInstance, template] = await Promise.all([
+      this.catalogCache.getOrLoad(
+        CATALOG.serviceInstances,
+        `id:${campaign.serviceInstanceId}`,
+        () =>
+          this.prisma.serviceInstance.findUnique({
+            where: { id: campaign.serviceInstanceId },
+          }),
+      ),
+      campaign.templateId
+        ? this.catalogCache.getOrLoad(
+            CATALOG.templates,
+            `raw:${campaign.templateId}`,
+            () =>
+              this.prisma.template.findUnique({
+                where: { id: campaign.templateId! },
+              }),
+          )
+        : null,
+    ]);
+
+    if (!serviceInstance) {
+      return null;
+    }
+
+    return { ...campaign, serviceInstance, template };
+  }
+
+  private getCompiledTemplate(campaign: CampaignWithRelations): CompiledTemplate {
+    const template = campaign.template;
+    if (!template) {
+      return () => DEFAULT_MESSAGE;
+    }
+
+    const cached = this.compiledTemplates.get(template.id);
+    if (cached && cached.body === template.body) {
+      return cached.render;
+    }
+
+    const render = compileTemplate(template.body || DEFAULT_MESSAGE);
+    this.compiledTemplates.set(template.id, { body: template.body, render });
+    return render;
+  }
+
+  private async waitForSendSlot(campaign: CampaignWithRelations): Promise<void> {
+    // Respeitar delay entre envios
+    const lastSent = this.lastSentTimes.get(campaign.id) || 0;
+    const timeSinceLastSent = Date.now() - lastSent;
+    const delayMs = campaign.delaySeconds * 1000;
+
+    if (timeSinceLastSent < delayMs) {
+      const waitTime = delayMs - timeSinceLastSent;
+      this.logger.debug(
+        `Aguardando ${waitTime}ms antes de enviar próxima mensagem`,
+      );
+      await new Promise((resolve) => setTimeout(resolve, waitTime));
+    }
+  }
+
+  private async writeResults(results: ItemResult[]): Promise<void> {
+    if (results.length === 0) {
       return;
     }
 
-    const allProcessed = campaign.items.every(
-      (item) => item.status === 'SENT' || item.status === 'FAILED',
+    const rows = results.map((result) =>
+      result.status === 'SENT'
+        ? Prisma.sql`(${result.id}, 'SENT', NULL::text, ${result.sentAt}::timestamp(3))`
+        : Prisma.sql`(${result.id}, 'FAILED', ${result.errorMessage}::text, NULL::timestamp(3))`,
     );
 
-    if (allProcessed && campaign.status === CampaignStatus.PROCESSING) {
-      await this.prisma.campaign.update({
-        where: { id: campaignId },
-        data: {
-          status: CampaignStatus.COMPLETED,
-          finishedAt: new Date(),
-        },
-      });
+    await this.prisma.$executeRaw`
+      UPDATE "campaign_items" AS ci
+      SET "status" = v."status",
+          "errorMessage" = COALESCE(v."errorMessage", ci."errorMessage"),
+          "sentAt" = COALESCE(v."sentAt", ci."sentAt")
+      FROM (VALUES ${Prisma.join(rows)}) AS v("id", "status", "errorMessage", "sentAt")
+      WHERE ci."id" = v."id" AND ci."status" = ${SENDING_STATUS}
+    `;
+  }
 
+  private async checkCampaignCompletion(campaignId: string): Promise<void> {
+    const pendingCount = await this.prisma.campaignItem.count({
+      where: { campaignId, status: 'PENDING' },
+    });
+
+    if (pendingCount > 0) {
+      return;
+    }
+
+    // Só uma cadeia de lotes roda por campanha: um item ainda em SENDING aqui
+    // ficou de um worker que caiu entre o envio e a gravação do status. Não é
+    // reenviado (a mensagem pode ter saído), apenas marcado como falha.
+    const interrupted = await this.prisma.campaignItem.updateMany({
+      where: { campaignId, status: SENDING_STATUS },
+      data: { status: 'FAILED', errorMessage: INTERRUPTED_ERROR },
+    });
+    if (interrupted.count > 0) {
+      this.logger.warn(
+        `${interrupted.count} item(ns) da campanha ${campaignId} com envio interrompido marcados como falha`,
+      );
+    }
+
+    const { count } = await this.prisma.campaign.updateMany({
+      where: { id: campaignId, status: CampaignStatus.PROCESSING },
+      data: {
+        status: CampaignStatus.COMPLETED,
+        finishedAt: new Date(),
+      },
+    });
+
+    if (count > 0) {
       this.logger.log(`Campanha ${campaignId} finalizada`);
     }
   }
@@ -200,12 +386,12 @@ export class CampaignsProcessor extends WorkerHost {
     const phone = this.normalizePhoneNumber(item.contact.phone);
     const sendUrl = `${serverUrl.replace(/\/$/, '')}/message/sendText/${instanceName}`;
 
-    this.logger.log(`Enviando mensagem via Evolution API`, {
+    this.logger.debug(`Enviando mensagem via Evolution API`, () => ({
       url: sendUrl,
       phone,
       instanceName,
       messageLength: messageContent.length,
-    });
+    }));
 
     const payload = {
       number: phone,
@@ -213,26 +399,23 @@ export class CampaignsProcessor extends WorkerHost {
     };
 
     try {
-      const response = await axios.post(sendUrl, payload, {
+      const response = await this.providerHttp.post(sendUrl, payload, {
         headers: {
           apikey: apiToken,
           'Content-Type': 'application/json',
         },
+        breakerKey: campaign.serviceInstance.id,
       });
 
       const externalId = response.data?.key?.id || response.data?.id || `evol_${Date.now()}`;
       const status = response.data?.status?.toLowerCase() || 'sent';
 
-      this.logger.log(`Mensagem enviada via Evolution API com sucesso`, {
-        externalId,
-        status,
-        phone,
-      });
+      this.logger.debug(`Mensagem enviada via Evolution API com sucesso`, { externalId, status });
     } catch (error: any) {
       this.logger.error('Erro ao enviar mensagem na Evolution API', {
         error: error.message,
         url: sendUrl,
-        payload,
+        phone,
         response: error.response?.data,
         status: error.response?.status,
       });
@@ -263,11 +446,11 @@ export class CampaignsProcessor extends WorkerHost {
     const baseUrl = credentials.graphApiUrl || process.env.META_GRAPH_API_BASE_URL || 'https://graph.facebook.com';
     const sendUrl = `${baseUrl.replace(/\/$/, '')}/${version.replace(/^\//, '').replace(/\/$/, '')}/${phoneId}/messages`;
 
-    this.logger.log(`Enviando mensagem via Meta WhatsApp API`, {
+    this.logger.debug(`Enviando mensagem via Meta WhatsApp API`, () => ({
       phoneId,
       sendUrl,
       messageLength: messageContent.length,
-    });
+    }));
 
     const payload = {
       messaging_product: 'whatsapp',
@@ -280,11 +463,12 @@ export class CampaignsProcessor extends WorkerHost {
     };
 
     try {
-      const response = await axios.post(sendUrl, payload, {
+      const response = await this.providerHttp.post(sendUrl, payload, {
         headers: {
           Authorization: `Bearer ${accessToken}`,
           'Content-Type': 'application/json',
         },
+        breakerKey: campaign.serviceInstance.id,
       });
 
       const externalId =
@@ -292,17 +476,14 @@ export class CampaignsProcessor extends WorkerHost {
         response.data?.message_id ||
         `meta_${Date.now()}`;
 
-      this.logger.log(`Mensagem enviada via Meta API com sucesso`, {
-        externalId,
-        phoneId,
-      });
+      this.logger.debug(`Mensagem enviada via Meta API com sucesso`, { externalId, phoneId });
     } catch (error: any) {
       this.logger.error('Erro ao enviar mensagem na Meta API', {
         error: error.message,
         response: error.response?.data,
         status: error.response?.status,
         sendUrl,
-        payload,
+        phone,
       });
 
       const errorMessage =
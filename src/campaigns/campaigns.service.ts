@@ -2,6 +2,7 @@ import {
   Injectable,
   NotFoundException,
   BadRequestException,
+  OnModuleInit,
 } from '@nestjs/common';
 import { InjectQueue } from '@nestjs/bullmq';
 import { Queue } from 'bullmq';
@@ -12,15 +13,30 @@ import { PrismaService } from '../prisma/prisma.service';
 import { StorageService } from '../storage/storage.service';
 import { CreateCampaignDto } from './dto/create-campaign.dto';
 import { CampaignResponseDto } from './dto/campaign-response.dto';
+import { launchJobId, SEND_BATCH_JOB } from './campaigns.processor';
+import { MetricsService } from '../metrics/metrics.service';
+
+const QUEUE_METRIC_STATES = ['waiting', 'active', 'delayed', 'failed', 'prioritized'] as const;
 
 @Injectable()
-export class CampaignsService {
+export class CampaignsService implements OnModuleInit {
   constructor(
     private readonly prisma: PrismaService,
     private readonly storageService: StorageService,
     @InjectQueue('campaigns') private campaignsQueue: Queue,
+    private readonly metrics: MetricsService,
   ) {}
 
+  onModuleInit() {
+    // Profundidade da fila lida apenas no scrape de /metrics
+    this.metrics.registerCollector(async () => {
+      const counts = await this.campaignsQueue.getJobCounts(...QUEUE_METRIC_STATES);
+      for (const state of QUEUE_METRIC_STATES) {
+        this.metrics.queueJobs.set({ queue: 'campaigns', state }, counts[state] ?? 0);
+      }
+    });
+  }
+
   async create(
     userId: string,
     payload: CreateCampaignDto,
@@ -142,7 +158,7 @@ export class CampaignsService {
     const campaign = await this.prisma.campaign.findUnique({
       where: { id: campaignId },
       include: {
-        items: true,
+        _count: { select: { items: true } },
       },
     });
 
@@ -150,39 +166,39 @@ export class CampaignsService {
       throw new NotFoundException('Campanha não encontrada');
     }
 
-    if (campaign.status !== CampaignStatus.PENDING) {
+    if (
+      campaign.status !== CampaignStatus.PENDING &&
+      campaign.status !== CampaignStatus.SCHEDULED
+    ) {
       throw new BadRequestException('Campanha já foi iniciada ou finalizada');
     }
 
-    if (campaign.items.length === 0) {
+    if (campaign._count.items === 0) {
       throw new BadRequestException(
         'Campanha não possui contatos. Faça upload do CSV primeiro.',
       );
     }
 
-    // Atualizar status
-    await this.prisma.campaign.update({
-      where: { id: campaignId },
+    // Início manual de uma campanha pré-agendada: o job atrasado sai da fila
+    if (campaign.status === CampaignStatus.SCHEDULED) {
+      await this.cancelLaunchJob(campaignId);
+    }
+
+    // Atualizar status (só uma chamada vence se houver corrida com o lançador)
+    const { count } = await this.prisma.campaign.updateMany({
+      where: { id: campaignId, status: campaign.status },
       data: {
         status: CampaignStatus.PROCESSING,
         startedAt: new Date(),
       },
     });
-
-    // Adicionar jobs na fila
-    for (const item of campaign.items) {
-      await this.campaignsQueue.add(
-        'send-message',
-        {
-          campaignId,
-          campaignItemId: item.id,
-        },
-        {
-          delay: 0, // O delay será gerenciado pelo worker
-        },
-      );
+    if (count === 0) {
+      throw new BadRequestException('Campanha já foi iniciada ou finalizada');
     }
 
+    // Um único job de lote: o worker busca os itens pendentes e encadeia os próximos lotes
+    await this.campaignsQueue.add(SEND_BATCH_JOB, { campaignId });
+
     return this.findOne(campaignId);
   }
 
@@ -289,6 +305,10 @@ export class CampaignsService {
       );
     }
 
+    if (campaign.status === CampaignStatus.SCHEDULED) {
+      await this.cancelLaunchJob(id);
+    }
+
     // Remover itens primeiro
     await this.prisma.campaignItem.deleteMany({
       where: { campaignId: id },
@@ -297,6 +317,21 @@ export class CampaignsService {
     await this.prisma.campaign.delete({ where: { id } });
   }
 
+  /**
+   * Remove o primeiro lote pré-agendado pelo lançador. Se ele já estiver em
+   * execução, a campanha está começando e não pode mais ser alterada.
+   */
+  private async cancelLaunchJob(campaignId: string): Promise<void> {
+    const job = await this.campaignsQueue.getJob(launchJobId(campaignId));
+    if (!job) {
+      return;
+    }
+    if (await job.isActive()) {
+      throw new BadRequestException('Campanha já está iniciando');
+    }
+    await job.remove();
+  }
+
   private async parseCsv(content: string): Promise<string[]> {
     return new Promise((resolve, reject) => {
       const phones: string[] = [];
@@ -337,7 +372,8 @@ export class CampaignsService {
     const totalContacts = items.length;
     const sentCount = items.filter((i: any) => i.status === 'SENT').length;
     const failedCount = items.filter((i: any) => i.status === 'FAILED').length;
-    const pendingCount = items.filter((i: any) => i.status === 'PENDING').length;
+    // Inclui itens em envio (SENDING)
+    const pendingCount = totalContacts - sentCount - failedCount;
 
     return {
       id: campaign.id,
@@ -351,6 +387,7 @@ export class CampaignsService {
       csvPath: campaign.csvPath,
       status: campaign.status,
       scheduledAt: campaign.scheduledAt,
+      launchAt: campaign.launchAt,
       startedAt: campaign.startedAt,
       finishedAt: campaign.finishedAt,
       delaySeconds: campaign.delaySeconds,
@@ -12,6 +12,7 @@ export class CampaignResponseDto {
   csvPath: string | null;
   status: CampaignStatus;
   scheduledAt: Date | null;
+  launchAt: Date | null;
   startedAt: Date | null;
   finishedAt: Date | null;
   delaySeconds: number;
@@ -0,0 +1,58 @@
+import { planLaunches } from './launch-plan';
+import { parseSendWindow } from './send-window';
+
+const MINUTE = 60 * 1000;
+
+describe('planLaunches', () => {
+  const now = new Date('2026-10-19T12:00:00Z');
+
+  it('deve escalonar campanhas da mesma instância e manter as demais no horário', () => {
+    const scheduledAt = new Date('2026-10-19T12:30:00Z');
+
+    const plan = planLaunches(
+      [
+        { id: 'b', serviceInstanceId: 'inst-1', scheduledAt },
+        { id: 'a', serviceInstanceId: 'inst-1', scheduledAt },
+        { id: 'c', serviceInstanceId: 'inst-2', scheduledAt },
+      ],
+      [],
+      { now, staggerMs: 5 * MINUTE, window: null },
+    );
+
+    expect(plan).toEqual([
+      { id: 'a', launchAt: scheduledAt },
+      { id: 'b', launchAt: new Date(scheduledAt.getTime() + 5 * MINUTE) },
+      { id: 'c', launchAt: scheduledAt },
+    ]);
+  });
+
+  it('deve respeitar inícios já reservados e nunca agendar no passado', () => {
+    const plan = planLaunches(
+      [{ id: 'a', serviceInstanceId: 'inst-1', scheduledAt: new Date('2026-10-19T11:00:00Z') }],
+      [{ serviceInstanceId: 'inst-1', launchAt: new Date('2026-10-19T11:58:00Z') }],
+      { now, staggerMs: 5 * MINUTE, window: null },
+    );
+
+    expect(plan).toEqual([{ id: 'a', launchAt: new Date('2026-10-19T12:03:00Z') }]);
+  });
+
+  it('deve adiar para a janela de envio', () => {
+    const window = parseSendWindow('1-5 08:00-18:00', 'America/Sao_Paulo');
+
+    // Sábado 10:00 local -> segunda 08:00 local; a segunda da mesma instância vem 5 min depois
+    const scheduledAt = new Date('2026-10-24T13:00:00Z');
+    const plan = planLaunches(
+      [
+        { id: 'a', serviceInstanceId: 'inst-1', scheduledAt },
+        { id: 'b', serviceInstanceId: 'inst-1', scheduledAt },
+      ],
+      [],
+      { now, staggerMs: 5 * MINUTE, window },
+    );
+
+    expect(plan).toEqual([
+      { id: 'a', launchAt: new Date('2026-10-26T11:00:00Z') },
+      { id: 'b', launchAt: new Date('2026-10-26T11:05:00Z') },
+    ]);
+  });
+});
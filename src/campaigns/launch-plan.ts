@@ -0,0 +1,65 @@
+import { nextSendWindowStart, SendWindow } from './send-window';
+
+export type LaunchCandidate = {
+  id: string;
+  serviceInstanceId: string;
+  scheduledAt: Date;
+};
+
+// Início já reservado por uma campanha agendada ou recém-iniciada na instância
+export type ReservedLaunch = { serviceInstanceId: string; launchAt: Date };
+
+export type PlannedLaunch = { id: string; launchAt: Date };
+
+export type LaunchPlanOptions = {
+  now: Date;
+  staggerMs: number;
+  window: SendWindow | null;
+};
+
+// Limite de ajustes por campanha (cada ajuste só empurra o horário para frente)
+const MAX_ADJUSTMENTS = 100;
+
+/**
+ * Calcula o início de cada campanha agendada: nunca antes de `scheduledAt` (ou
+ * de agora), sempre dentro da janela de envio e a pelo menos `staggerMs` de
+ * qualquer outro início na mesma instância, para que campanhas marcadas para o
+ * mesmo horário não disputem o número ao mesmo tempo. Campanhas são atendidas
+ * na ordem de `scheduledAt`.
+ */
+export function planLaunches(
+  candidates: LaunchCandidate[],
+  reserved: ReservedLaunch[],
+  options: LaunchPlanOptions,
+): PlannedLaunch[] {
+  const taken = new Map<string, number[]>();
+  for (const launch of reserved) {
+    const starts = taken.get(launch.serviceInstanceId) ?? [];
+    starts.push(launch.launchAt.getTime());
+    taken.set(launch.serviceInstanceId, starts);
+  }
+
+  const ordered = [...candidates].sort(
+    (a, b) => a.scheduledAt.getTime() - b.scheduledAt.getTime() || a.id.localeCompare(b.id),
+  );
+
+  return ordered.map((candidate) => {
+    const starts = taken.get(candidate.serviceInstanceId) ?? [];
+    let launchAt = Math.max(candidate.scheduledAt.getTime(), options.now.getTime());
+
+    for (let attempt = 0; attempt < MAX_ADJUSTMENTS; attempt++) {
+      if (options.window) {
+        launchAt = nextSendWindowStart(new Date(launchAt), options.window).getTime();
+      }
+      const conflict = starts.find((start) => Math.abs(start - launchAt) < options.staggerMs);
+      if (conflict === undefined) {
+        break;
+      }
+      launchAt = conflict + options.staggerMs;
+    }
+
+    starts.push(launchAt);
+    taken.set(candidate.serviceInstanceId, starts);
+    return { id: candidate.id, launchAt: new Date(launchAt) };
+  });
+}
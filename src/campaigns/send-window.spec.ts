@@ -0,0 +1,46 @@
+import { isWithinSendWindow, nextSendWindowStart, parseSendWindow } from './send-window';
+
+describe('send-window', () => {
+  const businessHours = parseSendWindow('1-5 08:00-18:00', 'America/Sao_Paulo')!;
+
+  it('deve interpretar dias e horários e rejeitar janelas inválidas', () => {
+    expect(parseSendWindow('1-3,6 09:00-13:30', 'UTC')).toEqual({
+      days: new Set([1, 2, 3, 6]),
+      startMinute: 9 * 60,
+      endMinute: 13 * 60 + 30,
+      timeZone: 'UTC',
+    });
+    expect(parseSendWindow('', 'UTC')).toBeNull();
+    expect(parseSendWindow('1-5 18:00-08:00', 'UTC')).toBeNull();
+    expect(parseSendWindow('seg-sex 08:00-18:00', 'UTC')).toBeNull();
+  });
+
+  it('deve considerar o horário local do fuso', () => {
+    // Segunda-feira 08:00 e 18:00 em São Paulo (UTC-3)
+    expect(isWithinSendWindow(new Date('2026-10-19T11:00:00Z'), businessHours)).toBe(true);
+    expect(isWithinSendWindow(new Date('2026-10-19T21:00:00Z'), businessHours)).toBe(false);
+  });
+
+  it('deve levar para a próxima abertura da janela', () => {
+    const inside = new Date('2026-10-19T15:00:00Z');
+    expect(nextSendWindowStart(inside, businessHours)).toBe(inside);
+
+    // Segunda 06:00 local -> segunda 08:00
+    expect(nextSendWindowStart(new Date('2026-10-19T09:00:00Z'), businessHours)).toEqual(
+      new Date('2026-10-19T11:00:00Z'),
+    );
+    // Sexta 19:00 local -> segunda 08:00
+    expect(nextSendWindowStart(new Date('2026-10-23T22:00:00Z'), businessHours)).toEqual(
+      new Date('2026-10-26T11:00:00Z'),
+    );
+  });
+
+  it('deve respeitar o horário de verão do fuso', () => {
+    const newYork = parseSendWindow('1-5 09:00-17:00', 'America/New_York')!;
+
+    // Sábado antes da mudança -> segunda 09:00 EDT (UTC-4)
+    expect(nextSendWindowStart(new Date('2026-03-07T12:00:00Z'), newYork)).toEqual(
+      new Date('2026-03-09T13:00:00Z'),
+    );
+  });
+});
@@ -0,0 +1,148 @@
+/**
+ * Janela de envio de campanhas: dias da semana (ISO, 1 = segunda ... 7 =
+ * domingo) e faixa de horário local em um fuso.
+ */
+export type SendWindow = {
+  days: ReadonlySet<number>;
+  startMinute: number;
+  endMinute: number;
+  timeZone: string;
+};
+
+type LocalParts = {
+  year: number;
+  month: number;
+  day: number;
+  weekday: number;
+  minuteOfDay: number;
+};
+
+const WEEKDAYS: Record<string, number> = {
+  Mon: 1,
+  Tue: 2,
+  Wed: 3,
+  Thu: 4,
+  Fri: 5,
+  Sat: 6,
+  Sun: 7,
+};
+
+const formatters = new Map<string, Intl.DateTimeFormat>();
+
+/**
+ * Converte "1-5 08:00-18:00" (ou "1-5,6 09:00-13:00") em uma janela.
+ * Vazio ou inválido (inclusive início >= fim) devolve null: sem restrição.
+ */
+export function parseSendWindow(
+  raw: string | null | undefined,
+  timeZone: string,
+): SendWindow | null {
+  const match = /^([1-7](?:-[1-7])?(?:,[1-7](?:-[1-7])?)*)\s+(\d{2}):(\d{2})-(\d{2}):(\d{2})$/.exec(
+    (raw ?? '').trim(),
+  );
+  if (!match) {
+    return null;
+  }
+
+  const days = new Set<number>();
+  for (const range of match[1].split(',')) {
+    const [from, to = from] = range.split('-').map(Number);
+    for (let day = from; day <= to; day++) {
+      days.add(day);
+    }
+  }
+
+  const startMinute = Number(match[2]) * 60 + Number(match[3]);
+  const endMinute = Number(match[4]) * 60 + Number(match[5]);
+  if (days.size === 0 || startMinute >= endMinute || endMinute > 24 * 60) {
+    return null;
+  }
+
+  return { days, startMinute, endMinute, timeZone };
+}
+
+export function isWithinSendWindow(date: Date, window: SendWindow): boolean {
+  const local = localParts(date, window.timeZone);
+  return (
+    window.days.has(local.weekday) &&
+    local.minuteOfDay >= window.startMinute &&
+    local.minuteOfDay < window.endMinute
+  );
+}
+
+/**
+ * Primeiro instante a partir de `date` dentro da janela (o próprio `date` se
+ * já estiver dentro).
+ */
+export function nextSendWindowStart(date: Date, window: SendWindow): Date {
+  if (isWithinSendWindow(date, window)) {
+    return date;
+  }
+
+  const local = localParts(date, window.timeZone);
+  for (let offset = 0; offset <= 7; offset++) {
+    const weekday = ((local.weekday - 1 + offset) % 7) + 1;
+    if (!window.days.has(weekday)) {
+      continue;
+    }
+    if (offset === 0 && local.minuteOfDay >= window.startMinute) {
+      continue;
+    }
+
+    // Date.UTC normaliza dias/minutos excedentes (virada de mês/ano)
+    const localMs = Date.UTC(
+      local.year,
+      local.month - 1,
+      local.day + offset,
+      0,
+      window.startMinute,
+    );
+    return fromLocalTime(localMs, window.timeZone);
+  }
+
+  return date;
+}
+
+function localParts(date: Date, timeZone: string): LocalParts {
+  let formatter = formatters.get(timeZone);
+  if (!formatter) {
+    formatter = new Intl.DateTimeFormat('en-US', {
+      timeZone,
+      hourCycle: 'h23',
+      weekday: 'short',
+      year: 'numeric',
+      month: 'numeric',
+      day: 'numeric',
+      hour: 'numeric',
+      minute: 'numeric',
+    });
+    formatters.set(timeZone, formatter);
+  }
+
+  const parts: Record<string, string> = {};
+  for (const part of formatter.formatToParts(date)) {
+    parts[part.type] = part.value;
+  }
+
+  return {
+    year: Number(parts.year),
+    month: Number(parts.month),
+    day: Number(parts.day),
+    weekday: WEEKDAYS[parts.weekday],
+    minuteOfDay: Number(parts.hour) * 60 + Number(parts.minute),
+  };
+}
+
+// Diferença entre o horário local no fuso e UTC no instante informado
+function zoneOffsetMs(date: Date, timeZone: string): number {
+  const local = localParts(date, timeZone);
+  const localMs = Date.UTC(local.year, local.month - 1, local.day, 0, local.minuteOfDay);
+  return localMs - (date.getTime() - (date.getTime() % 60000));
+}
+
+// Horário local (em ms "como se fosse UTC") para o instante real; duas passadas cobrem horário de verão
+function fromLocalTime(localMs: number, timeZone: string): Date {
+  let utcMs = localMs - zoneOffsetMs(new Date(localMs), timeZone);
+  utcMs = localMs - zoneOffsetMs(new Date(utcMs), timeZone);
+  return new Date(utcMs);
+}
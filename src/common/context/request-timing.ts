@@ -0,0 +1,57 @@
+import { AsyncLocalStorage } from 'async_hooks';
+
+export type RequestTiming = {
+  startedAt: number;
+  dbCount: number;
+  dbMs: number;
+  externalCount: number;
+  externalMs: number;
+};
+
+const storage = new AsyncLocalStorage<RequestTiming>();
+
+/**
+ * Executa `callback` com um acumulador de tempos (banco/HTTP externo) associado
+ * à requisição atual, propagado pelas chamadas assíncronas.
+ */
+export function runWithRequestTiming<T>(callback: () => T): T {
+  return storage.run(
+    {
+      startedAt: performance.now(),
+      dbCount: 0,
+      dbMs: 0,
+      externalCount: 0,
+      externalMs: 0,
+    },
+    callback,
+  );
+}
+
+export function getRequestTiming(): RequestTiming | undefined {
+  return storage.getStore();
+}
+
+export function recordDatabaseTime(durationMs: number): void {
+  const timing = storage.getStore();
+  if (timing) {
+    timing.dbCount++;
+    timing.dbMs += durationMs;
+  }
+}
+
+export function recordExternalTime(durationMs: number): void {
+  const timing = storage.getStore();
+  if (timing) {
+    timing.externalCount++;
+    timing.externalMs += durationMs;
+  }
+}
+
+export function formatServerTiming(timing: RequestTiming): string {
+  const totalMs = performance.now() - timing.startedAt;
+  return [
+    `db;dur=${timing.dbMs.toFixed(1)};desc="queries=${timing.dbCount}"`,
+    `ext;dur=${timing.externalMs.toFixed(1)};desc="calls=${timing.externalCount}"`,
+    `app;dur=${totalMs.toFixed(1)}`,
+  ].join(', ');
+}
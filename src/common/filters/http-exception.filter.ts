@@ -4,11 +4,14 @@ import {
   ArgumentsHost,
   HttpException,
   HttpStatus,
+  Logger,
 } from '@nestjs/common';
 import { Request, Response } from 'express';
 
 @Catch()
 export class HttpExceptionFilter implements ExceptionFilter {
+  private readonly logger = new Logger(HttpExceptionFilter.name);
+
   private getErrorName(status: number): string {
     const errorMap: Record<number, string> = {
       [HttpStatus.BAD_REQUEST]: 'Bad Request',
@@ -23,6 +26,22 @@ export class HttpExceptionFilter implements ExceptionFilter {
     return errorMap[status] || 'Error';
   }
 
+  // Só tamanho e chaves de primeiro nível: o corpo pode ter mídia em base64 ou senhas
+  private summarizeBody(request: Request) {
+    const body = request.body;
+    if (body === undefined || body === null) {
+      return undefined;
+    }
+
+    return {
+      size: Number(request.headers['content-length']) || undefined,
+      keys:
+        typeof body === 'object' && !Array.isArray(body)
+          ? Object.keys(body).slice(0, 20)
+          : undefined,
+    };
+  }
+
   catch(exception: unknown, host: ArgumentsHost) {
     const ctx = host.switchToHttp();
     const response = ctx.getResponse<Response>();
@@ -44,14 +63,16 @@ export class HttpExceptionFilter implements ExceptionFilter {
       message = exception.message;
     }
 
-    console.error('[HttpExceptionFilter] Error:', {
-      status,
-      message,
-      path: request.url,
-      method: request.method,
-      body: request.body,
-      error: exception instanceof Error ? exception.stack : exception,
-    });
+    // Erros do cliente (4xx) são rotineiros: sem corpo nem stack, que podem ser enormes (webhooks com mídia)
+    if (status >= HttpStatus.INTERNAL_SERVER_ERROR) {
+      this.logger.error(`${request.method} ${request.url} -> ${status}`, () => ({
+        message,
+        body: this.summarizeBody(request),
+        error: exception instanceof Error ? exception.stack : exception,
+      }));
+    } else {
+      this.logger.warn(`${request.method} ${request.url} -> ${status}`, { message });
+    }
 
     // Mapear status code para nome do erro
     const errorName = this.getErrorName(status);
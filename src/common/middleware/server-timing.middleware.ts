@@ -0,0 +1,44 @@
+import { Injectable, NestMiddleware } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { NextFunction, Request, Response } from 'express';
+
+import {
+  formatServerTiming,
+  getRequestTiming,
+  runWithRequestTiming,
+} from '../context/request-timing';
+
+/**
+ * Com o perfilamento ligado (`PRISMA_PROFILING=true`), agrega o tempo de banco
+ * e de chamadas externas da requisição e devolve no header `Server-Timing`.
+ */
+@Injectable()
+export class ServerTimingMiddleware implements NestMiddleware {
+  private readonly enabled: boolean;
+
+  constructor(private readonly configService: ConfigService) {
+    this.enabled = this.configService.get<boolean>('profiling.enabled') ?? false;
+  }
+
+  use(req: Request, res: Response, next: NextFunction) {
+    if (!this.enabled) {
+      next();
+      return;
+    }
+
+    runWithRequestTiming(() => {
+      const timing = getRequestTiming();
+      const writeHead = res.writeHead;
+
+      // O header precisa entrar antes do envio dos headers, inclusive em respostas em stream
+      res.writeHead = function (this: Response, ...args: any[]) {
+        if (timing && !this.headersSent) {
+          this.setHeader('Server-Timing', formatServerTiming(timing));
+        }
+        return writeHead.apply(this, args as any);
+      } as typeof res.writeHead;
+
+      next();
+    });
+  }
+}
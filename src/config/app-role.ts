@@ -0,0 +1,27 @@
+export const APP_ROLES = ['api', 'worker', 'scheduler', 'all'] as const;
+
+export type AppRole = (typeof APP_ROLES)[number];
+
+/**
+ * Papel do processo (`APP_ROLE`):
+ * - `api`: HTTP, WebSocket e webhooks
+ * - `worker`: consumidor da fila de campanhas
+ * - `scheduler`: jobs agendados (com eleição de líder)
+ * - `all`: tudo no mesmo processo (padrão, como antes da separação)
+ */
+export function resolveAppRole(value: string | undefined): AppRole {
+  const role = (value ?? 'all').trim().toLowerCase();
+  return (APP_ROLES as readonly string[]).includes(role) ? (role as AppRole) : 'all';
+}
+
+export function runsApi(role: AppRole): boolean {
+  return role === 'api' || role === 'all';
+}
+
+export function runsWorker(role: AppRole): boolean {
+  return role === 'worker' || role === 'all';
+}
+
+export function runsScheduler(role: AppRole): boolean {
+  return role === 'scheduler' || role === 'all';
+}
@@ -28,9 +28,113 @@ export default () => ({
   bullmq: {
     prefix: process.env.BULLMQ_PREFIX ?? 'elsehu',
   },
+  campaigns: {
+    batchSize: parseInt(process.env.CAMPAIGN_BATCH_SIZE ?? '50', 10),
+    maxBatchDurationMs: parseInt(
+      process.env.CAMPAIGN_BATCH_MAX_DURATION_MS ?? '60000',
+      10,
+    ),
+    sendWindow: process.env.CAMPAIGN_SEND_WINDOW ?? '',
+    timeZone: process.env.CAMPAIGN_TIMEZONE ?? 'America/Sao_Paulo',
+    launchLookaheadMinutes: parseInt(
+      process.env.CAMPAIGN_LAUNCH_LOOKAHEAD_MINUTES ?? '60',
+      10,
+    ),
+    instanceStaggerSeconds: parseInt(
+      process.env.CAMPAIGN_INSTANCE_STAGGER_SECONDS ?? '300',
+      10,
+    ),
+    launchMaxLateMinutes: parseInt(
+      process.env.CAMPAIGN_LAUNCH_MAX_LATE_MINUTES ?? '1440',
+      10,
+    ),
+  },
   storage: {
     basePath: process.env.STORAGE_PATH ?? './storage',
     mediaRetentionDays: parseInt(process.env.MEDIA_RETENTION_DAYS ?? '3', 10),
+    maxMediaBytes: parseInt(process.env.MEDIA_MAX_BYTES ?? '67108864', 10),
+    mediaCacheMaxAgeSeconds: parseInt(
+      process.env.MEDIA_CACHE_MAX_AGE_SECONDS ?? '86400',
+      10,
+    ),
+    mediaSweep: {
+      batchSize: parseInt(process.env.MEDIA_SWEEP_BATCH_SIZE ?? '500', 10),
+      concurrency: parseInt(process.env.MEDIA_SWEEP_CONCURRENCY ?? '16', 10),
+      maxRunMs: parseInt(process.env.MEDIA_SWEEP_MAX_RUN_MS ?? '600000', 10),
+      orphanGraceMinutes: parseInt(
+        process.env.MEDIA_ORPHAN_GRACE_MINUTES ?? '60',
+        10,
+      ),
+    },
+  },
+  providerHttp: {
+    timeoutMs: parseInt(process.env.PROVIDER_HTTP_TIMEOUT_MS ?? '30000', 10),
+    maxSockets: parseInt(process.env.PROVIDER_HTTP_MAX_SOCKETS ?? '50', 10),
+    maxRetries: parseInt(process.env.PROVIDER_HTTP_MAX_RETRIES ?? '2', 10),
+    retryBaseDelayMs: parseInt(
+      process.env.PROVIDER_HTTP_RETRY_BASE_DELAY_MS ?? '500',
+      10,
+    ),
+    breakerThreshold: parseInt(
+      process.env.PROVIDER_HTTP_BREAKER_THRESHOLD ?? '5',
+      10,
+    ),
+    breakerCooldownMs: parseInt(
+      process.env.PROVIDER_HTTP_BREAKER_COOLDOWN_MS ?? '30000',
+      10,
+    ),
+  },
+  messageStatus: {
+    flushIntervalMs: parseInt(process.env.MESSAGE_STATUS_FLUSH_MS ?? '1000', 10),
+    maxBatchSize: parseInt(process.env.MESSAGE_STATUS_BATCH_SIZE ?? '1000', 10),
+  },
+  assignment: {
+    defaultCapacity: parseInt(process.env.ASSIGNMENT_DEFAULT_CAPACITY ?? '20', 10),
+    reconcileIntervalMs: parseInt(
+      process.env.ASSIGNMENT_RECONCILE_MS ?? '300000',
+      10,
+    ),
+  },
+  instanceHealth: {
+    pollIntervalMs: parseInt(
+      process.env.INSTANCE_HEALTH_POLL_MS ?? '60000',
+      10,
+    ),
+  },
+  metrics: {
+    token: process.env.METRICS_TOKEN,
+  },
+  catalogCache: {
+    ttlMs: parseInt(process.env.CATALOG_CACHE_TTL_MS ?? '300000', 10),
+    maxEntries: parseInt(process.env.CATALOG_CACHE_MAX_ENTRIES ?? '1000', 10),
+  },
+  messageArchive: {
+    afterDays: parseInt(process.env.MESSAGE_ARCHIVE_AFTER_DAYS ?? '30', 10),
+    batchSize: parseInt(process.env.MESSAGE_ARCHIVE_BATCH_SIZE ?? '100', 10),
+  },
+  dashboard: {
+    cacheTtlMs: parseInt(process.env.DASHBOARD_CACHE_TTL_MS ?? '15000', 10),
+    pushDebounceMs: parseInt(process.env.DASHBOARD_PUSH_DEBOUNCE_MS ?? '2000', 10),
+  },
+  scheduler: {
+    leaderTtlMs: parseInt(process.env.SCHEDULER_LEADER_TTL_MS ?? '30000', 10),
+  },
+  websocket: {
+    presenceFlushMs: parseInt(process.env.WS_PRESENCE_FLUSH_MS ?? '1000', 10),
+    typingTimeoutMs: parseInt(process.env.WS_TYPING_TIMEOUT_MS ?? '5000', 10),
+    legacyPresenceEvents: process.env.WS_LEGACY_PRESENCE_EVENTS !== 'false',
+  },
+  logging: {
+    level: process.env.LOG_LEVEL || undefined,
+    buffered: process.env.LOG_BUFFERED !== 'false',
+    flushIntervalMs: parseInt(process.env.LOG_FLUSH_INTERVAL_MS ?? '250', 10),
+    maxBufferedEntries: parseInt(process.env.LOG_BUFFER_MAX_ENTRIES ?? '1000', 10),
+    sampleRates: process.env.LOG_SAMPLE_RATES ?? '',
+    maxPerSecond: parseInt(process.env.LOG_RATE_LIMIT_PER_SECOND ?? '200', 10),
+  },
+  profiling: {
+    enabled: process.env.PRISMA_PROFILING === 'true',
+    slowQueryMs: parseInt(process.env.PRISMA_SLOW_QUERY_MS ?? '200', 10),
   },
   cors: {
     allowedOrigins: (process.env.ALLOWED_ORIGINS ?? '')
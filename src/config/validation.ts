@@ -5,6 +5,7 @@ export const validationSchema = Joi.object({
     .valid('development', 'production', 'test')
     .default('development'),
   PORT: Joi.number().default(3000),
+  APP_ROLE: Joi.string().valid('api', 'worker', 'scheduler', 'all').default('all'),
   DATABASE_URL: Joi.string().uri().required(),
   DB_USER: Joi.string().default('postgres'),
   DB_PASSWORD: Joi.string().default('postgres'),
@@ -19,7 +20,53 @@ export const validationSchema = Joi.object({
   RATE_LIMIT_TTL: Joi.number().default(60),
   RATE_LIMIT_MAX: Joi.number().default(30),
   BULLMQ_PREFIX: Joi.string().default('elsehu'),
+  CAMPAIGN_BATCH_SIZE: Joi.number().min(1).default(50),
+  CAMPAIGN_BATCH_MAX_DURATION_MS: Joi.number().min(1000).default(60000),
+  CAMPAIGN_SEND_WINDOW: Joi.string()
+    .pattern(/^[1-7](-[1-7])?(,[1-7](-[1-7])?)*\s+\d{2}:\d{2}-\d{2}:\d{2}$/)
+    .allow('')
+    .default(''),
+  CAMPAIGN_TIMEZONE: Joi.string().default('America/Sao_Paulo'),
+  CAMPAIGN_LAUNCH_LOOKAHEAD_MINUTES: Joi.number().min(1).default(60),
+  CAMPAIGN_INSTANCE_STAGGER_SECONDS: Joi.number().min(0).default(300),
+  CAMPAIGN_LAUNCH_MAX_LATE_MINUTES: Joi.number().min(1).default(1440),
   STORAGE_PATH: Joi.string().default('./storage'),
   MEDIA_RETENTION_DAYS: Joi.number().min(1).default(3),
+  MEDIA_MAX_BYTES: Joi.number().min(1024).default(67108864),
+  MEDIA_CACHE_MAX_AGE_SECONDS: Joi.number().min(0).default(86400),
+  MEDIA_SWEEP_BATCH_SIZE: Joi.number().min(1).default(500),
+  MEDIA_SWEEP_CONCURRENCY: Joi.number().min(1).default(16),
+  MEDIA_SWEEP_MAX_RUN_MS: Joi.number().min(10000).default(600000),
+  MEDIA_ORPHAN_GRACE_MINUTES: Joi.number().min(5).default(60),
+  PROVIDER_HTTP_TIMEOUT_MS: Joi.number().min(1000).default(30000),
+  PROVIDER_HTTP_MAX_SOCKETS: Joi.number().min(1).default(50),
+  PROVIDER_HTTP_MAX_RETRIES: Joi.number().min(0).default(2),
+  PROVIDER_HTTP_RETRY_BASE_DELAY_MS: Joi.number().min(0).default(500),
+  PROVIDER_HTTP_BREAKER_THRESHOLD: Joi.number().min(1).default(5),
+  PROVIDER_HTTP_BREAKER_COOLDOWN_MS: Joi.number().min(1000).default(30000),
+  MESSAGE_STATUS_FLUSH_MS: Joi.number().min(100).default(1000),
+  MESSAGE_STATUS_BATCH_SIZE: Joi.number().min(1).default(1000),
+  ASSIGNMENT_DEFAULT_CAPACITY: Joi.number().min(1).default(20),
+  ASSIGNMENT_RECONCILE_MS: Joi.number().min(10000).default(300000),
+  INSTANCE_HEALTH_POLL_MS: Joi.number().min(5000).default(60000),
+  METRICS_TOKEN: Joi.string().allow('', null),
+  CATALOG_CACHE_TTL_MS: Joi.number().min(1000).default(300000),
+  CATALOG_CACHE_MAX_ENTRIES: Joi.number().min(10).default(1000),
+  MESSAGE_ARCHIVE_AFTER_DAYS: Joi.number().min(1).default(30),
+  MESSAGE_ARCHIVE_BATCH_SIZE: Joi.number().min(1).default(100),
+  DASHBOARD_CACHE_TTL_MS: Joi.number().min(1000).default(15000),
+  DASHBOARD_PUSH_DEBOUNCE_MS: Joi.number().min(100).default(2000),
+  SCHEDULER_LEADER_TTL_MS: Joi.number().min(3000).default(30000),
+  WS_PRESENCE_FLUSH_MS: Joi.number().min(100).default(1000),
+  WS_TYPING_TIMEOUT_MS: Joi.number().min(1000).default(5000),
+  WS_LEGACY_PRESENCE_EVENTS: Joi.boolean().default(true),
+  LOG_LEVEL: Joi.string().valid('error', 'warn', 'info', 'verbose', 'debug').allow('', null),
+  LOG_BUFFERED: Joi.boolean().default(true),
+  LOG_FLUSH_INTERVAL_MS: Joi.number().min(10).default(250),
+  LOG_BUFFER_MAX_ENTRIES: Joi.number().min(1).default(1000),
+  LOG_SAMPLE_RATES: Joi.string().allow('', null),
+  LOG_RATE_LIMIT_PER_SECOND: Joi.number().min(0).default(200),
+  PRISMA_PROFILING: Joi.boolean().default(false),
+  PRISMA_SLOW_QUERY_MS: Joi.number().min(1).default(200),
   ALLOWED_ORIGINS: Joi.string().allow('', null),
 });
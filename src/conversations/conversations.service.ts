@@ -6,6 +6,8 @@ import {
 import { Prisma, ChatStatus, MessageDirection } from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { OperatorAssignmentService } from '../assignment/operator-assignment.service';
+import { DashboardEventsService } from '../dashboard/dashboard-events.service';
 import { CreateConversationDto } from './dto/create-conversation.dto';
 import { AssignConversationDto } from './dto/assign-conversation.dto';
 import { CloseConversationDto } from './dto/close-conversation.dto';
@@ -14,7 +16,11 @@ import { ListConversationsQueryDto } from './dto/list-conversations-query.dto';
 
 @Injectable()
 export class ConversationsService {
-  constructor(private readonly prisma: PrismaService) {}
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly assignment: OperatorAssignmentService,
+    private readonly dashboardEvents: DashboardEventsService,
+  ) {}
 
   async create(
     payload: CreateConversationDto,
@@ -63,6 +69,7 @@ export class ConversationsService {
         operator: true,
       },
     });
+    this.dashboardEvents.markChanged();
 
     return this.toResponse(conversation);
   }
@@ -106,6 +113,13 @@ export class ConversationsService {
             orderBy: { createdAt: 'desc' },
             take: 1,
           },
+          // Última mensagem de conversas arquivadas (desnecessário listando só abertas)
+          ...(query.status !== ChatStatus.OPEN && {
+            archivedMessages: {
+              orderBy: { createdAt: 'desc' as const },
+              take: 1,
+            },
+          }),
         },
         orderBy: { startTime: 'desc' },
       }),
@@ -134,6 +148,10 @@ export class ConversationsService {
           orderBy: { createdAt: 'desc' },
           take: 1,
         },
+        archivedMessages: {
+          orderBy: { createdAt: 'desc' },
+          take: 1,
+        },
       },
     });
 
@@ -194,6 +212,12 @@ export class ConversationsService {
       },
     });
 
+    if (conversation.operatorId !== payload.operatorId) {
+      await this.assignment.releaseAssignment(conversation.operatorId);
+      await this.assignment.recordAssignment(payload.operatorId);
+      this.dashboardEvents.markChanged(conversation.operatorId, payload.operatorId);
+    }
+
     return this.toResponse(updated);
   }
 
@@ -265,6 +289,9 @@ export class ConversationsService {
         status: ChatStatus.CLOSED,
       },
     });
+
+    await this.assignment.releaseAssignment(conversation.operatorId);
+    this.dashboardEvents.markChanged(conversation.operatorId ?? userId);
   }
 
   async getQueuedConversations() {
@@ -344,8 +371,11 @@ export class ConversationsService {
 
   private toResponse(conversation: any): ConversationResponseDto {
     const messageCount =
-      conversation._count?.messages ?? conversation.messages?.length ?? 0;
-    const lastMessage = conversation.messages?.[0];
+      conversation._count?.messages ??
+      (conversation.messages?.length || conversation.archivedMessages?.length) ??
+      0;
+    const lastMessage =
+      conversation.messages?.[0] ?? conversation.archivedMessages?.[0];
 
     return {
       id: conversation.id,
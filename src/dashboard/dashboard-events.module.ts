@@ -0,0 +1,10 @@
+import { Global, Module } from '@nestjs/common';
+
+import { DashboardEventsService } from './dashboard-events.service';
+
+@Global()
+@Module({
+  providers: [DashboardEventsService],
+  exports: [DashboardEventsService],
+})
+export class DashboardEventsModule {}
@@ -0,0 +1,79 @@
+import { Injectable, Logger, OnModuleDestroy } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+
+import { RedisService } from '../redis/redis.service';
+
+export const GLOBAL_DASHBOARD_SCOPE = 'global';
+
+export function dashboardScope(userId?: string, userRole?: string): string {
+  return userRole === 'OPERATOR' && userId
+    ? `operator:${userId}`
+    : GLOBAL_DASHBOARD_SCOPE;
+}
+
+/**
+ * Sinaliza que os números do dashboard mudaram (mensagem, nova conversa,
+ * atribuição, finalização). As marcações são agrupadas por uma janela curta e
+ * publicadas no Redis, de onde as réplicas da API invalidam os snapshots e
+ * empurram os novos valores pelo ChatGateway. Funciona em qualquer papel do
+ * processo, inclusive no scheduler.
+ */
+@Injectable()
+export class DashboardEventsService implements OnModuleDestroy {
+  private readonly logger = new Logger(DashboardEventsService.name);
+  private readonly debounceMs: number;
+  readonly channel: string;
+  private pendingScopes = new Set<string>();
+  private flushTimer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private readonly redis: RedisService,
+    private readonly configService: ConfigService,
+  ) {
+    this.channel = this.redis.key('dashboard', 'changed');
+    this.debounceMs =
+      this.configService.get<number>('dashboard.pushDebounceMs') ?? 2000;
+  }
+
+  async onModuleDestroy() {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    await this.flush();
+  }
+
+  /**
+   * Marca o dashboard global e o dos operadores informados como desatualizados.
+   */
+  markChanged(...operatorIds: (string | null | undefined)[]): void {
+    this.pendingScopes.add(GLOBAL_DASHBOARD_SCOPE);
+    for (const operatorId of operatorIds) {
+      if (operatorId) {
+        this.pendingScopes.add(`operator:${operatorId}`);
+      }
+    }
+
+    if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => {
+        this.flushTimer = null;
+        void this.flush();
+      }, this.debounceMs);
+    }
+  }
+
+  private async flush() {
+    if (this.pendingScopes.size === 0) {
+      return;
+    }
+
+    const scopes = Array.from(this.pendingScopes);
+    this.pendingScopes = new Set();
+
+    try {
+      await this.redis.publish(this.channel, scopes.join(','));
+    } catch (error: any) {
+      this.logger.warn(`Falha ao publicar alteração do dashboard: ${error.message}`);
+    }
+  }
+}
@@ -2,10 +2,11 @@ import { Module } from '@nestjs/common';
 
 import { DashboardController } from './dashboard.controller';
 import { DashboardService } from './dashboard.service';
+import { WebsocketsModule } from '../websockets/websockets.module';
 
 @Module({
+  imports: [WebsocketsModule],
   controllers: [DashboardController],
   providers: [DashboardService],
 })
 export class DashboardModule {}
-
@@ -1,13 +1,195 @@
-import { Injectable } from '@nestjs/common';
+import {
+  Injectable,
+  Logger,
+  OnModuleDestroy,
+  OnModuleInit,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
 import { Prisma } from '@prisma/client';
+import { Redis } from 'ioredis';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { RedisService } from '../redis/redis.service';
+import { ChatGateway } from '../websockets/chat.gateway';
+import {
+  DashboardEventsService,
+  dashboardScope,
+} from './dashboard-events.service';
 
+const DEFAULT_RECENT_LIMIT = 5;
+const SNAPSHOT_KINDS = [
+  'stats',
+  'weekly-performance',
+  `recent-conversations:${DEFAULT_RECENT_LIMIT}`,
+];
+
+type WeeklyRow = {
+  day: string;
+  closed: number;
+  withResponse: number;
+  responseTimeSum: number;
+};
+
+/**
+ * Números do dashboard por escopo (`global` para admin/supervisor,
+ * `operator:<id>` para operadores).
+ *
+ * Cada escopo tem um snapshot no Redis com TTL curto, compartilhado por todas
+ * as réplicas e calculado uma única vez por processo mesmo com vários
+ * dashboards abertos. Mensagens, atribuições e finalizações (via
+ * `DashboardEventsService`) invalidam os snapshots afetados, que são
+ * recalculados e enviados pelo ChatGateway (`dashboard:updated`) para quem
+ * estiver inscrito no escopo.
+ */
 @Injectable()
-export class DashboardService {
-  constructor(private readonly prisma: PrismaService) {}
+export class DashboardService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(DashboardService.name);
+  private readonly ttlMs: number;
+  private readonly computing = new Map<string, Promise<unknown>>();
+  private readonly generations = new Map<string, number>();
+  private subscriber: Redis | null = null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly redis: RedisService,
+    private readonly chatGateway: ChatGateway,
+    private readonly dashboardEvents: DashboardEventsService,
+    private readonly configService: ConfigService,
+  ) {
+    this.ttlMs = this.configService.get<number>('dashboard.cacheTtlMs') ?? 15000;
+  }
+
+  onModuleInit() {
+    this.subscriber = this.redis.duplicate();
+    this.subscriber.on('error', (error) =>
+      this.logger.warn(`Erro no canal do dashboard: ${error.message}`),
+    );
+    this.subscriber.on('message', (_channel, message: string) => {
+      void this.refreshScopes(message.split(',').filter(Boolean));
+    });
+    void this.subscriber
+      .subscribe(this.dashboardEvents.channel)
+      .catch((error) =>
+        this.logger.warn(`Falha ao assinar alterações do dashboard: ${error.message}`),
+      );
+  }
+
+  async onModuleDestroy() {
+    await this.subscriber?.quit().catch(() => this.subscriber?.disconnect());
+    this.subscriber = null;
+  }
+
+  getStats(userId?: string, userRole?: string) {
+    const scope = dashboardScope(userId, userRole);
+    return this.snapshot(scope, 'stats', () => this.computeStats(scope));
+  }
+
+  getRecentConversations(
+    userId?: string,
+    userRole?: string,
+    limit = DEFAULT_RECENT_LIMIT,
+  ) {
+    const scope = dashboardScope(userId, userRole);
+    if (limit !== DEFAULT_RECENT_LIMIT) {
+      return this.computeRecentConversations(scope, limit);
+    }
+    return this.snapshot(scope, `recent-conversations:${limit}`, () =>
+      this.computeRecentConversations(scope, limit),
+    );
+  }
+
+  getWeeklyPerformance(userId?: string, userRole?: string) {
+    const scope = dashboardScope(userId, userRole);
+    return this.snapshot(scope, 'weekly-performance', () =>
+      this.computeWeeklyPerformance(scope),
+    );
+  }
+
+  /**
+   * Invalida os escopos alterados e, havendo inscritos neste processo,
+   * recalcula e envia os novos números.
+   */
+  private async refreshScopes(scopes: string[]) {
+    for (const scope of scopes) {
+      try {
+        this.generations.set(scope, (this.generations.get(scope) ?? 0) + 1);
+        await this.redis.del(
+          ...SNAPSHOT_KINDS.map((kind) => this.redis.key('dashboard', scope, kind)),
+        );
 
-  async getStats(userId?: string, userRole?: string) {
+        if (!(await this.chatGateway.hasDashboardSubscribers(scope))) {
+          continue;
+        }
+
+        const [stats, recentConversations, weeklyPerformance] = await Promise.all([
+          this.snapshot(scope, 'stats', () => this.computeStats(scope)),
+          this.snapshot(scope, `recent-conversations:${DEFAULT_RECENT_LIMIT}`, () =>
+            this.computeRecentConversations(scope, DEFAULT_RECENT_LIMIT),
+          ),
+          this.snapshot(scope, 'weekly-performance', () =>
+            this.computeWeeklyPerformance(scope),
+          ),
+        ]);
+
+        this.chatGateway.emitDashboardUpdate(scope, {
+          stats,
+          recentConversations,
+          weeklyPerformance,
+        });
+      } catch (error: any) {
+        this.logger.error(`Erro ao atualizar dashboard ${scope}: ${error.message}`);
+      }
+    }
+  }
+
+  private async snapshot<T>(
+    scope: string,
+    kind: string,
+    compute: () => Promise<T>,
+  ): Promise<T> {
+    const key = this.redis.key('dashboard', scope, kind);
+
+    try {
+      const cached = await this.redis.get(key);
+      if (cached) {
+        return JSON.parse(cached) as T;
+      }
+    } catch (error: any) {
+      this.logger.warn(`Cache do dashboard indisponível: ${error.message}`);
+    }
+
+    const pending = this.computing.get(key);
+    if (pending) {
+      return pending as Promise<T>;
+    }
+
+    const generation = this.generations.get(scope) ?? 0;
+    const task = compute()
+      .then(async (value) => {
+        // Não grava um snapshot calculado antes de uma invalidação
+        if ((this.generations.get(scope) ?? 0) === generation) {
+          await this.redis
+            .set(key, JSON.stringify(value), 'PX', this.ttlMs)
+            .catch(() => undefined);
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.computing.get(key) === task) {
+          this.computing.delete(key);
+        }
+      });
+
+    this.computing.set(key, task);
+    return task;
+  }
+
+  private operatorIdFromScope(scope: string): string | undefined {
+    return scope.startsWith('operator:') ? scope.slice('operator:'.length) : undefined;
+  }
+
+  private async computeStats(scope: string) {
+    const operatorId = this.operatorIdFromScope(scope);
     const today = new Date();
     today.setHours(0, 0, 0, 0);
     const tomorrow = new Date(today);
@@ -17,8 +199,8 @@ export class DashboardService {
     const activeConversationsWhere: Prisma.ConversationWhereInput = {
       status: 'OPEN',
     };
-    if (userRole === 'OPERATOR') {
-      activeConversationsWhere.operatorId = userId;
+    if (operatorId) {
+      activeConversationsWhere.operatorId = operatorId;
     }
     const activeConversations = await this.prisma.conversation.count({
       where: activeConversationsWhere,
@@ -31,54 +213,46 @@ export class DashboardService {
         lt: tomorrow,
       },
     };
-    if (userRole === 'OPERATOR') {
+    if (operatorId) {
       messagesTodayWhere.conversation = {
-        operatorId: userId,
+        operatorId,
       };
     }
     const totalMessages = await this.prisma.message.count({
       where: messagesTodayWhere,
     });
 
-    // Taxa de Resposta e Tempo Médio de Resposta
+    // Taxa de Resposta e Tempo Médio de Resposta, agregados no banco
     const finishedConversationsWhere: Prisma.FinishedConversationWhereInput = {};
-    if (userRole === 'OPERATOR') {
-      finishedConversationsWhere.operatorId = userId;
+    if (operatorId) {
+      finishedConversationsWhere.operatorId = operatorId;
     }
 
-    const finishedConversations = await this.prisma.finishedConversation.findMany({
-      where: finishedConversationsWhere,
-      select: {
-        avgResponseTimeOperator: true,
-        avgResponseTimeUser: true,
-      },
-    });
+    const [totals, withOperatorResponse] = await Promise.all([
+      this.prisma.finishedConversation.aggregate({
+        where: finishedConversationsWhere,
+        _count: { _all: true },
+        _avg: { avgResponseTimeOperator: true },
+      }),
+      this.prisma.finishedConversation.count({
+        where: {
+          ...finishedConversationsWhere,
+          avgResponseTimeOperator: { gt: 0 },
+        },
+      }),
+    ]);
 
-    // Calcular taxa de resposta (conversas com resposta do operador / total)
     // Taxa de resposta = (conversas onde operador respondeu / total de conversas) * 100
-    const conversationsWithOperatorResponse = finishedConversations.filter(
-      (c) => c.avgResponseTimeOperator !== null && c.avgResponseTimeOperator > 0,
-    ).length;
-    const totalFinishedConversations = finishedConversations.length;
+    const totalFinishedConversations = totals._count._all;
     const responseRate =
       totalFinishedConversations > 0
-        ? Math.round(
-            (conversationsWithOperatorResponse / totalFinishedConversations) * 100,
-          )
+        ? Math.round((withOperatorResponse / totalFinishedConversations) * 100)
         : 0;
 
-    // Calcular tempo médio de resposta
-    const responseTimes = finishedConversations
-      .filter((c) => c.avgResponseTimeOperator !== null)
-      .map((c) => c.avgResponseTimeOperator ?? 0);
-
-    const averageResponseTime =
-      responseTimes.length > 0
-        ? Math.round(
-            responseTimes.reduce((sum, time) => sum + time, 0) /
-              responseTimes.length,
-          )
-        : 0;
+    // Média entre as conversas com tempo de resposta registrado
+    const averageResponseTime = Math.round(
+      totals._avg.avgResponseTimeOperator ?? 0,
+    );
 
     return {
       activeConversations,
@@ -88,13 +262,14 @@ export class DashboardService {
     };
   }
 
-  async getRecentConversations(userId?: string, userRole?: string, limit = 5) {
+  private async computeRecentConversations(scope: string, limit: number) {
+    const operatorId = this.operatorIdFromScope(scope);
     const where: Prisma.ConversationWhereInput = {
       status: 'OPEN',
     };
 
-    if (userRole === 'OPERATOR') {
-      where.operatorId = userId;
+    if (operatorId) {
+      where.operatorId = operatorId;
     }
 
     const conversations = await this.prisma.conversation.findMany({
@@ -126,104 +301,58 @@ export class DashboardService {
     });
   }
 
-  async getWeeklyPerformance(userId?: string, userRole?: string) {
+  private async computeWeeklyPerformance(scope: string) {
+    const operatorId = this.operatorIdFromScope(scope);
     const today = new Date();
     const startOfWeek = new Date(today);
     startOfWeek.setDate(today.getDate() - 7);
     startOfWeek.setHours(0, 0, 0, 0);
 
-    const where: Prisma.FinishedConversationWhereInput = {
-      endTime: {
-        gte: startOfWeek,
-      },
-    };
+    // Agrupado por dia (UTC) no banco, em vez de carregar as conversas da semana
+    const rows = await this.prisma.$queryRaw<WeeklyRow[]>`
+      SELECT
+        to_char("endTime"::date, 'YYYY-MM-DD') AS "day",
+        count(*)::int AS "closed",
+        count(*) FILTER (WHERE "avgResponseTimeOperator" > 0)::int AS "withResponse",
+        coalesce(sum("avgResponseTimeOperator"), 0)::float AS "responseTimeSum"
+      FROM "finished_conversations"
+      WHERE "endTime" >= ${startOfWeek}
+        ${operatorId ? Prisma.sql`AND "operatorId" = ${operatorId}` : Prisma.empty}
+      GROUP BY 1
+    `;
+    const rowsByDay = new Map(rows.map((row) => [row.day, row]));
 
-    if (userRole === 'OPERATOR') {
-      where.operatorId = userId;
-    }
-
-    const finishedConversations = await this.prisma.finishedConversation.findMany({
-      where,
-      select: {
-        avgResponseTimeOperator: true,
-        avgResponseTimeUser: true,
-        endTime: true,
-      },
-    });
-
-    // Agrupar por dia
-    const dailyStats: Record<
-      string,
-      {
-        date: string;
-        responseRate: number;
-        averageResponseTime: number;
-        closedConversations: number;
-      }
-    > = {};
+    // Últimos 7 dias, incluindo os dias sem conversas finalizadas
+    const weeklyData: {
+      date: string;
+      responseRate: number;
+      averageResponseTime: number;
+      closedConversations: number;
+    }[] = [];
 
-    // Inicializar últimos 7 dias
     for (let i = 6; i >= 0; i--) {
       const date = new Date(today);
       date.setDate(date.getDate() - i);
       date.setHours(0, 0, 0, 0);
       const dateKey = date.toISOString().split('T')[0];
-      dailyStats[dateKey] = {
-        date: dateKey,
-        responseRate: 0,
-        averageResponseTime: 0,
-        closedConversations: 0,
-      };
-    }
-
-    // Processar conversas finalizadas
-    finishedConversations.forEach((conv) => {
-      const dateKey = new Date(conv.endTime).toISOString().split('T')[0];
-      if (dailyStats[dateKey]) {
-        dailyStats[dateKey].closedConversations += 1;
-        if (conv.avgResponseTimeOperator !== null) {
-          dailyStats[dateKey].averageResponseTime +=
-            conv.avgResponseTimeOperator;
-        }
-      }
-    });
-
-    // Agrupar conversas por dia para calcular taxa de resposta corretamente
-    const conversationsByDay: Record<string, any[]> = {};
-    finishedConversations.forEach((conv) => {
-      const dateKey = new Date(conv.endTime).toISOString().split('T')[0];
-      if (!conversationsByDay[dateKey]) {
-        conversationsByDay[dateKey] = [];
-      }
-      conversationsByDay[dateKey].push(conv);
-    });
-
-    // Calcular médias
-    const weeklyData = Object.values(dailyStats).map((day) => {
-      const conversations = day.closedConversations;
-      const dayConversations = conversationsByDay[day.date] || [];
-      
-      const avgTime =
-        conversations > 0
-          ? Math.round(day.averageResponseTime / conversations)
-          : 0;
-      
-      // Taxa de resposta = conversas com resposta do operador / total
-      const withResponse = dayConversations.filter(
-        (c) => c.avgResponseTimeOperator !== null && c.avgResponseTimeOperator > 0,
-      ).length;
-      const responseRate =
-        conversations > 0 ? Math.round((withResponse / conversations) * 100) : 0;
+      const row = rowsByDay.get(dateKey);
+      const conversations = row?.closed ?? 0;
 
-      return {
-        date: day.date,
-        responseRate: responseRate,
-        averageResponseTime: avgTime,
+      weeklyData.push({
+        date: dateKey,
+        // Taxa de resposta = conversas com resposta do operador / total
+        responseRate:
+          conversations > 0
+            ? Math.round(((row?.withResponse ?? 0) / conversations) * 100)
+            : 0,
+        averageResponseTime:
+          conversations > 0
+            ? Math.round((row?.responseTimeSum ?? 0) / conversations)
+            : 0,
         closedConversations: conversations,
-      };
-    });
+      });
+    }
 
     return weeklyData;
   }
 }
-
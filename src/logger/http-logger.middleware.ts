@@ -1,20 +1,29 @@
 import { Injectable, NestMiddleware } from '@nestjs/common';
 import { Request, Response, NextFunction } from 'express';
 import { LoggerService } from './logger.service';
+import { MetricsService } from '../metrics/metrics.service';
 
 @Injectable()
 export class HttpLoggerMiddleware implements NestMiddleware {
-  constructor(private readonly logger: LoggerService) {}
+  constructor(
+    private readonly logger: LoggerService,
+    private readonly metrics: MetricsService,
+  ) {}
 
   use(req: Request, res: Response, next: NextFunction) {
     const { method, originalUrl } = req;
     const startTime = Date.now();
+    const stopTimer = this.metrics.httpRequestDuration.startTimer({ method });
 
     res.on('finish', () => {
       const { statusCode } = res;
       const duration = Date.now() - startTime;
       const userId = (req as any).user?.userId;
 
+      // Rota do Express (ex.: /api/messages/:id) para não explodir a cardinalidade
+      const route = req.route?.path ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+      stopTimer({ route, status: statusCode });
+
       this.logger.logRequest(method, originalUrl, statusCode, duration, userId);
     });
 
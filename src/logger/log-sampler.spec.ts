@@ -0,0 +1,34 @@
+import { LogSampler, parseSampleRates } from './log-sampler';
+
+describe('LogSampler', () => {
+  it('deve interpretar taxas por contexto ignorando entradas inválidas', () => {
+    expect(parseSampleRates('CampaignsProcessor=0.1, WebhooksService = 2,foo,bar=x')).toEqual({
+      CampaignsProcessor: 0.1,
+      WebhooksService: 1,
+    });
+    expect(parseSampleRates(undefined)).toEqual({});
+  });
+
+  it('deve amostrar info/debug mas nunca warn/error', () => {
+    const sampler = new LogSampler({ MessagesService: 0.25 }, 0, () => 0.5);
+
+    expect(sampler.shouldLog('MessagesService', 'info')).toBe(false);
+    expect(sampler.shouldLog('MessagesService', 'debug')).toBe(false);
+    expect(sampler.shouldLog('MessagesService', 'warn')).toBe(true);
+    expect(sampler.shouldLog('MessagesService', 'error')).toBe(true);
+    expect(sampler.shouldLog('OutroContexto', 'info')).toBe(true);
+  });
+
+  it('deve limitar logs por segundo por contexto e contar os suprimidos', () => {
+    const sampler = new LogSampler({}, 2);
+
+    expect(sampler.shouldLog('WebhooksService', 'error', 0)).toBe(true);
+    expect(sampler.shouldLog('WebhooksService', 'info', 10)).toBe(true);
+    expect(sampler.shouldLog('WebhooksService', 'info', 20)).toBe(false);
+    expect(sampler.shouldLog('AuthService', 'info', 20)).toBe(true);
+    expect(sampler.drainSuppressed()).toEqual([['WebhooksService', 1]]);
+    expect(sampler.drainSuppressed()).toEqual([]);
+
+    expect(sampler.shouldLog('WebhooksService', 'info', 1000)).toBe(true);
+  });
+});
@@ -0,0 +1,87 @@
+export type LogLevel = 'error' | 'warn' | 'info' | 'debug' | 'verbose';
+
+// Níveis sujeitos à amostragem; warn e error passam sempre (só pelo limite por segundo)
+const SAMPLED_LEVELS: ReadonlySet<LogLevel> = new Set(['info', 'debug', 'verbose']);
+
+type Window = { startedAt: number; count: number; suppressed: number };
+
+/**
+ * Converte "CampaignsProcessor=0.1,WebhooksService=0.25" em taxas por contexto.
+ * Entradas inválidas são ignoradas e as taxas ficam limitadas a [0, 1].
+ */
+export function parseSampleRates(raw: string | null | undefined): Record<string, number> {
+  const rates: Record<string, number> = {};
+
+  for (const entry of (raw ?? '').split(',')) {
+    const [context, value] = entry.split('=').map((part) => part?.trim());
+    const rate = Number(value);
+    if (context && value && Number.isFinite(rate)) {
+      rates[context] = Math.min(1, Math.max(0, rate));
+    }
+  }
+
+  return rates;
+}
+
+/**
+ * Decide quais logs são emitidos: amostragem por contexto (categoria) para
+ * info/debug/verbose e limite de logs por segundo por contexto para todos os
+ * níveis. O que passa do limite é contado e reportado em `drainSuppressed`.
+ */
+export class LogSampler {
+  private readonly windows = new Map<string, Window>();
+
+  constructor(
+    private readonly sampleRates: Record<string, number>,
+    private readonly maxPerSecond: number,
+    private readonly random: () => number = Math.random,
+  ) {}
+
+  shouldLog(context: string | undefined, level: LogLevel, now = Date.now()): boolean {
+    const key = context ?? '';
+
+    if (SAMPLED_LEVELS.has(level)) {
+      const rate = this.sampleRates[key] ?? 1;
+      if (rate < 1 && this.random() >= rate) {
+        return false;
+      }
+    }
+
+    if (this.maxPerSecond <= 0) {
+      return true;
+    }
+
+    let window = this.windows.get(key);
+    if (!window) {
+      window = { startedAt: now, count: 0, suppressed: 0 };
+      this.windows.set(key, window);
+    } else if (now - window.startedAt >= 1000) {
+      window.startedAt = now;
+      window.count = 0;
+    }
+
+    if (window.count >= this.maxPerSecond) {
+      window.suppressed++;
+      return false;
+    }
+
+    window.count++;
+    return true;
+  }
+
+  /**
+   * Devolve e zera a contagem de logs descartados pelo limite, por contexto.
+   */
+  drainSuppressed(): Array<[string, number]> {
+    const drained: Array<[string, number]> = [];
+
+    for (const [context, window] of this.windows) {
+      if (window.suppressed > 0) {
+        drained.push([context, window.suppressed]);
+        window.suppressed = 0;
+      }
+    }
+
+    return drained;
+  }
+}
@@ -1,29 +1,137 @@
-import { Injectable, LoggerService as NestLoggerService } from '@nestjs/common';
+import {
+  Injectable,
+  LoggerService as NestLoggerService,
+  OnApplicationShutdown,
+} from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
+import { Writable } from 'stream';
 import * as winston from 'winston';
 import DailyRotateFile from 'winston-daily-rotate-file';
 
+import { LogLevel, LogSampler, parseSampleRates } from './log-sampler';
+
+// Prioridade dos níveis (mesma ordem do winston: menor = mais grave)
+const LEVEL_PRIORITY: Record<LogLevel, number> = {
+  error: 0,
+  warn: 1,
+  info: 2,
+  verbose: 4,
+  debug: 5,
+};
+
+/**
+ * Metadado de log. Uma função só é avaliada se o log for de fato emitido,
+ * então serializações caras não custam nada quando o nível está desligado
+ * ou a entrada cai na amostragem.
+ */
+export type LogMeta = Record<string, unknown> | (() => Record<string, unknown>);
+
+type LogEntry = {
+  level: LogLevel;
+  message: unknown;
+  context?: string;
+  params: unknown[];
+  time: number;
+};
+
+// Mesmo formato do timestamp anterior do console (YYYY-MM-DD HH:mm:ss, horário local)
+function consoleTimestamp(value: unknown): string {
+  const date = new Date(value as string);
+  const pad = (part: number) => String(part).padStart(2, '0');
+  return (
+    `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())} ` +
+    `${pad(date.getHours())}:${pad(date.getMinutes())}:${pad(date.getSeconds())}`
+  );
+}
+
+/**
+ * Stream para o transporte de console que junta as linhas de um mesmo tick e
+ * faz uma única escrita no stdout (em pipes o stdout é síncrono no Linux).
+ */
+function createBufferedStdout() {
+  let pending: string[] = [];
+  let scheduled = false;
+
+  const drain = () => {
+    scheduled = false;
+    if (pending.length === 0) {
+      return;
+    }
+    const chunk = pending.join('');
+    pending = [];
+    process.stdout.write(chunk);
+  };
+
+  const stream = new Writable({
+    decodeStrings: false,
+    write(chunk, _encoding, callback) {
+      pending.push(String(chunk));
+      if (!scheduled) {
+        scheduled = true;
+        setImmediate(drain);
+      }
+      callback();
+    },
+  });
+
+  return { stream, drain };
+}
+
+/**
+ * Logger da aplicação (registrado com `app.useLogger`), então todos os
+ * `new Logger(Contexto)` passam por aqui.
+ *
+ * O contexto de cada log é a sua categoria: `LOG_SAMPLE_RATES` define a
+ * amostragem de info/debug por contexto e `LOG_RATE_LIMIT_PER_SECOND` limita
+ * quantos logs cada contexto emite por segundo (os descartados são reportados
+ * em um aviso agregado). Com `LOG_BUFFERED` as entradas aceitas vão para uma
+ * fila e são formatadas e escritas em lote a cada `LOG_FLUSH_INTERVAL_MS`,
+ * fora do caminho da requisição; erros esvaziam a fila na hora.
+ */
 @Injectable()
-export class LoggerService implements NestLoggerService {
+export class LoggerService implements NestLoggerService, OnApplicationShutdown {
   private logger: winston.Logger;
+  private readonly level: LogLevel;
+  private readonly sampler: LogSampler;
+  private readonly buffered: boolean;
+  private readonly maxBufferedEntries: number;
+  private readonly drainConsole: (() => void) | null = null;
+  private queue: LogEntry[] = [];
+  private flushTimer: NodeJS.Timeout | null = null;
 
   constructor(private readonly configService: ConfigService) {
     const env = this.configService.get<string>('env') || 'development';
     const isDevelopment = env === 'development';
 
-    const transports: winston.transport[] = [
-      new winston.transports.Console({
-        format: winston.format.combine(
-          winston.format.timestamp({ format: 'YYYY-MM-DD HH:mm:ss' }),
-          winston.format.colorize({ all: true }),
-          winston.format.printf(({ timestamp, level, message, context, ...meta }) => {
-            const ctx = context ? `[${context}]` : '';
-            const metaStr = Object.keys(meta).length > 0 ? JSON.stringify(meta) : '';
-            return `${timestamp} ${level} ${ctx} ${message} ${metaStr}`;
-          }),
-        ),
+    this.level =
+      this.configService.get<LogLevel>('logging.level') ?? (isDevelopment ? 'debug' : 'info');
+    this.buffered = this.configService.get<boolean>('logging.buffered') ?? true;
+    this.maxBufferedEntries =
+      this.configService.get<number>('logging.maxBufferedEntries') ?? 1000;
+    this.sampler = new LogSampler(
+      parseSampleRates(this.configService.get<string>('logging.sampleRates')),
+      this.configService.get<number>('logging.maxPerSecond') ?? 200,
+    );
+
+    const consoleFormat = winston.format.combine(
+      winston.format.colorize({ all: true }),
+      winston.format.printf(({ timestamp, level, message, context, ...meta }) => {
+        const ctx = context ? `[${context}]` : '';
+        const metaStr = Object.keys(meta).length > 0 ? JSON.stringify(meta) : '';
+        return `${consoleTimestamp(timestamp)} ${level} ${ctx} ${message} ${metaStr}`;
       }),
-    ];
+    );
+
+    let consoleTransport: winston.transport;
+    if (this.buffered) {
+      const { stream, drain } = createBufferedStdout();
+      this.drainConsole = drain;
+      consoleTransport = new winston.transports.Stream({ stream, format: consoleFormat });
+    } else {
+      consoleTransport = new winston.transports.Console({ format: consoleFormat });
+    }
+
+    const transports: winston.transport[] = [consoleTransport];
 
     // Em produção, adicionar logs em arquivo com rotação
     if (!isDevelopment) {
@@ -34,10 +142,7 @@ export class LoggerService implements NestLoggerService {
           zippedArchive: true,
           maxSize: '20m',
           maxFiles: '14d',
-          format: winston.format.combine(
-            winston.format.timestamp(),
-            winston.format.json(),
-          ),
+          format: winston.format.json(),
         }),
         new DailyRotateFile({
           level: 'error',
@@ -46,82 +151,161 @@ export class LoggerService implements NestLoggerService {
           zippedArchive: true,
           maxSize: '20m',
           maxFiles: '30d',
-          format: winston.format.combine(
-            winston.format.timestamp(),
-            winston.format.json(),
-          ),
+          format: winston.format.json(),
         }),
       );
     }
 
     this.logger = winston.createLogger({
-      level: isDevelopment ? 'debug' : 'info',
+      level: this.level,
       format: winston.format.combine(
-        winston.format.timestamp(),
         winston.format.errors({ stack: true }),
         winston.format.json(),
       ),
       defaultMeta: { service: 'elsehu-backend' },
       transports,
     });
+
+    const flushIntervalMs = this.configService.get<number>('logging.flushIntervalMs') ?? 250;
+    this.flushTimer = setInterval(() => this.flush(), flushIntervalMs);
+    this.flushTimer.unref();
+  }
+
+  onApplicationShutdown() {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = null;
+    }
+    this.flush();
+    this.drainConsole?.();
   }
 
-  log(message: string, context?: string) {
-    this.logger.info(message, { context });
+  log(message: any, ...optionalParams: any[]) {
+    this.write('info', message, optionalParams);
   }
 
-  error(message: string, trace?: string, context?: string) {
-    this.logger.error(message, { trace, context });
+  error(message: any, ...optionalParams: any[]) {
+    this.write('error', message, optionalParams);
   }
 
-  warn(message: string, context?: string) {
-    this.logger.warn(message, { context });
+  fatal(message: any, ...optionalParams: any[]) {
+    this.write('error', message, optionalParams);
   }
 
-  debug(message: string, context?: string) {
-    this.logger.debug(message, { context });
+  warn(message: any, ...optionalParams: any[]) {
+    this.write('warn', message, optionalParams);
   }
 
-  verbose(message: string, context?: string) {
-    this.logger.verbose(message, { context });
+  debug(message: any, ...optionalParams: any[]) {
+    this.write('debug', message, optionalParams);
+  }
+
+  verbose(message: any, ...optionalParams: any[]) {
+    this.write('verbose', message, optionalParams);
   }
 
   // Métodos customizados
   logRequest(method: string, url: string, statusCode: number, duration: number, userId?: string) {
-    this.logger.info('HTTP Request', {
-      method,
-      url,
-      statusCode,
-      duration,
-      userId,
-      context: 'HTTP',
-    });
+    this.write('info', 'HTTP Request', [{ method, url, statusCode, duration, userId }, 'HTTP']);
   }
 
   logDatabaseQuery(query: string, duration: number) {
-    this.logger.debug('Database Query', {
-      query,
-      duration,
-      context: 'Database',
-    });
+    this.write('debug', 'Database Query', [{ query, duration }, 'Database']);
   }
 
   logWebSocket(event: string, userId: string, data?: any) {
-    this.logger.info('WebSocket Event', {
-      event,
-      userId,
-      data,
-      context: 'WebSocket',
-    });
+    this.write('info', 'WebSocket Event', [{ event, userId, data }, 'WebSocket']);
   }
 
   logCampaign(campaignId: string, action: string, details?: any) {
-    this.logger.info('Campaign Action', {
-      campaignId,
-      action,
-      details,
-      context: 'Campaign',
-    });
+    this.write('info', 'Campaign Action', [{ campaignId, action, details }, 'Campaign']);
+  }
+
+  /**
+   * Escreve as entradas enfileiradas e o resumo do que foi descartado pelo limite.
+   */
+  flush() {
+    const entries = this.queue;
+    this.queue = [];
+
+    for (const entry of entries) {
+      this.emit(entry);
+    }
+
+    for (const [context, suppressed] of this.sampler.drainSuppressed()) {
+      this.emit({
+        level: 'warn',
+        message: `${suppressed} logs descartados pelo limite de LOG_RATE_LIMIT_PER_SECOND`,
+        context,
+        params: [],
+        time: Date.now(),
+      });
+    }
   }
-}
 
+  private write(level: LogLevel, message: unknown, optionalParams: unknown[]) {
+    if (LEVEL_PRIORITY[level] > LEVEL_PRIORITY[this.level]) {
+      return;
+    }
+
+    // Convenção do Nest: o contexto é o último parâmetro string
+    const params = [...optionalParams];
+    const context =
+      typeof params[params.length - 1] === 'string' ? (params.pop() as string) : undefined;
+
+    if (!this.sampler.shouldLog(context, level)) {
+      return;
+    }
+
+    const entry: LogEntry = { level, message, context, params, time: Date.now() };
+    if (!this.buffered) {
+      this.emit(entry);
+      return;
+    }
+
+    this.queue.push(entry);
+    if (level === 'error' || this.queue.length >= this.maxBufferedEntries) {
+      this.flush();
+    }
+  }
+
+  private emit(entry: LogEntry) {
+    const meta: Record<string, unknown> = {
+      context: entry.context,
+      timestamp: new Date(entry.time).toISOString(),
+    };
+    let message = entry.message;
+
+    if (message instanceof Error) {
+      meta.trace = message.stack;
+      message = message.message;
+    } else if (message !== null && typeof message === 'object') {
+      meta.data = message;
+      message = '';
+    }
+
+    for (const param of entry.params) {
+      let value = param;
+      if (typeof value === 'function') {
+        try {
+          value = value();
+        } catch (error: any) {
+          value = { metaError: error?.message };
+        }
+      }
+
+      if (value instanceof Error) {
+        meta.error = value.message;
+        meta.trace = value.stack;
+      } else if (typeof value === 'string') {
+        meta.trace = value;
+      } else if (value !== null && typeof value === 'object') {
+        Object.assign(meta, value);
+      } else if (value !== undefined) {
+        meta.detail = value;
+      }
+    }
+
+    this.logger.log(entry.level, String(message), meta);
+  }
+}
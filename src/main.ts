@@ -1,21 +1,30 @@
 import { NestFactory } from '@nestjs/core';
-import { RequestMethod, ValidationPipe } from '@nestjs/common';
-import { ConfigService } from '@nestjs/config';
+import { Logger, RequestMethod, ValidationPipe } from '@nestjs/common';
+import { ConfigModule, ConfigService } from '@nestjs/config';
 import { json, urlencoded } from 'express';
 import helmet from 'helmet';
 
 import { AppModule } from './app.module';
-import { PrismaService } from './prisma/prisma.service';
+import { resolveAppRole } from './config/app-role';
 import { HttpExceptionFilter } from './common/filters/http-exception.filter';
+import { LoggerService } from './logger/logger.service';
 
 async function bootstrap() {
-  const app = await NestFactory.create(AppModule);
+  await ConfigModule.envVariablesLoaded;
+  const role = resolveAppRole(process.env.APP_ROLE);
+
+  // Logs do boot ficam retidos até o LoggerService (winston em lote, amostrado) assumir
+  const app = await NestFactory.create(AppModule.forRoot(role), { bufferLogs: true });
+  app.useLogger(app.get(LoggerService));
   const configService = app.get(ConfigService);
 
-  // Aumentar limite do body-parser para suportar webhooks com mídia (base64)
-  // Limite padrão é 1MB, aumentamos para 50MB para webhooks
-  app.use(json({ limit: '50mb' }));
-  app.use(urlencoded({ extended: true, limit: '50mb' }));
+  // Libera liderança do scheduler e encerra o worker BullMQ de forma limpa
+  app.enableShutdownHooks();
+
+  // Webhooks da Evolution chegam sem base64 (a mídia é baixada à parte via
+  // getBase64FromMediaMessage); o limite só cobre payloads em lote maiores que 1MB
+  app.use(json({ limit: '5mb' }));
+  app.use(urlencoded({ extended: true, limit: '5mb' }));
 
   app.use(
     helmet({
@@ -30,10 +39,14 @@ async function bootstrap() {
     credentials: true,
     methods: ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
     allowedHeaders: ['Content-Type', 'Authorization', 'X-Requested-With'],
+    exposedHeaders: ['Server-Timing'],
   });
 
   app.setGlobalPrefix('api', {
-    exclude: [{ path: 'health', method: RequestMethod.GET }],
+    exclude: [
+      { path: 'health', method: RequestMethod.GET },
+      { path: 'metrics', method: RequestMethod.GET },
+    ],
   });
 
   app.useGlobalPipes(
@@ -49,6 +62,8 @@ async function bootstrap() {
 
   app.useGlobalFilters(new HttpExceptionFilter());
 
+  // Todos os papéis escutam HTTP para expor /health e /metrics
   await app.listen(configService.get<number>('port') ?? 3000);
+  Logger.log(`Aplicação iniciada com APP_ROLE=${role}`, 'Bootstrap');
 }
 void bootstrap();
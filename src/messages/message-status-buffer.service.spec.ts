@@ -0,0 +1,114 @@
+import { ConfigService } from '@nestjs/config';
+import { Prisma } from '@prisma/client';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { MessageStatusBufferService } from './message-status-buffer.service';
+
+type ExecuteRaw = (query: Prisma.Sql) => Promise<number>;
+
+// Recibos enviados em um UPDATE: as tuplas (externalId, status, rank) do VALUES
+function receiptsOf(query: Prisma.Sql): Record<string, string> {
+  const tuples = (query.text.match(/::int\)/g) ?? []).length;
+  const receipts: Record<string, string> = {};
+  for (let index = 0; index < tuples; index++) {
+    const [externalId, status] = query.values.slice(index * 3, index * 3 + 2);
+    receipts[externalId as string] = status as string;
+  }
+  return receipts;
+}
+
+function createBuffer(execute: ExecuteRaw, maxBatchSize = 1000) {
+  const queries: Prisma.Sql[] = [];
+  const prisma = {
+    $executeRaw: (strings: TemplateStringsArray, ...values: any[]) => {
+      const query = Prisma.sql(strings, ...values);
+      queries.push(query);
+      return execute(query);
+    },
+  };
+  const config = {
+    get: (key: string) => (key === 'messageStatus.maxBatchSize' ? maxBatchSize : undefined),
+  };
+
+  const buffer = new MessageStatusBufferService(
+    prisma as unknown as PrismaService,
+    config as unknown as ConfigService,
+  );
+  return { buffer, queries };
+}
+
+describe('MessageStatusBufferService', () => {
+  it('deve manter só o status mais avançado de cada mensagem', async () => {
+    const { buffer, queries } = createBuffer(async () => 1);
+
+    buffer.enqueue('a', 'SERVER_ACK');
+    buffer.enqueue('a', 'read');
+    buffer.enqueue('a', 'DELIVERY_ACK');
+    buffer.enqueue('b', 'sent');
+    buffer.enqueue('c', 'desconhecido');
+    buffer.enqueue(null, 'read');
+    await buffer.flush();
+
+    expect(queries).toHaveLength(1);
+    expect(receiptsOf(queries[0])).toEqual({ a: 'read', b: 'sent' });
+    // O banco também só sobe na ordem: status gravado mais avançado não é rebaixado
+    expect(queries[0].text).toContain('< v."rank"');
+  });
+
+  it('deve devolver os recibos ao buffer quando o UPDATE falha', async () => {
+    let fail = true;
+    const { buffer, queries } = createBuffer(async () => {
+      if (fail) {
+        fail = false;
+        throw new Error('banco indisponível');
+      }
+      return 1;
+    });
+
+    buffer.enqueue('a', 'read');
+    await buffer.flush();
+    buffer.enqueue('a', 'delivered');
+    buffer.enqueue('b', 'sent');
+    await buffer.flush();
+
+    expect(queries).toHaveLength(2);
+    expect(receiptsOf(queries[1])).toEqual({ a: 'read', b: 'sent' });
+  });
+
+  it('deve gravar ao atingir o tamanho máximo do lote', async () => {
+    const { buffer, queries } = createBuffer(async () => 2, 2);
+
+    buffer.enqueue('a', 'sent');
+    expect(queries).toHaveLength(0);
+    buffer.enqueue('b', 'delivered');
+    await new Promise((resolve) => setImmediate(resolve));
+
+    expect(queries).toHaveLength(1);
+    expect(receiptsOf(queries[0])).toEqual({ a: 'sent', b: 'delivered' });
+  });
+
+  it('deve esvaziar o buffer no encerramento mesmo com flush em andamento', async () => {
+    let release!: () => void;
+    const blocked = new Promise<void>((resolve) => {
+      release = resolve;
+    });
+    let calls = 0;
+    const { buffer, queries } = createBuffer(async () => {
+      calls++;
+      if (calls === 1) {
+        await blocked;
+      }
+      return 1;
+    });
+
+    buffer.enqueue('a', 'sent');
+    const inFlight = buffer.flush();
+    buffer.enqueue('b', 'read');
+
+    const destroyed = buffer.onModuleDestroy();
+    release();
+    await Promise.all([inFlight, destroyed]);
+
+    expect(queries.map(receiptsOf)).toEqual([{ a: 'sent' }, { b: 'read' }]);
+  });
+});
@@ -0,0 +1,171 @@
+import {
+  Injectable,
+  Logger,
+  OnModuleDestroy,
+  OnModuleInit,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { Prisma } from '@prisma/client';
+
+import { PrismaService } from '../prisma/prisma.service';
+import {
+  MESSAGE_STATUS_RANK,
+  MessageStatus,
+  normalizeMessageStatus,
+  STATUS_ALIASES,
+} from './message-status';
+
+// Posição do status já gravado, calculada no próprio banco a partir da mesma
+// tabela de aliases (inclui valores legados da Evolution); desconhecidos valem 0
+const CURRENT_RANK_SQL = Prisma.sql`
+  CASE lower(coalesce(m."status", ''))
+    ${Prisma.join(
+      Object.entries(STATUS_ALIASES).map(
+        ([alias, status]) =>
+          Prisma.sql`WHEN ${alias} THEN ${MESSAGE_STATUS_RANK[status]}::int`,
+      ),
+      ' ',
+    )}
+    ELSE 0
+  END
+`;
+
+// Tentativas de esvaziar o buffer no shutdown (recibos devolvidos por falha contam)
+const MAX_SHUTDOWN_FLUSHES = 5;
+
+/**
+ * Acumula recibos de status (Meta/Evolution) e aplica em lote, com um único
+ * UPDATE por flush chaveado pelo `externalId`.
+ *
+ * Para cada mensagem só o status mais avançado do intervalo é mantido, e o
+ * UPDATE só sobe na ordem pending < sent < failed < delivered < read, de forma
+ * que recibos fora de ordem nunca rebaixam uma mensagem.
+ */
+@Injectable()
+export class MessageStatusBufferService
+  implements OnModuleInit, OnModuleDestroy
+{
+  private readonly logger = new Logger(MessageStatusBufferService.name);
+  private readonly flushIntervalMs: number;
+  private readonly maxBatchSize: number;
+  private pending: Map<string, MessageStatus> = new Map();
+  private flushing: Promise<void> | null = null;
+  private flushTimer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly configService: ConfigService,
+  ) {
+    this.flushIntervalMs =
+      this.configService.get<number>('messageStatus.flushIntervalMs') ?? 1000;
+    this.maxBatchSize =
+      this.configService.get<number>('messageStatus.maxBatchSize') ?? 1000;
+  }
+
+  onModuleInit() {
+    this.flushTimer = setInterval(() => void this.flush(), this.flushIntervalMs);
+  }
+
+  async onModuleDestroy() {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = null;
+    }
+
+    // Um flush em andamento não inclui o que chegou depois da troca do buffer
+    // nem os recibos devolvidos por falha: repete até esvaziar
+    for (
+      let attempt = 0;
+      attempt < MAX_SHUTDOWN_FLUSHES && (this.flushing || this.pending.size > 0);
+      attempt++
+    ) {
+      await this.flush();
+    }
+
+    if (this.pending.size > 0) {
+      this.logger.warn(
+        `${this.pending.size} recibo(s) de status não gravados no encerramento`,
+      );
+    }
+  }
+
+  enqueue(externalId: string | null | undefined, rawStatus: string | null | undefined): void {
+    if (!externalId) {
+      return;
+    }
+
+    const status = normalizeMessageStatus(rawStatus);
+    if (!status) {
+      this.logger.debug(`Status de mensagem ignorado: ${rawStatus}`);
+      return;
+    }
+
+    this.merge(externalId, status);
+
+    if (this.pending.size >= this.maxBatchSize) {
+      void this.flush();
+    }
+  }
+
+  /**
+   * Grava os recibos acumulados. Chamadas concorrentes aguardam o flush em andamento.
+   */
+  async flush(): Promise<void> {
+    if (this.flushing) {
+      return this.flushing;
+    }
+    if (this.pending.size === 0) {
+      return;
+    }
+
+    const batch = this.pending;
+    this.pending = new Map();
+
+    this.flushing = this.applyBatch(batch).finally(() => {
+      this.flushing = null;
+    });
+    return this.flushing;
+  }
+
+  private async applyBatch(batch: Map<string, MessageStatus>): Promise<void> {
+    const entries = Array.from(batch.entries());
+
+    for (let offset = 0; offset < entries.length; offset += this.maxBatchSize) {
+      const chunk = entries.slice(offset, offset + this.maxBatchSize);
+
+      try {
+        const updated = await this.prisma.$executeRaw`
+          UPDATE "messages" AS m
+          SET "status" = v."status"
+          FROM (VALUES ${Prisma.join(
+            chunk.map(
+              ([externalId, status]) =>
+                Prisma.sql`(${externalId}, ${status}, ${MESSAGE_STATUS_RANK[status]}::int)`,
+            ),
+          )}) AS v("externalId", "status", "rank")
+          WHERE m."externalId" = v."externalId"
+            AND ${CURRENT_RANK_SQL} < v."rank"
+        `;
+
+        this.logger.debug(
+          `Recibos de status aplicados: ${updated}/${chunk.length} mensagens atualizadas`,
+        );
+      } catch (error: any) {
+        // Devolve ao buffer para a próxima tentativa, sem sobrescrever recibos mais novos
+        for (const [externalId, status] of chunk) {
+          this.merge(externalId, status);
+        }
+        this.logger.error(`Erro ao aplicar recibos de status: ${error.message}`, {
+          receipts: chunk.length,
+        });
+      }
+    }
+  }
+
+  private merge(externalId: string, status: MessageStatus) {
+    const current = this.pending.get(externalId);
+    if (!current || MESSAGE_STATUS_RANK[status] > MESSAGE_STATUS_RANK[current]) {
+      this.pending.set(externalId, status);
+    }
+  }
+}
@@ -0,0 +1,16 @@
+import { MESSAGE_STATUS_RANK, normalizeMessageStatus } from './message-status';
+
+describe('message-status', () => {
+  it('deve normalizar status da Meta e da Evolution', () => {
+    expect(normalizeMessageStatus('delivered')).toBe('delivered');
+    expect(normalizeMessageStatus('DELIVERY_ACK')).toBe('delivered');
+    expect(normalizeMessageStatus('SERVER_ACK')).toBe('sent');
+    expect(normalizeMessageStatus('PLAYED')).toBe('read');
+    expect(normalizeMessageStatus('desconhecido')).toBeNull();
+  });
+
+  it('deve ordenar sent < delivered < read', () => {
+    expect(MESSAGE_STATUS_RANK.sent).toBeLessThan(MESSAGE_STATUS_RANK.delivered);
+    expect(MESSAGE_STATUS_RANK.delivered).toBeLessThan(MESSAGE_STATUS_RANK.read);
+  });
+});
@@ -0,0 +1,37 @@
+export type MessageStatus = 'pending' | 'sent' | 'failed' | 'delivered' | 'read';
+
+/**
+ * Ordem dos status de entrega. Um recibo só é aplicado quando sobe na ordem,
+ * então recibos fora de ordem (ex.: "delivered" depois de "read") são ignorados.
+ */
+export const MESSAGE_STATUS_RANK: Record<MessageStatus, number> = {
+  pending: 0,
+  sent: 1,
+  failed: 2,
+  delivered: 3,
+  read: 4,
+};
+
+// Valores da Meta (sent/delivered/read/failed) e da Evolution (SERVER_ACK, DELIVERY_ACK, ...)
+export const STATUS_ALIASES: Record<string, MessageStatus> = {
+  pending: 'pending',
+  sent: 'sent',
+  server_ack: 'sent',
+  delivered: 'delivered',
+  delivery_ack: 'delivered',
+  read: 'read',
+  played: 'read',
+  failed: 'failed',
+  error: 'failed',
+};
+
+export function normalizeMessageStatus(
+  rawStatus: string | null | undefined,
+): MessageStatus | null {
+  if (rawStatus === null || rawStatus === undefined) {
+    return null;
+  }
+
+  const key = String(rawStatus).trim().toLowerCase();
+  return STATUS_ALIASES[key] ?? null;
+}
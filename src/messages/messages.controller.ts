@@ -1,4 +1,5 @@
 import { Controller, Get, Post, Body, Param, Query, Res } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
 import type { Response } from 'express';
 
 import { MessagesService } from './messages.service';
@@ -11,7 +12,15 @@ import type { AuthenticatedUser } from '../common/interfaces/authenticated-user.
 
 @Controller('messages')
 export class MessagesController {
-  constructor(private readonly messagesService: MessagesService) {}
+  private readonly mediaCacheMaxAgeSeconds: number;
+
+  constructor(
+    private readonly messagesService: MessagesService,
+    private readonly configService: ConfigService,
+  ) {
+    this.mediaCacheMaxAgeSeconds =
+      this.configService.get<number>('storage.mediaCacheMaxAgeSeconds') ?? 86400;
+  }
 
   @Post('send')
   @Roles(Role.ADMIN, Role.SUPERVISOR, Role.OPERATOR)
@@ -41,12 +50,20 @@ export class MessagesController {
   @Roles(Role.ADMIN, Role.SUPERVISOR, Role.OPERATOR)
   async downloadMedia(@Param('id') id: string, @Res() res: Response) {
     const media = await this.messagesService.downloadMedia(id);
-    res.setHeader('Content-Type', media.mimeType);
-    res.setHeader('Content-Disposition', `inline; filename="${media.fileName}"`);
-    if (media.contentLength) {
-      res.setHeader('Content-Length', media.contentLength);
-    }
-    media.stream.pipe(res);
+    const asciiName = media.fileName.replace(/[^\x20-\x7e]|"/g, '_');
+
+    // sendFile cuida de Range (206), ETag/Last-Modified e respostas 304
+    res.sendFile(media.absolutePath, {
+      acceptRanges: true,
+      etag: true,
+      lastModified: true,
+      cacheControl: false,
+      headers: {
+        'Content-Type': media.mimeType,
+        'Content-Disposition': `inline; filename="${asciiName}"; filename*=UTF-8''${encodeURIComponent(media.fileName)}`,
+        'Cache-Control': `private, max-age=${this.mediaCacheMaxAgeSeconds}`,
+      },
+    });
   }
 }
 
@@ -1,13 +1,15 @@
 import { Module, forwardRef } from '@nestjs/common';
 import { MessagesService } from './messages.service';
+import { MessageStatusBufferService } from './message-status-buffer.service';
 import { MessagesController } from './messages.controller';
 import { WebsocketsModule } from '../websockets/websockets.module';
+import { ServiceInstancesModule } from '../service-instances/service-instances.module';
 
 @Module({
-  imports: [forwardRef(() => WebsocketsModule)],
+  imports: [forwardRef(() => WebsocketsModule), ServiceInstancesModule],
   controllers: [MessagesController],
-  providers: [MessagesService],
-  exports: [MessagesService],
+  providers: [MessagesService, MessageStatusBufferService],
+  exports: [MessagesService, MessageStatusBufferService],
 })
 export class MessagesModule {}
 
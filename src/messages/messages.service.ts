@@ -6,40 +6,56 @@ import {
   Inject,
   forwardRef,
 } from '@nestjs/common';
-import { createReadStream } from 'fs';
-import { Message, MessageDirection, MessageVia, ChatStatus } from '@prisma/client';
-import axios from 'axios';
+import { promises as fs } from 'fs';
+import * as path from 'path';
+import { Readable } from 'stream';
+import {
+  Message,
+  MessageDirection,
+  MessageVia,
+  ChatStatus,
+  ServiceInstance,
+} from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { ProviderHttpService } from '../provider-http/provider-http.service';
 import { SendMessageDto } from './dto/send-message.dto';
 import { MessageResponseDto } from './dto/message-response.dto';
 import { ListMessagesQueryDto } from './dto/list-messages-query.dto';
 import { ChatGateway } from '../websockets/chat.gateway';
 import { StorageService } from '../storage/storage.service';
+import { MediaStoreService, StoredMedia } from '../storage/media-store.service';
+import { InstanceHealthService } from '../service-instances/instance-health.service';
+import { DashboardEventsService } from '../dashboard/dashboard-events.service';
 
 type SupportedMediaType = 'IMAGE' | 'AUDIO' | 'DOCUMENT';
 
+export type MediaFile = {
+  absolutePath: string;
+  mimeType: string;
+  fileName: string;
+};
+
 @Injectable()
 export class MessagesService {
   private readonly logger = new Logger(MessagesService.name);
+  private readonly mediaFetches: Map<string, Promise<string>> = new Map();
 
   constructor(
     private readonly prisma: PrismaService,
     @Inject(forwardRef(() => ChatGateway))
     private readonly chatGateway: ChatGateway,
     private readonly storageService: StorageService,
+    private readonly mediaStore: MediaStoreService,
+    private readonly providerHttp: ProviderHttpService,
+    private readonly instanceHealth: InstanceHealthService,
+    private readonly dashboardEvents: DashboardEventsService,
   ) {}
 
   async send(
     userId: string,
     payload: SendMessageDto,
   ): Promise<MessageResponseDto> {
-    this.logger.log(`Tentando enviar mensagem`, {
-      userId,
-      conversationId: payload.conversationId,
-      contentLength: payload.content?.length || 0,
-    });
-
     const conversation = await this.prisma.conversation.findUnique({
       where: { id: payload.conversationId },
       include: {
@@ -53,7 +69,8 @@ export class MessagesService {
       throw new NotFoundException('Conversa não encontrada');
     }
 
-    this.logger.log(`Conversa encontrada`, {
+    this.logger.debug(`Enviando mensagem`, () => ({
+      userId,
       conversationId: conversation.id,
       status: conversation.status,
       serviceInstanceId: conversation.serviceInstanceId,
@@ -62,8 +79,8 @@ export class MessagesService {
       provider: conversation.serviceInstance?.provider,
       contactId: conversation.contactId,
       contactPhone: conversation.contact.phone,
-      contactName: conversation.contact.name,
-    });
+      contentLength: payload.content?.length || 0,
+    }));
 
     if (conversation.status !== ChatStatus.OPEN) {
       this.logger.warn(`Tentativa de enviar mensagem para conversa fechada`, {
@@ -103,6 +120,7 @@ export class MessagesService {
         sender: true,
       },
     });
+    this.dashboardEvents.markChanged(conversation.operatorId);
 
     // Enviar mensagem via provedor (Evolution API ou Meta)
     try {
@@ -177,12 +195,14 @@ export class MessagesService {
         mediaCaption: data.mediaCaption ?? null,
         mediaSize: data.mediaSize ?? null,
         mediaStoragePath: data.mediaStoragePath ?? null,
+        mediaStoredAt: data.mediaStoragePath ? new Date() : null,
         direction: MessageDirection.INBOUND,
         via: MessageVia.INBOUND,
         externalId: data.externalId ?? null,
         status: 'received',
       },
     });
+    this.dashboardEvents.markChanged(conversation.operatorId);
 
     return this.toResponse(message);
   }
@@ -200,18 +220,32 @@ export class MessagesService {
       throw new NotFoundException('Conversa não encontrada');
     }
 
-    const [data, total] = await this.prisma.$transaction([
-      this.prisma.message.findMany({
-        where: { conversationId },
-        skip,
-        take: limit,
-        include: {
-          sender: true,
-        },
-        orderBy: { createdAt: 'asc' },
-      }),
-      this.prisma.message.count({ where: { conversationId } }),
-    ]);
+    // Conversas arquivadas têm as mensagens em messages_archive
+    const [data, total] = conversation.archivedAt
+      ? await this.prisma.$transaction([
+          this.prisma.archivedMessage.findMany({
+            where: { conversationId },
+            skip,
+            take: limit,
+            include: {
+              sender: true,
+            },
+            orderBy: { createdAt: 'asc' },
+          }),
+          this.prisma.archivedMessage.count({ where: { conversationId } }),
+        ])
+      : await this.prisma.$transaction([
+          this.prisma.message.findMany({
+            where: { conversationId },
+            skip,
+            take: limit,
+            include: {
+              sender: true,
+            },
+            orderBy: { createdAt: 'asc' },
+          }),
+          this.prisma.message.count({ where: { conversationId } }),
+        ]);
 
     return {
       data: data.map((message) => this.toResponse(message)),
@@ -225,12 +259,19 @@ export class MessagesService {
   }
 
   async findOne(id: string): Promise<MessageResponseDto> {
-    const message = await this.prisma.message.findUnique({
-      where: { id },
-      include: {
-        sender: true,
-      },
-    });
+    const message =
+      (await this.prisma.message.findUnique({
+        where: { id },
+        include: {
+          sender: true,
+        },
+      })) ??
+      (await this.prisma.archivedMessage.findUnique({
+        where: { id },
+        include: {
+          sender: true,
+        },
+      }));
 
     if (!message) {
       throw new NotFoundException('Mensagem não encontrada');
@@ -249,7 +290,13 @@ export class MessagesService {
     });
   }
 
-  async downloadMedia(messageId: string) {
+  /**
+   * Resolve o arquivo local da mídia de uma mensagem. Mídias que ainda não estão
+   * em disco são baixadas do provedor uma única vez e gravadas no armazenamento
+   * por conteúdo, de forma que as próximas leituras (ex.: replay de áudio) não
+   * voltem à Evolution. O arquivo segue a mesma retenção das demais mídias.
+   */
+  async downloadMedia(messageId: string): Promise<MediaFile> {
     const message = await this.prisma.message.findUnique({
       where: { id: messageId },
       include: {
@@ -265,31 +312,50 @@ export class MessagesService {
       throw new NotFoundException('Mídia não encontrada para esta mensagem');
     }
 
+    const mediaFile = (storagePath: string): MediaFile => ({
+      absolutePath: this.storageService.resolveRelativePath(storagePath),
+      mimeType: message.mediaMimeType ?? 'application/octet-stream',
+      fileName: message.mediaFileName ?? `${message.mediaType ?? 'media'}-${message.id}`,
+    });
+
     if (message.mediaStoragePath) {
+      const storagePath = message.mediaStoragePath;
       try {
-        const absolutePath =
-          this.storageService.resolveRelativePath(message.mediaStoragePath);
-        const stream = createReadStream(absolutePath);
-
-        return {
-          stream,
-          mimeType: message.mediaMimeType ?? 'application/octet-stream',
-          fileName: message.mediaFileName ?? `${message.mediaType ?? 'media'}-${message.id}`,
-          contentLength: message.mediaSize ?? undefined,
-        };
+        await fs.access(this.storageService.resolveRelativePath(storagePath));
+        return mediaFile(storagePath);
       } catch (error: any) {
         this.logger.warn('Falha ao ler mídia local, tentando fallback remoto', {
           error: error.message,
           messageId,
         });
-        await this.storageService.deleteFile(message.mediaStoragePath);
-        await this.prisma.message.update({
-          where: { id: message.id },
-          data: { mediaStoragePath: null },
+        // Só quem de fato desvincula o caminho libera a referência: duas
+        // requisições simultâneas não decrementam o mesmo blob duas vezes
+        const removable = await this.prisma.$transaction(async (tx) => {
+          const { count } = await tx.message.updateMany({
+            where: { id: message.id, mediaStoragePath: storagePath },
+            data: { mediaStoragePath: null, mediaStoredAt: null },
+          });
+          return count > 0 ? this.mediaStore.releaseWithin(tx, [storagePath]) : [];
         });
+        await this.mediaStore.deleteFiles(removable);
       }
     }
 
+    // Requisições simultâneas da mesma mídia compartilham um único download
+    let pending = this.mediaFetches.get(message.id);
+    if (!pending) {
+      pending = this.fetchRemoteMedia(message).finally(() =>
+        this.mediaFetches.delete(message.id),
+      );
+      this.mediaFetches.set(message.id, pending);
+    }
+
+    return mediaFile(await pending);
+  }
+
+  private async fetchRemoteMedia(
+    message: Message & { conversation: { serviceInstance: ServiceInstance } | null },
+  ): Promise<string> {
     if (!message.mediaUrl) {
       throw new NotFoundException('Mídia não disponível');
     }
@@ -309,30 +375,41 @@ export class MessagesService {
       throw new BadRequestException('URL da mídia não pôde ser resolvida');
     }
 
+    let stored: StoredMedia;
     try {
-      const response = await axios.get(absoluteUrl, {
+      const response = await this.providerHttp.get<Readable>(absoluteUrl, {
         responseType: 'stream',
         headers: {
           apikey: credentials?.apiToken,
         },
+        breakerKey: message.conversation.serviceInstance.id,
       });
 
-      return {
-        stream: response.data,
-        mimeType: message.mediaMimeType ?? 'application/octet-stream',
-        fileName: message.mediaFileName ?? `${message.mediaType ?? 'media'}-${message.id}`,
-        contentLength: response.headers['content-length'],
-      };
+      stored = await this.mediaStore.storeStream(response.data, {
+        extension: message.mediaFileName ? path.extname(message.mediaFileName) : undefined,
+        mimeType: message.mediaMimeType,
+      });
     } catch (error: any) {
       this.logger.error('Erro ao baixar mídia da Evolution API', {
         error: error.message,
-        response: error.response?.data,
         status: error.response?.status,
       });
       throw new BadRequestException(
         `Não foi possível baixar a mídia: ${error.response?.data?.message || error.message}`,
       );
     }
+
+    await this.prisma.message.update({
+      where: { id: message.id },
+      data: {
+        mediaStoragePath: stored.storagePath,
+        // Mídia rebaixada de mensagem antiga conta a retenção a partir de agora
+        mediaStoredAt: new Date(),
+        mediaSize: stored.size,
+      },
+    });
+
+    return stored.storagePath;
   }
 
   private async sendViaEvolutionAPI(conversation: any, message: Message): Promise<void> {
@@ -347,42 +424,18 @@ export class MessagesService {
     
     const sendUrl = `${serverUrl.replace(/\/$/, '')}/message/sendText/${instanceName}`;
 
-    // Verificar se a instância existe e está conectada (opcional, apenas para diagnóstico)
-    try {
-      const checkUrl = `${serverUrl.replace(/\/$/, '')}/instance/connect/${instanceName}`;
-      const checkResponse = await axios.get(checkUrl, {
-        headers: { apikey: apiToken },
-      });
-      
-      const instanceState = checkResponse.data?.instance?.state;
-      this.logger.log(`Status da instância verificado: ${instanceState}`, {
-        instanceName,
-        state: instanceState,
-      });
-      
-      if (instanceState !== 'open') {
-        this.logger.warn(`Instância '${instanceName}' não está conectada (state: ${instanceState})`, {
-          instanceName,
-          state: instanceState,
-        });
-      }
-    } catch (checkError: any) {
-      // Não bloquear o envio se a verificação falhar, apenas logar
-      this.logger.warn(`Não foi possível verificar o status da instância '${instanceName}'`, {
-        error: checkError.message,
+    // Estado de conexão vem do cache do InstanceHealthService (apenas diagnóstico)
+    const instanceHealth = this.instanceHealth.get(conversation.serviceInstance.id);
+    if (instanceHealth && instanceHealth.state !== 'open') {
+      this.logger.warn(`Instância '${instanceName}' não está conectada (state: ${instanceHealth.state})`, {
         instanceName,
+        state: instanceHealth.state,
+        checkedAt: instanceHealth.checkedAt,
       });
     }
-
-    this.logger.log(`Enviando mensagem via Evolution API`, {
-      url: sendUrl,
-      phone,
-      instanceName,
-      serverUrl,
-      messageLength: message.content?.length || 0,
-      conversationId: conversation.id,
-      contactPhone: conversation.contact.phone,
-    });
+    if (this.instanceHealth.isStale(conversation.serviceInstance.id)) {
+      this.instanceHealth.refreshInBackground(conversation.serviceInstance);
+    }
 
     // Validar se o telefone está no formato correto (apenas números, sem +)
     if (!/^\d+$/.test(phone)) {
@@ -408,18 +461,16 @@ export class MessagesService {
       text: message.content,
     };
 
-    this.logger.debug(`Payload de envio: ${JSON.stringify(payload)}`);
+    this.logger.debug(`Enviando mensagem via Evolution API`, () => ({
+      url: sendUrl,
+      phone,
+      instanceName,
+      messageLength: message.content?.length || 0,
+      conversationId: conversation.id,
+    }));
 
     try {
-      this.logger.log(`Fazendo requisição para Evolution API`, {
-        url: sendUrl,
-        method: 'POST',
-        hasApiKey: !!apiToken,
-        apiKeyLength: apiToken?.length || 0,
-        payload: JSON.stringify(payload),
-      });
-
-      const response = await axios.post(
+      const response = await this.providerHttp.post(
         sendUrl,
         payload,
         {
@@ -427,15 +478,10 @@ export class MessagesService {
             apikey: apiToken,
             'Content-Type': 'application/json',
           },
-          timeout: 30000, // 30 segundos
+          breakerKey: conversation.serviceInstance.id,
         },
       );
 
-      this.logger.log(`Resposta da Evolution API: ${JSON.stringify(response.data)}`, {
-        status: response.status,
-        statusText: response.statusText,
-      });
-
       // A Evolution API retorna o ID da mensagem em key.id
       const externalId = response.data?.key?.id || response.data?.id || `evol_${Date.now()}`;
       // Status pode ser PENDING, SENT, DELIVERED, READ, etc.
@@ -449,26 +495,26 @@ export class MessagesService {
         },
       });
 
-      this.logger.log(`Mensagem enviada com sucesso: ${externalId}`, {
+      this.logger.debug(`Mensagem enviada com sucesso: ${externalId}`, () => ({
         status,
-        externalId,
-      });
+        httpStatus: response.status,
+        response: response.data,
+      }));
     } catch (error: any) {
       const errorDetails = {
         error: error.message,
         errorStack: error.stack,
         url: sendUrl,
-        payload: JSON.stringify(payload),
+        messageLength: payload.text?.length || 0,
         phoneOriginal: conversation.contact.phone,
         phoneNormalized: phone,
         instanceName,
         serverUrl,
         hasApiToken: !!apiToken,
         apiTokenLength: apiToken?.length || 0,
-        responseData: error.response?.data ? JSON.stringify(error.response.data) : null,
+        responseData: error.response?.data ?? null,
         responseStatus: error.response?.status,
         responseStatusText: error.response?.statusText,
-        responseHeaders: error.response?.headers ? JSON.stringify(error.response.headers) : null,
         requestConfig: {
           url: sendUrl,
           method: 'POST',
@@ -518,7 +564,6 @@ export class MessagesService {
           ...errorDetails,
           evolutionError: errorMessage,
           detailedMessage,
-          responseData: JSON.stringify(responseData),
         });
 
         const finalMessage = detailedMessage || 
@@ -636,12 +681,12 @@ export class MessagesService {
     const { version, baseUrl } = this.getMetaGraphConfig(credentials);
     const sendUrl = `${baseUrl}/${version}/${phoneId}/messages`;
 
-    this.logger.log(`Enviando mensagem via Meta WhatsApp API`, {
+    this.logger.debug(`Enviando mensagem via Meta WhatsApp API`, () => ({
       phoneId,
       sendUrl,
       conversationId: conversation.id,
       messageLength: message.content?.length || 0,
-    });
+    }));
 
     const payload = {
       messaging_product: 'whatsapp',
@@ -654,11 +699,12 @@ export class MessagesService {
     };
 
     try {
-      const response = await axios.post(sendUrl, payload, {
+      const response = await this.providerHttp.post(sendUrl, payload, {
         headers: {
           Authorization: `Bearer ${accessToken}`,
           'Content-Type': 'application/json',
         },
+        breakerKey: conversation.serviceInstance.id,
       });
 
       const externalId =
@@ -674,10 +720,7 @@ export class MessagesService {
         },
       });
 
-      this.logger.log(`Mensagem enviada via Meta API com sucesso`, {
-        externalId,
-        phoneId,
-      });
+      this.logger.debug(`Mensagem enviada via Meta API com sucesso`, { externalId, phoneId });
     } catch (error: any) {
       this.logger.error('Erro ao enviar mensagem na Meta API', {
         error: error.message,
@@ -0,0 +1,42 @@
+import { MetricsRegistry } from './metrics-registry';
+
+describe('MetricsRegistry', () => {
+  it('deve renderizar contadores e gauges com labels', () => {
+    const registry = new MetricsRegistry();
+    const counter = registry.counter('requests_total', 'Total', ['route']);
+    const gauge = registry.gauge('connections', 'Conexões');
+
+    counter.inc({ route: '/a' });
+    counter.inc({ route: '/a' }, 2);
+    gauge.inc();
+    gauge.inc();
+    gauge.dec();
+
+    const output = registry.render();
+    expect(output).toContain('# TYPE requests_total counter');
+    expect(output).toContain('requests_total{route="/a"} 3');
+    expect(output).toContain('connections 1');
+  });
+
+  it('deve acumular buckets do histograma', () => {
+    const registry = new MetricsRegistry();
+    const histogram = registry.histogram('latency_seconds', 'Latência', ['route'], [0.1, 1]);
+
+    histogram.observe({ route: '/a' }, 0.05);
+    histogram.observe({ route: '/a' }, 0.5);
+    histogram.observe({ route: '/a' }, 3);
+
+    const output = registry.render();
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="0.1"} 1');
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="1"} 2');
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="+Inf"} 3');
+    expect(output).toContain('latency_seconds_count{route="/a"} 3');
+  });
+
+  it('deve escapar aspas nos valores de label', () => {
+    const registry = new MetricsRegistry();
+    registry.counter('errors_total', 'Erros', ['reason']).inc({ reason: 'a"b' });
+
+    expect(registry.render()).toContain('errors_total{reason="a\\"b"} 1');
+  });
+});
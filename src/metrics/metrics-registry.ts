@@ -0,0 +1,198 @@
+export type MetricLabels = Record<string, string | number>;
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+function escapeLabelValue(value: string | number): string {
+  return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+function formatLabels(labels: MetricLabels, extra?: MetricLabels): string {
+  const entries = Object.entries({ ...labels, ...extra });
+  if (entries.length === 0) {
+    return '';
+  }
+  return `{${entries.map(([key, value]) => `${key}="${escapeLabelValue(value)}"`).join(',')}}`;
+}
+
+function labelKey(labelNames: string[], labels: MetricLabels): string {
+  return labelNames.map((name) => String(labels[name] ?? '')).join('\u0000');
+}
+
+function pickLabels(labelNames: string[], labels: MetricLabels): MetricLabels {
+  const picked: MetricLabels = {};
+  for (const name of labelNames) {
+    picked[name] = labels[name] ?? '';
+  }
+  return picked;
+}
+
+abstract class Metric {
+  constructor(
+    readonly name: string,
+    readonly help: string,
+    readonly labelNames: string[],
+  ) {}
+
+  abstract readonly type: 'counter' | 'gauge' | 'histogram';
+
+  protected abstract renderSamples(): string[];
+
+  render(): string {
+    return [
+      `# HELP ${this.name} ${this.help}`,
+      `# TYPE ${this.name} ${this.type}`,
+      ...this.renderSamples(),
+    ].join('\n');
+  }
+}
+
+export class Counter extends Metric {
+  readonly type = 'counter';
+  private readonly values = new Map<string, { labels: MetricLabels; value: number }>();
+
+  inc(labels: MetricLabels = {}, value = 1): void {
+    const key = labelKey(this.labelNames, labels);
+    const entry = this.values.get(key);
+    if (entry) {
+      entry.value += value;
+    } else {
+      this.values.set(key, { labels: pickLabels(this.labelNames, labels), value });
+    }
+  }
+
+  protected renderSamples(): string[] {
+    return Array.from(this.values.values()).map(
+      (entry) => `${this.name}${formatLabels(entry.labels)} ${entry.value}`,
+    );
+  }
+}
+
+export class Gauge extends Metric {
+  readonly type = 'gauge';
+  private readonly values = new Map<string, { labels: MetricLabels; value: number }>();
+
+  set(labels: MetricLabels, value: number): void {
+    this.values.set(labelKey(this.labelNames, labels), {
+      labels: pickLabels(this.labelNames, labels),
+      value,
+    });
+  }
+
+  inc(labels: MetricLabels = {}, value = 1): void {
+    const key = labelKey(this.labelNames, labels);
+    const current = this.values.get(key)?.value ?? 0;
+    this.set(labels, current + value);
+  }
+
+  dec(labels: MetricLabels = {}, value = 1): void {
+    this.inc(labels, -value);
+  }
+
+  protected renderSamples(): string[] {
+    return Array.from(this.values.values()).map(
+      (entry) => `${this.name}${formatLabels(entry.labels)} ${entry.value}`,
+    );
+  }
+}
+
+export class Histogram extends Metric {
+  readonly type = 'histogram';
+  private readonly values = new Map<
+    string,
+    { labels: MetricLabels; buckets: number[]; sum: number; count: number }
+  >();
+
+  constructor(
+    name: string,
+    help: string,
+    labelNames: string[],
+    readonly buckets: number[] = DEFAULT_BUCKETS,
+  ) {
+    super(name, help, labelNames);
+  }
+
+  observe(labels: MetricLabels, value: number): void {
+    const key = labelKey(this.labelNames, labels);
+    let entry = this.values.get(key);
+    if (!entry) {
+      entry = {
+        labels: pickLabels(this.labelNames, labels),
+        buckets: this.buckets.map(() => 0),
+        sum: 0,
+        count: 0,
+      };
+      this.values.set(key, entry);
+    }
+
+    for (let index = 0; index < this.buckets.length; index++) {
+      if (value <= this.buckets[index]) {
+        entry.buckets[index]++;
+      }
+    }
+    entry.sum += value;
+    entry.count++;
+  }
+
+  /**
+   * Inicia um cronômetro; a função retornada registra a duração em segundos.
+   */
+  startTimer(labels: MetricLabels = {}): (extraLabels?: MetricLabels) => number {
+    const start = process.hrtime.bigint();
+    return (extraLabels) => {
+      const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+      this.observe({ ...labels, ...extraLabels }, seconds);
+      return seconds;
+    };
+  }
+
+  protected renderSamples(): string[] {
+    const lines: string[] = [];
+    for (const entry of this.values.values()) {
+      this.buckets.forEach((bucket, index) => {
+        lines.push(
+          `${this.name}_bucket${formatLabels(entry.labels, { le: bucket })} ${entry.buckets[index]}`,
+        );
+      });
+      lines.push(`${this.name}_bucket${formatLabels(entry.labels, { le: '+Inf' })} ${entry.count}`);
+      lines.push(`${this.name}_sum${formatLabels(entry.labels)} ${entry.sum}`);
+      lines.push(`${this.name}_count${formatLabels(entry.labels)} ${entry.count}`);
+    }
+    return lines;
+  }
+}
+
+/**
+ * Registro mínimo de métricas no formato de exposição do Prometheus (texto 0.0.4).
+ */
+export class MetricsRegistry {
+  private readonly metrics: Metric[] = [];
+
+  counter(name: string, help: string, labelNames: string[] = []): Counter {
+    return this.register(new Counter(name, help, labelNames));
+  }
+
+  gauge(name: string, help: string, labelNames: string[] = []): Gauge {
+    return this.register(new Gauge(name, help, labelNames));
+  }
+
+  histogram(
+    name: string,
+    help: string,
+    labelNames: string[] = [],
+    buckets?: number[],
+  ): Histogram {
+    return this.register(new Histogram(name, help, labelNames, buckets));
+  }
+
+  render(): string {
+    return `${this.metrics.map((metric) => metric.render()).join('\n')}\n`;
+  }
+
+  private register<T extends Metric>(metric: T): T {
+    if (this.metrics.some((existing) => existing.name === metric.name)) {
+      throw new Error(`Métrica duplicada: ${metric.name}`);
+    }
+    this.metrics.push(metric);
+    return metric;
+  }
+}
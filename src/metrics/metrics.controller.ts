@@ -0,0 +1,32 @@
+import { Controller, Get, Headers, Res, UnauthorizedException } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { SkipThrottle } from '@nestjs/throttler';
+import type { Response } from 'express';
+
+import { Public } from '../common/decorators/public.decorator';
+import { MetricsService } from './metrics.service';
+
+@Controller('metrics')
+@Public()
+@SkipThrottle()
+export class MetricsController {
+  constructor(
+    private readonly metricsService: MetricsService,
+    private readonly configService: ConfigService,
+  ) {}
+
+  @Get()
+  async metrics(
+    @Headers('authorization') authorization: string | undefined,
+    @Res() res: Response,
+  ) {
+    // Quando METRICS_TOKEN está definido, o scrape precisa enviar Bearer <token>
+    const token = this.configService.get<string>('metrics.token');
+    if (token && authorization !== `Bearer ${token}`) {
+      throw new UnauthorizedException('Token de métricas inválido');
+    }
+
+    res.setHeader('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+    res.send(await this.metricsService.render());
+  }
+}
@@ -0,0 +1,87 @@
+import { Injectable, Logger } from '@nestjs/common';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { Counter, Gauge, Histogram, MetricsRegistry } from './metrics-registry';
+
+type MetricsCollector = () => Promise<void> | void;
+
+/**
+ * Métricas da aplicação expostas em `/metrics` (formato Prometheus).
+ *
+ * Valores que dependem de consulta externa (fila BullMQ, pool do Prisma) são
+ * lidos só no momento do scrape, por meio de coletores registrados pelos módulos.
+ */
+@Injectable()
+export class MetricsService {
+  private readonly logger = new Logger(MetricsService.name);
+  private readonly registry = new MetricsRegistry();
+  private readonly collectors: MetricsCollector[] = [];
+
+  readonly httpRequestDuration: Histogram = this.registry.histogram(
+    'elsehu_http_request_duration_seconds',
+    'Duração das requisições HTTP por rota',
+    ['method', 'route', 'status'],
+  );
+
+  readonly providerRequestDuration: Histogram = this.registry.histogram(
+    'elsehu_provider_request_duration_seconds',
+    'Duração das chamadas aos provedores (Evolution/Meta) por instância',
+    ['instance', 'method', 'outcome'],
+    [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+  );
+
+  readonly providerRequestErrors: Counter = this.registry.counter(
+    'elsehu_provider_request_errors_total',
+    'Falhas nas chamadas aos provedores por instância e motivo',
+    ['instance', 'reason'],
+  );
+
+  readonly webhookDuration: Histogram = this.registry.histogram(
+    'elsehu_webhook_ingest_duration_seconds',
+    'Tempo de processamento dos webhooks recebidos',
+    ['provider', 'event', 'outcome'],
+  );
+
+  readonly socketConnections: Gauge = this.registry.gauge(
+    'elsehu_websocket_connections',
+    'Conexões WebSocket autenticadas no namespace /chat',
+  );
+
+  readonly queueJobs: Gauge = this.registry.gauge(
+    'elsehu_queue_jobs',
+    'Jobs por estado nas filas BullMQ',
+    ['queue', 'state'],
+  );
+
+  constructor(private readonly prisma: PrismaService) {}
+
+  registerCollector(collector: MetricsCollector): void {
+    this.collectors.push(collector);
+  }
+
+  async render(): Promise<string> {
+    await Promise.all(
+      this.collectors.map(async (collector) => {
+        try {
+          await collector();
+        } catch (error: any) {
+          this.logger.warn(`Falha ao coletar métrica: ${error.message}`);
+        }
+      }),
+    );
+
+    return this.registry.render() + (await this.renderPrismaMetrics());
+  }
+
+  // Pool de conexões e consultas do Prisma (previewFeature "metrics")
+  private async renderPrismaMetrics(): Promise<string> {
+    try {
+      return await this.prisma.$metrics.prometheus({
+        globalLabels: { app: 'elsehu' },
+      });
+    } catch (error: any) {
+      this.logger.debug(`Métricas do Prisma indisponíveis: ${error.message}`);
+      return '';
+    }
+  }
+}
@@ -1,12 +1,22 @@
-import { Injectable, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import {
+  Injectable,
+  Logger,
+  OnModuleDestroy,
+  OnModuleInit,
+} from '@nestjs/common';
 import { PrismaClient } from '@prisma/client';
 import { ConfigService } from '@nestjs/config';
 
+import { recordDatabaseTime } from '../common/context/request-timing';
+import { describeQueryShape } from './query-shape';
+
 @Injectable()
 export class PrismaService
   extends PrismaClient
   implements OnModuleInit, OnModuleDestroy
 {
+  private readonly logger = new Logger(PrismaService.name);
+
   constructor(private readonly configService: ConfigService) {
     super({
       datasources: {
@@ -15,6 +25,13 @@ export class PrismaService
         },
       },
     });
+
+    // Perfilamento opcional: o cliente estendido mede cada consulta (inclusive raw)
+    if (configService.get<boolean>('profiling.enabled')) {
+      const slowQueryMs =
+        configService.get<number>('profiling.slowQueryMs') ?? 200;
+      return this.withProfiling(slowQueryMs) as unknown as PrismaService;
+    }
   }
 
   async onModuleInit() {
@@ -24,4 +41,34 @@ export class PrismaService
   async onModuleDestroy() {
     await this.$disconnect();
   }
+
+  private withProfiling(slowQueryMs: number) {
+    const logger = this.logger;
+
+    return this.$extends({
+      query: {
+        async $allOperations({ model, operation, args, query }) {
+          const start = performance.now();
+          try {
+            return await query(args);
+          } finally {
+            const durationMs = performance.now() - start;
+            recordDatabaseTime(durationMs);
+
+            if (durationMs >= slowQueryMs) {
+              logger.warn(
+                `Consulta lenta: ${model ?? 'raw'}.${operation} (${durationMs.toFixed(1)}ms)`,
+                {
+                  model: model ?? null,
+                  operation,
+                  durationMs: Math.round(durationMs),
+                  argsShape: describeQueryShape(args),
+                },
+              );
+            }
+          }
+        },
+      },
+    });
+  }
 }
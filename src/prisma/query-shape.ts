@@ -0,0 +1,30 @@
+const MAX_DEPTH = 4;
+
+/**
+ * Descreve a forma dos argumentos de uma consulta (chaves e tipos), sem os
+ * valores, para registrar consultas lentas sem expor dados de clientes.
+ */
+export function describeQueryShape(value: unknown, depth = 0): unknown {
+  if (value === null) {
+    return 'null';
+  }
+  if (Array.isArray(value)) {
+    return value.length > 0 && depth < MAX_DEPTH
+      ? { array: value.length, item: describeQueryShape(value[0], depth + 1) }
+      : { array: value.length };
+  }
+  if (value instanceof Date) {
+    return 'Date';
+  }
+  if (typeof value === 'object') {
+    if (depth >= MAX_DEPTH) {
+      return 'object';
+    }
+    const shape: Record<string, unknown> = {};
+    for (const [key, nested] of Object.entries(value as Record<string, unknown>)) {
+      shape[key] = describeQueryShape(nested, depth + 1);
+    }
+    return shape;
+  }
+  return typeof value;
+}
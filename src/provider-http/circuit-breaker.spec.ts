@@ -0,0 +1,55 @@
+import { CircuitBreaker, CircuitOpenError } from './circuit-breaker';
+
+describe('CircuitBreaker', () => {
+  let now: number;
+  let breaker: CircuitBreaker;
+
+  beforeEach(() => {
+    now = 0;
+    breaker = new CircuitBreaker('instancia-1', 3, 1000, () => now);
+  });
+
+  it('deve abrir após atingir o limite de falhas consecutivas', () => {
+    breaker.recordFailure();
+    breaker.recordFailure();
+    expect(breaker.getState()).toBe('CLOSED');
+
+    breaker.recordFailure();
+    expect(breaker.getState()).toBe('OPEN');
+    expect(() => breaker.assertCanRequest()).toThrow(CircuitOpenError);
+  });
+
+  it('deve zerar o contador quando uma chamada tem sucesso', () => {
+    breaker.recordFailure();
+    breaker.recordFailure();
+    breaker.recordSuccess();
+    breaker.recordFailure();
+
+    expect(breaker.getState()).toBe('CLOSED');
+  });
+
+  it('deve liberar uma única chamada de teste após o cooldown', () => {
+    breaker.recordFailure();
+    breaker.recordFailure();
+    breaker.recordFailure();
+
+    now = 1000;
+    expect(() => breaker.assertCanRequest()).not.toThrow();
+    expect(() => breaker.assertCanRequest()).toThrow(CircuitOpenError);
+
+    breaker.recordSuccess();
+    expect(breaker.getState()).toBe('CLOSED');
+  });
+
+  it('deve reabrir se a chamada de teste falhar', () => {
+    breaker.recordFailure();
+    breaker.recordFailure();
+    breaker.recordFailure();
+
+    now = 1000;
+    breaker.assertCanRequest();
+    breaker.recordFailure();
+
+    expect(breaker.getState()).toBe('OPEN');
+  });
+});
@@ -0,0 +1,85 @@
+export type CircuitState = 'CLOSED' | 'OPEN' | 'HALF_OPEN';
+
+export class CircuitOpenError extends Error {
+  constructor(
+    readonly key: string,
+    readonly retryAt: number,
+  ) {
+    super(
+      `Provedor temporariamente indisponível (circuito aberto para ${key} até ${new Date(retryAt).toISOString()})`,
+    );
+    this.name = 'CircuitOpenError';
+  }
+}
+
+/**
+ * Circuit breaker simples por chave (normalmente uma ServiceInstance).
+ *
+ * Após `threshold` falhas transitórias consecutivas o circuito abre e as
+ * chamadas falham imediatamente até `cooldownMs` passar. Depois disso uma
+ * única chamada de teste é liberada (HALF_OPEN): sucesso fecha o circuito,
+ * falha reabre.
+ */
+export class CircuitBreaker {
+  private state: CircuitState = 'CLOSED';
+  private failures = 0;
+  private openedAt = 0;
+  private trialInFlight = false;
+
+  constructor(
+    private readonly key: string,
+    private readonly threshold: number,
+    private readonly cooldownMs: number,
+    private readonly now: () => number = Date.now,
+  ) {}
+
+  getState(): CircuitState {
+    if (this.state === 'OPEN' && this.now() - this.openedAt >= this.cooldownMs) {
+      return 'HALF_OPEN';
+    }
+    return this.state;
+  }
+
+  assertCanRequest(): void {
+    if (this.state === 'OPEN') {
+      if (this.now() - this.openedAt < this.cooldownMs) {
+        throw new CircuitOpenError(this.key, this.openedAt + this.cooldownMs);
+      }
+      this.state = 'HALF_OPEN';
+      this.trialInFlight = false;
+    }
+
+    if (this.state === 'HALF_OPEN') {
+      if (this.trialInFlight) {
+        throw new CircuitOpenError(this.key, this.now() + this.cooldownMs);
+      }
+      this.trialInFlight = true;
+    }
+  }
+
+  recordSuccess(): void {
+    this.state = 'CLOSED';
+    this.failures = 0;
+    this.trialInFlight = false;
+  }
+
+  recordFailure(): void {
+    this.trialInFlight = false;
+
+    if (this.state === 'HALF_OPEN') {
+      this.open();
+      return;
+    }
+
+    this.failures += 1;
+    if (this.failures >= this.threshold) {
+      this.open();
+    }
+  }
+
+  private open(): void {
+    this.state = 'OPEN';
+    this.openedAt = this.now();
+    this.failures = 0;
+  }
+}
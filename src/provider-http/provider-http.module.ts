@@ -0,0 +1,12 @@
+import { Global, Module } from '@nestjs/common';
+import { ConfigModule } from '@nestjs/config';
+
+import { ProviderHttpService } from './provider-http.service';
+
+@Global()
+@Module({
+  imports: [ConfigModule],
+  providers: [ProviderHttpService],
+  exports: [ProviderHttpService],
+})
+export class ProviderHttpModule {}
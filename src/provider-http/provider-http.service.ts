@@ -0,0 +1,237 @@
+import { Injectable, Logger, OnModuleDestroy } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import axios, { AxiosInstance, AxiosRequestConfig, AxiosResponse } from 'axios';
+import * as http from 'http';
+import * as https from 'https';
+
+import { recordExternalTime } from '../common/context/request-timing';
+import { MetricsService } from '../metrics/metrics.service';
+import { CircuitBreaker, CircuitState } from './circuit-breaker';
+
+export type ProviderRequestConfig = AxiosRequestConfig & {
+  // Chave do circuit breaker (normalmente o id da ServiceInstance)
+  breakerKey?: string;
+  // Força (ou impede) novas tentativas em 5xx. Padrão: apenas métodos idempotentes
+  retry?: boolean;
+};
+
+const IDEMPOTENT_METHODS = new Set(['get', 'head', 'options']);
+// Erros em que a requisição certamente não chegou ao provedor
+const CONNECTION_REFUSED_CODES = new Set(['ECONNREFUSED', 'ENOTFOUND', 'EAI_AGAIN']);
+const TRANSIENT_NETWORK_CODES = new Set([
+  ...CONNECTION_REFUSED_CODES,
+  'ECONNRESET',
+  'ECONNABORTED',
+  'ETIMEDOUT',
+  'EPIPE',
+]);
+
+/**
+ * Cliente HTTP compartilhado para chamadas aos provedores (Evolution/Meta).
+ *
+ * Os agents com keep-alive mantêm um pool de conexões por host (limitado por
+ * `maxSockets`), evitando um handshake TCP/TLS a cada envio.
+ */
+@Injectable()
+export class ProviderHttpService implements OnModuleDestroy {
+  private readonly logger = new Logger(ProviderHttpService.name);
+  private readonly httpAgent: http.Agent;
+  private readonly httpsAgent: https.Agent;
+  private readonly client: AxiosInstance;
+  private readonly breakers: Map<string, CircuitBreaker> = new Map();
+
+  private readonly maxRetries: number;
+  private readonly retryBaseDelayMs: number;
+  private readonly breakerThreshold: number;
+  private readonly breakerCooldownMs: number;
+
+  constructor(
+    private readonly configService: ConfigService,
+    private readonly metrics: MetricsService,
+  ) {
+    const timeoutMs =
+      this.configService.get<number>('providerHttp.timeoutMs') ?? 30000;
+    const maxSockets =
+      this.configService.get<number>('providerHttp.maxSockets') ?? 50;
+
+    this.maxRetries =
+      this.configService.get<number>('providerHttp.maxRetries') ?? 2;
+    this.retryBaseDelayMs =
+      this.configService.get<number>('providerHttp.retryBaseDelayMs') ?? 500;
+    this.breakerThreshold =
+      this.configService.get<number>('providerHttp.breakerThreshold') ?? 5;
+    this.breakerCooldownMs =
+      this.configService.get<number>('providerHttp.breakerCooldownMs') ?? 30000;
+
+    const agentOptions = {
+      keepAlive: true,
+      maxSockets,
+      maxFreeSockets: Math.max(1, Math.floor(maxSockets / 2)),
+      timeout: timeoutMs,
+    };
+    this.httpAgent = new http.Agent(agentOptions);
+    this.httpsAgent = new https.Agent(agentOptions);
+
+    this.client = axios.create({
+      httpAgent: this.httpAgent,
+      httpsAgent: this.httpsAgent,
+      timeout: timeoutMs,
+    });
+  }
+
+  onModuleDestroy() {
+    this.httpAgent.destroy();
+    this.httpsAgent.destroy();
+  }
+
+  get<T = any>(
+    url: string,
+    config: ProviderRequestConfig = {},
+  ): Promise<AxiosResponse<T>> {
+    return this.request<T>({ ...config, method: 'GET', url });
+  }
+
+  post<T = any>(
+    url: string,
+    data?: unknown,
+    config: ProviderRequestConfig = {},
+  ): Promise<AxiosResponse<T>> {
+    return this.request<T>({ ...config, method: 'POST', url, data });
+  }
+
+  async request<T = any>(
+    config: ProviderRequestConfig,
+  ): Promise<AxiosResponse<T>> {
+    const { breakerKey, retry, ...axiosConfig } = config;
+    const method = (axiosConfig.method ?? 'get').toLowerCase();
+    const idempotent = retry ?? IDEMPOTENT_METHODS.has(method);
+    const breaker = breakerKey ? this.getBreaker(breakerKey) : null;
+
+    const instance = breakerKey ?? 'none';
+
+    for (let attempt = 0; ; attempt++) {
+      try {
+        breaker?.assertCanRequest();
+      } catch (error) {
+        this.metrics.providerRequestErrors.inc({ instance, reason: 'circuit_open' });
+        throw error;
+      }
+
+      const stopTimer = this.metrics.providerRequestDuration.startTimer({
+        instance,
+        method,
+      });
+
+      try {
+        const response = await this.client.request<T>(axiosConfig);
+        recordExternalTime(stopTimer({ outcome: 'success' }) * 1000);
+        breaker?.recordSuccess();
+        return response;
+      } catch (error: any) {
+        recordExternalTime(stopTimer({ outcome: 'error' }) * 1000);
+        this.metrics.providerRequestErrors.inc({
+          instance,
+          reason: error.response?.status ?? error.code ?? 'unknown',
+        });
+        const transient = this.isTransientFailure(error);
+
+        // 4xx indica que o provedor está respondendo: não conta como falha do circuito
+        if (transient) {
+          breaker?.recordFailure();
+        } else {
+          breaker?.recordSuccess();
+        }
+
+        if (
+          !transient ||
+          attempt >= this.maxRetries ||
+          !this.isRetryable(error, idempotent)
+        ) {
+          throw error;
+        }
+
+        const delay = this.getRetryDelay(error, attempt);
+        this.logger.warn(
+          `Falha transitória em ${method.toUpperCase()} ${this.describeUrl(axiosConfig.url)}; nova tentativa ${attempt + 1}/${this.maxRetries} em ${delay}ms`,
+          {
+            status: error.response?.status,
+            code: error.code,
+            breakerKey,
+          },
+        );
+        await new Promise((resolve) => setTimeout(resolve, delay));
+      }
+    }
+  }
+
+  getCircuitState(breakerKey: string): CircuitState {
+    return this.breakers.get(breakerKey)?.getState() ?? 'CLOSED';
+  }
+
+  private getBreaker(key: string): CircuitBreaker {
+    let breaker = this.breakers.get(key);
+    if (!breaker) {
+      breaker = new CircuitBreaker(
+        key,
+        this.breakerThreshold,
+        this.breakerCooldownMs,
+      );
+      this.breakers.set(key, breaker);
+    }
+    return breaker;
+  }
+
+  private isTransientFailure(error: any): boolean {
+    if (!axios.isAxiosError(error)) {
+      return false;
+    }
+
+    const status = error.response?.status;
+    if (status !== undefined) {
+      return status === 429 || status >= 500;
+    }
+
+    return TRANSIENT_NETWORK_CODES.has(error.code ?? '');
+  }
+
+  private isRetryable(error: any, idempotent: boolean): boolean {
+    const status: number | undefined = error.response?.status;
+
+    // 429/503 e conexão recusada: o provedor não processou a requisição
+    if (status === 429 || status === 503) {
+      return true;
+    }
+    if (status === undefined && CONNECTION_REFUSED_CODES.has(error.code)) {
+      return true;
+    }
+
+    // Demais falhas podem ter sido processadas: só repetir se for idempotente
+    return idempotent;
+  }
+
+  private getRetryDelay(error: any, attempt: number): number {
+    const retryAfter = error.response?.headers?.['retry-after'];
+    if (retryAfter !== undefined) {
+      const seconds = Number(retryAfter);
+      if (Number.isFinite(seconds) && seconds >= 0) {
+        return Math.min(seconds * 1000, this.breakerCooldownMs);
+      }
+    }
+
+    const backoff = this.retryBaseDelayMs * 2 ** attempt;
+    const jitter = Math.random() * this.retryBaseDelayMs;
+    return Math.floor(backoff + jitter);
+  }
+
+  private describeUrl(url?: string): string {
+    if (!url) {
+      return '';
+    }
+    try {
+      const parsed = new URL(url);
+      return `${parsed.host}${parsed.pathname}`;
+    } catch {
+      return url;
+    }
+  }
+}
@@ -0,0 +1,35 @@
+import { Injectable, Logger, OnModuleDestroy } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { Redis } from 'ioredis';
+
+/**
+ * Conexão Redis compartilhada pela aplicação (fora do BullMQ).
+ */
+@Injectable()
+export class RedisService extends Redis implements OnModuleDestroy {
+  private readonly logger = new Logger(RedisService.name);
+  private readonly keyPrefix: string;
+
+  constructor(configService: ConfigService) {
+    super({
+      host: configService.get<string>('redis.host') ?? 'localhost',
+      port: configService.get<number>('redis.port') ?? 6379,
+      password: configService.get<string>('redis.password') || undefined,
+      maxRetriesPerRequest: 2,
+    });
+
+    // Mesmo prefixo das filas BullMQ, para separar ambientes no mesmo Redis
+    this.keyPrefix = configService.get<string>('bullmq.prefix') ?? 'elsehu';
+    this.on('error', (error) =>
+      this.logger.error(`Erro na conexão Redis: ${error.message}`),
+    );
+  }
+
+  key(...parts: string[]): string {
+    return [this.keyPrefix, ...parts].join(':');
+  }
+
+  async onModuleDestroy() {
+    await this.quit().catch(() => this.disconnect());
+  }
+}
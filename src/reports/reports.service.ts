@@ -181,34 +181,35 @@ export class ReportsService {
       },
     });
 
-    // Buscar mensagens dos operadores no período
-    const messageWhere: Prisma.MessageWhereInput = {
-      direction: 'OUTBOUND',
-      senderId: { not: null },
-    };
-
-    if (query.startDate || query.endDate) {
-      messageWhere.createdAt = {};
-      if (query.startDate) {
-        messageWhere.createdAt.gte = new Date(query.startDate);
-      }
-      if (query.endDate) {
-        messageWhere.createdAt.lte = new Date(query.endDate);
-      }
-    }
-
-    const messages = await this.prisma.message.findMany({
-      where: messageWhere,
-      select: {
-        senderId: true,
-      },
-    });
+    // Mensagens dos operadores no período, somando a tabela quente e o arquivo
+    const messagesCreatedAt = this.buildDateFilter(query);
+    const [hotCounts, archivedCounts] = await Promise.all([
+      this.prisma.message.groupBy({
+        by: ['senderId'],
+        where: {
+          direction: 'OUTBOUND',
+          senderId: { not: null },
+          createdAt: messagesCreatedAt,
+        },
+        _count: { _all: true },
+      }),
+      this.prisma.archivedMessage.groupBy({
+        by: ['senderId'],
+        where: {
+          direction: 'OUTBOUND',
+          senderId: { not: null },
+          createdAt: messagesCreatedAt,
+        },
+        _count: { _all: true },
+      }),
+    ]);
 
     // Contar mensagens por operador
     const messageCounts: Record<string, number> = {};
-    messages.forEach((msg) => {
-      if (msg.senderId) {
-        messageCounts[msg.senderId] = (messageCounts[msg.senderId] || 0) + 1;
+    [...hotCounts, ...archivedCounts].forEach((group) => {
+      if (group.senderId) {
+        messageCounts[group.senderId] =
+          (messageCounts[group.senderId] || 0) + group._count._all;
       }
     });
 
@@ -338,7 +339,8 @@ export class ReportsService {
       const totalContacts = items.length;
       const sentCount = items.filter((i) => i.status === 'SENT').length;
       const failedCount = items.filter((i) => i.status === 'FAILED').length;
-      const pendingCount = items.filter((i) => i.status === 'PENDING').length;
+      // Inclui itens em envio (SENDING)
+      const pendingCount = totalContacts - sentCount - failedCount;
 
       return {
         name: campaign.name,
@@ -383,39 +385,41 @@ export class ReportsService {
   }
 
   async exportMessagesCsv(query: ReportQueryDto): Promise<string> {
-    const where: Prisma.MessageWhereInput = {};
-
-    if (query.startDate || query.endDate) {
-      where.createdAt = {};
-      if (query.startDate) {
-        where.createdAt.gte = new Date(query.startDate);
-      }
-      if (query.endDate) {
-        where.createdAt.lte = new Date(query.endDate);
-      }
-    }
-
-    if (query.serviceInstanceId) {
-      where.conversation = {
-        serviceInstanceId: query.serviceInstanceId,
-      };
-    }
-
-    const messages = await this.prisma.message.findMany({
-      where,
-      include: {
-        conversation: {
-          include: {
-            contact: true,
-            serviceInstance: true,
-            operator: true,
-          },
+    const createdAt = this.buildDateFilter(query);
+    const conversation = query.serviceInstanceId
+      ? { serviceInstanceId: query.serviceInstanceId }
+      : undefined;
+    const include = {
+      conversation: {
+        include: {
+          contact: true,
+          serviceInstance: true,
+          operator: true,
         },
-        sender: true,
       },
-      orderBy: { createdAt: 'desc' },
-      take: 10000, // Limite para evitar arquivos muito grandes
-    });
+      sender: true,
+    } as const;
+    const limit = 10000; // Limite para evitar arquivos muito grandes
+
+    // Leitura transparente: mensagens de conversas arquivadas vêm de messages_archive
+    const [hotMessages, archivedMessages] = await Promise.all([
+      this.prisma.message.findMany({
+        where: { createdAt, conversation },
+        include,
+        orderBy: { createdAt: 'desc' },
+        take: limit,
+      }),
+      this.prisma.archivedMessage.findMany({
+        where: { createdAt, conversation },
+        include,
+        orderBy: { createdAt: 'desc' },
+        take: limit,
+      }),
+    ]);
+
+    const messages = [...hotMessages, ...archivedMessages]
+      .sort((a, b) => b.createdAt.getTime() - a.createdAt.getTime())
+      .slice(0, limit);
 
     const records = messages.map((message) => ({
       id: message.id,
@@ -470,5 +474,15 @@ export class ReportsService {
       tabulationName: conv.tabulation?.name,
     };
   }
-}
 
+  private buildDateFilter(query: ReportQueryDto): { gte?: Date; lte?: Date } | undefined {
+    if (!query.startDate && !query.endDate) {
+      return undefined;
+    }
+
+    return {
+      ...(query.startDate && { gte: new Date(query.startDate) }),
+      ...(query.endDate && { lte: new Date(query.endDate) }),
+    };
+  }
+}
@@ -0,0 +1,157 @@
+import { Injectable, Logger } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { InjectQueue } from '@nestjs/bullmq';
+import { Cron, CronExpression } from '@nestjs/schedule';
+import { Queue } from 'bullmq';
+import { CampaignStatus } from '@prisma/client';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { launchJobId, SEND_BATCH_JOB } from '../campaigns/campaigns.processor';
+import { planLaunches } from '../campaigns/launch-plan';
+import { parseSendWindow, SendWindow } from '../campaigns/send-window';
+import { LeaderElectionService } from './leader-election.service';
+
+/**
+ * Lançador de campanhas agendadas (`scheduledAt`).
+ *
+ * Com `CAMPAIGN_LAUNCH_LOOKAHEAD_MINUTES` de antecedência, calcula o início de
+ * cada campanha pendente com contatos (janela de envio e escalonamento entre
+ * campanhas da mesma instância), marca a campanha como SCHEDULED e deixa na
+ * fila um job atrasado até `launchAt`. No horário o worker só troca o status e
+ * começa os lotes, sem depender de ninguém chamar `start`. Campanhas com
+ * `scheduledAt` atrasado além de `CAMPAIGN_LAUNCH_MAX_LATE_MINUTES` (ex.:
+ * agendamentos antigos no primeiro deploy) ficam PENDING para início manual.
+ */
+@Injectable()
+export class CampaignLauncherService {
+  private readonly logger = new Logger(CampaignLauncherService.name);
+  private readonly lookaheadMs: number;
+  private readonly staggerMs: number;
+  private readonly maxLateMs: number;
+  private readonly sendWindow: SendWindow | null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly leaderElection: LeaderElectionService,
+    @InjectQueue('campaigns') private readonly campaignsQueue: Queue,
+    private readonly configService: ConfigService,
+  ) {
+    this.lookaheadMs =
+      (this.configService.get<number>('campaigns.launchLookaheadMinutes') ?? 60) * 60 * 1000;
+    this.staggerMs =
+      (this.configService.get<number>('campaigns.instanceStaggerSeconds') ?? 300) * 1000;
+    this.maxLateMs =
+      (this.configService.get<number>('campaigns.launchMaxLateMinutes') ?? 1440) * 60 * 1000;
+    this.sendWindow = parseSendWindow(
+      this.configService.get<string>('campaigns.sendWindow'),
+      this.configService.get<string>('campaigns.timeZone') ?? 'America/Sao_Paulo',
+    );
+  }
+
+  @Cron(CronExpression.EVERY_MINUTE)
+  async stageScheduledCampaigns() {
+    if (!this.leaderElection.isLeader()) {
+      return;
+    }
+
+    const now = new Date();
+    const candidates = await this.prisma.campaign.findMany({
+      where: {
+        status: CampaignStatus.PENDING,
+        scheduledAt: {
+          not: null,
+          gte: new Date(now.getTime() - this.maxLateMs),
+          lte: new Date(now.getTime() + this.lookaheadMs),
+        },
+        items: { some: {} },
+      },
+      select: { id: true, name: true, serviceInstanceId: true, scheduledAt: true },
+      orderBy: { scheduledAt: 'asc' },
+    });
+
+    const staged = await this.prisma.campaign.findMany({
+      where: {
+        OR: [
+          { status: CampaignStatus.SCHEDULED },
+          {
+            status: CampaignStatus.PROCESSING,
+            startedAt: { gte: new Date(now.getTime() - this.staggerMs) },
+          },
+        ],
+      },
+      select: { id: true, serviceInstanceId: true, status: true, launchAt: true, startedAt: true },
+    });
+
+    // Recria jobs de campanhas SCHEDULED que se perderam ou falharam
+    for (const campaign of staged) {
+      if (campaign.status === CampaignStatus.SCHEDULED && campaign.launchAt) {
+        await this.enqueueLaunch(campaign.id, campaign.launchAt, now);
+      }
+    }
+
+    if (candidates.length === 0) {
+      return;
+    }
+
+    const plan = planLaunches(
+      candidates.map((campaign) => ({
+        id: campaign.id,
+        serviceInstanceId: campaign.serviceInstanceId,
+        scheduledAt: campaign.scheduledAt!,
+      })),
+      staged.flatMap((campaign) => {
+        const launchAt = campaign.launchAt ?? campaign.startedAt;
+        return launchAt ? [{ serviceInstanceId: campaign.serviceInstanceId, launchAt }] : [];
+      }),
+      { now, staggerMs: this.staggerMs, window: this.sendWindow },
+    );
+
+    const names = new Map(candidates.map((campaign) => [campaign.id, campaign.name]));
+    for (const { id, launchAt } of plan) {
+      // A janela pode empurrar o início para depois da antecedência: fica para depois
+      if (launchAt.getTime() - now.getTime() > this.lookaheadMs) {
+        continue;
+      }
+
+      // Só um lado vence se alguém iniciar a campanha manualmente ao mesmo tempo
+      const { count } = await this.prisma.campaign.updateMany({
+        where: { id, status: CampaignStatus.PENDING },
+        data: { status: CampaignStatus.SCHEDULED, launchAt },
+      });
+      if (count === 0) {
+        continue;
+      }
+
+      await this.enqueueLaunch(id, launchAt, now);
+      this.logger.log(
+        `Campanha ${names.get(id)} agendada para ${launchAt.toISOString()}`,
+      );
+    }
+  }
+
+  private async enqueueLaunch(campaignId: string, launchAt: Date, now: Date) {
+    const jobId = launchJobId(campaignId);
+
+    // Um job com o mesmo jobId bloqueia o add: só é substituído se já terminou
+    // (falhou ou concluiu) com a campanha ainda SCHEDULED
+    const existing = await this.campaignsQueue.getJob(jobId);
+    if (existing) {
+      const state = await existing.getState();
+      if (state !== 'failed' && state !== 'completed') {
+        return;
+      }
+      await existing.remove();
+    }
+
+    await this.campaignsQueue.add(
+      SEND_BATCH_JOB,
+      { campaignId },
+      {
+        jobId,
+        delay: Math.max(0, launchAt.getTime() - now.getTime()),
+        removeOnComplete: true,
+        removeOnFail: true,
+      },
+    );
+  }
+}
@@ -0,0 +1,117 @@
+import {
+  Injectable,
+  Logger,
+  OnApplicationBootstrap,
+  OnModuleDestroy,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { randomUUID } from 'crypto';
+import { hostname } from 'os';
+
+import { RedisService } from '../redis/redis.service';
+
+// ARGV[1]: id do processo, ARGV[2]: TTL (ms). Adquire ou renova a liderança.
+const ACQUIRE_LUA = `
+local holder = redis.call('GET', KEYS[1])
+if not holder then
+  redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+  return 1
+end
+if holder == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  return 1
+end
+return 0
+`;
+
+// ARGV[1]: id do processo. Só remove a chave se este processo for o líder.
+const RELEASE_LUA = `
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+`;
+
+/**
+ * Eleição de líder entre os processos do scheduler via lease no Redis.
+ *
+ * Cada processo tenta adquirir/renovar a chave a cada terço do TTL; só o
+ * detentor executa os jobs agendados. Se o líder cair, outro assume quando o
+ * lease expira. Localmente a liderança também vence com o lease, então um
+ * processo isolado do Redis para de executar jobs antes de outro assumir.
+ */
+@Injectable()
+export class LeaderElectionService
+  implements OnApplicationBootstrap, OnModuleDestroy
+{
+  private readonly logger = new Logger(LeaderElectionService.name);
+  private readonly id = `${hostname()}:${process.pid}:${randomUUID()}`;
+  private readonly key: string;
+  private readonly ttlMs: number;
+  private leaseExpiresAt = 0;
+  private renewTimer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private readonly redis: RedisService,
+    private readonly configService: ConfigService,
+  ) {
+    this.key = this.redis.key('scheduler', 'leader');
+    this.ttlMs = this.configService.get<number>('scheduler.leaderTtlMs') ?? 30000;
+  }
+
+  onApplicationBootstrap() {
+    void this.renew();
+    this.renewTimer = setInterval(
+      () => void this.renew(),
+      Math.max(1000, Math.floor(this.ttlMs / 3)),
+    );
+  }
+
+  async onModuleDestroy() {
+    if (this.renewTimer) {
+      clearInterval(this.renewTimer);
+      this.renewTimer = null;
+    }
+
+    if (this.isLeader()) {
+      this.leaseExpiresAt = 0;
+      await this.redis
+        .eval(RELEASE_LUA, 1, this.key, this.id)
+        .catch((error) =>
+          this.logger.warn(`Falha ao liberar liderança: ${error.message}`),
+        );
+    }
+  }
+
+  isLeader(): boolean {
+    return Date.now() < this.leaseExpiresAt;
+  }
+
+  private async renew() {
+    const wasLeader = this.isLeader();
+    const startedAt = Date.now();
+
+    try {
+      const acquired = await this.redis.eval(
+        ACQUIRE_LUA,
+        1,
+        this.key,
+        this.id,
+        String(this.ttlMs),
+      );
+      // Conta o TTL a partir do envio do comando, nunca depois do Redis
+      this.leaseExpiresAt = acquired === 1 ? startedAt + this.ttlMs : 0;
+    } catch (error: any) {
+      this.logger.warn(`Falha ao renovar liderança do scheduler: ${error.message}`);
+    }
+
+    const isLeader = this.isLeader();
+    if (isLeader !== wasLeader) {
+      this.logger.log(
+        isLeader
+          ? `Processo ${this.id} assumiu a liderança do scheduler`
+          : `Processo ${this.id} deixou a liderança do scheduler`,
+      );
+    }
+  }
+}
@@ -1,11 +1,13 @@
 import { Module } from '@nestjs/common';
 import { ScheduleModule } from '@nestjs/schedule';
 import { SchedulerService } from './scheduler.service';
+import { LeaderElectionService } from './leader-election.service';
+import { CampaignLauncherService } from './campaign-launcher.service';
+import { CampaignsQueueModule } from '../campaigns/campaigns-queue.module';
 
 @Module({
-  imports: [ScheduleModule.forRoot()],
-  providers: [SchedulerService],
-  exports: [SchedulerService],
+  imports: [ScheduleModule.forRoot(), CampaignsQueueModule],
+  providers: [SchedulerService, LeaderElectionService, CampaignLauncherService],
+  exports: [SchedulerService, LeaderElectionService],
 })
 export class SchedulerModule {}
-
@@ -1,28 +1,47 @@
 import { Injectable, Logger } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
 import { Cron, CronExpression } from '@nestjs/schedule';
-import { ChatStatus, MessageDirection } from '@prisma/client';
+import { ChatStatus, MessageDirection, Prisma } from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
-import { StorageService } from '../storage/storage.service';
+import { MediaStoreService } from '../storage/media-store.service';
+import { MediaSweeperService } from '../storage/media-sweeper.service';
+import { OperatorAssignmentService } from '../assignment/operator-assignment.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
+import { DashboardEventsService } from '../dashboard/dashboard-events.service';
+import { LeaderElectionService } from './leader-election.service';
 
 @Injectable()
 export class SchedulerService {
   private readonly logger = new Logger(SchedulerService.name);
-  private readonly mediaRetentionDays: number;
+  private readonly archiveAfterDays: number;
+  private readonly archiveBatchSize: number;
+  private mediaSweepRunning = false;
 
   constructor(
     private readonly prisma: PrismaService,
-    private readonly storageService: StorageService,
+    private readonly mediaStore: MediaStoreService,
+    private readonly mediaSweeper: MediaSweeperService,
+    private readonly assignment: OperatorAssignmentService,
+    private readonly leaderElection: LeaderElectionService,
+    private readonly catalogCache: CatalogCacheService,
+    private readonly dashboardEvents: DashboardEventsService,
     private readonly configService: ConfigService,
   ) {
-    this.mediaRetentionDays =
-      this.configService.get<number>('storage.mediaRetentionDays') ?? 3;
+    this.archiveAfterDays =
+      this.configService.get<number>('messageArchive.afterDays') ?? 30;
+    this.archiveBatchSize =
+      this.configService.get<number>('messageArchive.batchSize') ?? 100;
   }
 
   // Roda a cada hora
   @Cron(CronExpression.EVERY_HOUR)
   async expireOldConversations() {
+    // Com várias réplicas do scheduler, só o líder executa
+    if (!this.leaderElection.isLeader()) {
+      return;
+    }
+
     this.logger.log('Verificando conversas para expirar (24h)...');
 
     const twentyFourHoursAgo = new Date();
@@ -41,6 +60,7 @@ export class SchedulerService {
           isAutomatic: true,
         },
       });
+      await this.catalogCache.invalidate(CATALOG.tabulations);
       this.logger.log('Tabulação "Conversa Expirada" criada automaticamente');
     }
 
@@ -121,6 +141,9 @@ export class SchedulerService {
       },
     });
 
+    await this.assignment.releaseAssignment(conversation.operatorId);
+    this.dashboardEvents.markChanged(conversation.operatorId);
+
     this.logger.log(
       `Conversa ${conversation.id} (contato: ${conversation.contact.name}) expirada após 24h`,
     );
@@ -184,53 +207,162 @@ export class SchedulerService {
     };
   }
 
-  @Cron(CronExpression.EVERY_DAY_AT_2AM)
+  /**
+   * Retenção de mídias: roda de hora em hora retomando do cursor salvo, com
+   * tempo máximo por execução (`MEDIA_SWEEP_MAX_RUN_MS`), para que um backlog
+   * acumulado seja drenado aos poucos em vez de numa única janela noturna.
+   */
+  @Cron(CronExpression.EVERY_HOUR)
   async cleanupExpiredMedia() {
-    const cutoff = new Date();
-    cutoff.setDate(cutoff.getDate() - this.mediaRetentionDays);
-
-    const batchSize = 200;
-    let totalRemoved = 0;
+    if (!this.leaderElection.isLeader() || this.mediaSweepRunning) {
+      return;
+    }
 
-    while (true) {
-      const messages = await this.prisma.message.findMany({
-        where: {
-          mediaStoragePath: { not: null },
-          createdAt: { lt: cutoff },
-        },
-        select: { id: true, mediaStoragePath: true },
-        take: batchSize,
-      });
+    this.mediaSweepRunning = true;
+    try {
+      const result = await this.mediaSweeper.sweepExpired(() =>
+        this.leaderElection.isLeader(),
+      );
 
-      if (messages.length === 0) {
-        break;
+      if (result.messages > 0) {
+        this.logger.log(
+          `${result.messages} mídias expiradas liberadas, ${result.files} arquivos removidos` +
+            (result.completed ? '' : ' (backlog restante na próxima execução)'),
+        );
+      } else {
+        this.logger.debug('Nenhuma mídia antiga para remover');
       }
+    } finally {
+      this.mediaSweepRunning = false;
+    }
+  }
+
+  // Blobs sem mensagens e arquivos sem registro (ex.: remoções interrompidas)
+  @Cron(CronExpression.EVERY_DAY_AT_4AM)
+  async cleanupOrphanMedia() {
+    if (!this.leaderElection.isLeader()) {
+      return;
+    }
+
+    const { unreferencedBlobs, orphanFiles } = await this.mediaSweeper.sweepOrphans(
+      false,
+      () => this.leaderElection.isLeader(),
+    );
+    const files = unreferencedBlobs.files + orphanFiles.files;
 
-      for (const message of messages) {
-        if (message.mediaStoragePath) {
-          await this.storageService.deleteFile(message.mediaStoragePath);
-        }
+    if (files > 0) {
+      const megabytes = (unreferencedBlobs.bytes + orphanFiles.bytes) / (1024 * 1024);
+      this.logger.log(
+        `${files} arquivos de mídia órfãos removidos (${megabytes.toFixed(1)} MB)`,
+      );
+    } else {
+      this.logger.debug('Nenhuma mídia órfã encontrada');
+    }
+  }
+
+  /**
+   * Move as mensagens de conversas finalizadas há mais de
+   * `MESSAGE_ARCHIVE_AFTER_DAYS` para `messages_archive`, mantendo a tabela
+   * quente do tamanho do tráfego ativo. Cada lote é um único DELETE ... RETURNING
+   * encadeado no INSERT, junto com a marcação `archivedAt` da conversa.
+   */
+  @Cron(CronExpression.EVERY_DAY_AT_3AM)
+  async archiveClosedConversations() {
+    if (!this.leaderElection.isLeader()) {
+      return;
+    }
+
+    const cutoff = new Date();
+    cutoff.setDate(cutoff.getDate() - this.archiveAfterDays);
+
+    let totalConversations = 0;
+    let totalMessages = 0;
+
+    // Interrompe entre lotes se outra réplica assumir a liderança
+    while (this.leaderElection.isLeader()) {
+      const candidates = await this.prisma.$queryRaw<{ id: string }[]>`
+        SELECT c."id"
+        FROM "conversations" c
+        WHERE c."status" = 'CLOSED'
+          AND c."archivedAt" IS NULL
+          AND EXISTS (
+            SELECT 1 FROM "finished_conversations" f WHERE f."originalChatId" = c."id"
+          )
+          AND NOT EXISTS (
+            SELECT 1 FROM "finished_conversations" f
+            WHERE f."originalChatId" = c."id" AND f."endTime" >= ${cutoff}
+          )
+        LIMIT ${this.archiveBatchSize}
+      `;
+
+      if (candidates.length === 0) {
+        break;
       }
 
-      await this.prisma.message.updateMany({
-        where: { id: { in: messages.map((msg) => msg.id) } },
-        data: { mediaStoragePath: null },
+      const conversationIds = candidates.map((candidate) => candidate.id);
+
+      // A limpeza de mídia só percorre a tabela quente: as referências são
+      // liberadas na mesma transação que move as mensagens, e os arquivos só
+      // são apagados depois do commit
+      const { moved, removable } = await this.prisma.$transaction(async (tx) => {
+        const withMedia = await tx.message.findMany({
+          where: {
+            conversationId: { in: conversationIds },
+            mediaStoragePath: { not: null },
+          },
+          select: { mediaStoragePath: true },
+        });
+        const removable =
+          withMedia.length > 0
+            ? await this.mediaStore.releaseWithin(
+                tx,
+                withMedia
+                  .map((message) => message.mediaStoragePath)
+                  .filter((storagePath): storagePath is string => Boolean(storagePath)),
+              )
+            : [];
+
+        const moved = await tx.$executeRaw`
+          WITH moved AS (
+            DELETE FROM "messages"
+            WHERE "conversationId" IN (${Prisma.join(conversationIds)})
+            RETURNING *
+          )
+          INSERT INTO "messages_archive" (
+            "id", "conversationId", "senderId", "content", "mediaType", "mediaUrl",
+            "mediaMimeType", "mediaFileName", "mediaCaption", "mediaSize",
+            "mediaStoragePath", "direction", "via", "externalId", "status", "createdAt"
+          )
+          SELECT
+            "id", "conversationId", "senderId", "content", "mediaType", "mediaUrl",
+            "mediaMimeType", "mediaFileName", "mediaCaption", "mediaSize",
+            NULL, "direction", "via", "externalId", "status", "createdAt"
+          FROM moved
+        `;
+        await tx.conversation.updateMany({
+          where: { id: { in: conversationIds } },
+          data: { archivedAt: new Date() },
+        });
+
+        return { moved, removable };
       });
 
-      totalRemoved += messages.length;
+      await this.mediaStore.deleteFiles(removable);
 
-      if (messages.length < batchSize) {
+      totalConversations += conversationIds.length;
+      totalMessages += moved;
+
+      if (candidates.length < this.archiveBatchSize) {
         break;
       }
     }
 
-    if (totalRemoved > 0) {
+    if (totalConversations > 0) {
       this.logger.log(
-        `${totalRemoved} mídias antigas removidas (> ${this.mediaRetentionDays} dias)`,
+        `${totalMessages} mensagens de ${totalConversations} conversas arquivadas (> ${this.archiveAfterDays} dias)`,
       );
     } else {
-      this.logger.debug('Nenhuma mídia antiga para remover');
+      this.logger.debug('Nenhuma conversa para arquivar');
     }
   }
 }
-
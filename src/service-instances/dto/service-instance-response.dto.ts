@@ -1,5 +1,7 @@
 import { InstanceProvider } from '@prisma/client';
 
+import type { InstanceConnectionState } from '../instance-health.service';
+
 export class ServiceInstanceResponseDto {
   id: string;
   name: string;
@@ -7,6 +9,8 @@ export class ServiceInstanceResponseDto {
   provider: InstanceProvider;
   credentials: Record<string, any>;
   isActive: boolean;
+  connectionState: InstanceConnectionState | null;
+  connectionCheckedAt: Date | null;
   createdAt: Date;
   updatedAt: Date;
 }
@@ -0,0 +1,181 @@
+import {
+  Injectable,
+  Logger,
+  OnApplicationBootstrap,
+  OnModuleDestroy,
+} from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { ServiceInstance } from '@prisma/client';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { ProviderHttpService } from '../provider-http/provider-http.service';
+
+export type InstanceConnectionState = 'open' | 'connecting' | 'close' | 'unknown';
+
+export interface InstanceHealth {
+  state: InstanceConnectionState;
+  checkedAt: Date;
+  source: 'poll' | 'webhook';
+}
+
+/**
+ * Mantém em memória o estado de conexão das instâncias Evolution.
+ *
+ * O estado é atualizado por polling periódico (`/instance/connectionState`) e
+ * pelos eventos `connection.update` do webhook, de forma que envios e a API de
+ * instâncias consultem o cache em vez de sondar a Evolution a cada chamada.
+ */
+@Injectable()
+export class InstanceHealthService
+  implements OnApplicationBootstrap, OnModuleDestroy
+{
+  private readonly logger = new Logger(InstanceHealthService.name);
+  private readonly health: Map<string, InstanceHealth> = new Map();
+  private readonly refreshing: Set<string> = new Set();
+  private readonly pollIntervalMs: number;
+  private pollTimer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly providerHttp: ProviderHttpService,
+    private readonly configService: ConfigService,
+  ) {
+    this.pollIntervalMs =
+      this.configService.get<number>('instanceHealth.pollIntervalMs') ?? 60000;
+  }
+
+  onApplicationBootstrap() {
+    void this.pollAll();
+    this.pollTimer = setInterval(() => void this.pollAll(), this.pollIntervalMs);
+  }
+
+  onModuleDestroy() {
+    if (this.pollTimer) {
+      clearInterval(this.pollTimer);
+      this.pollTimer = null;
+    }
+  }
+
+  get(serviceInstanceId: string): InstanceHealth | null {
+    return this.health.get(serviceInstanceId) ?? null;
+  }
+
+  isStale(serviceInstanceId: string): boolean {
+    const entry = this.health.get(serviceInstanceId);
+    if (!entry) {
+      return true;
+    }
+    return Date.now() - entry.checkedAt.getTime() > this.pollIntervalMs * 3;
+  }
+
+  recordState(
+    serviceInstanceId: string,
+    rawState: string | null | undefined,
+    source: InstanceHealth['source'],
+  ): void {
+    const state = this.normalizeState(rawState);
+    const previous = this.health.get(serviceInstanceId);
+
+    this.health.set(serviceInstanceId, {
+      state,
+      checkedAt: new Date(),
+      source,
+    });
+
+    if (previous && previous.state !== state) {
+      this.logger.log(
+        `Estado da instância ${serviceInstanceId} mudou: ${previous.state} -> ${state} (${source})`,
+      );
+    }
+  }
+
+  forget(serviceInstanceId: string): void {
+    this.health.delete(serviceInstanceId);
+  }
+
+  /**
+   * Atualiza o estado de uma instância em segundo plano, sem bloquear quem chamou.
+   */
+  refreshInBackground(instance: ServiceInstance): void {
+    if (instance.provider !== 'EVOLUTION_API' || this.refreshing.has(instance.id)) {
+      return;
+    }
+    void this.refresh(instance);
+  }
+
+  async refresh(instance: ServiceInstance): Promise<InstanceHealth | null> {
+    if (instance.provider !== 'EVOLUTION_API') {
+      return null;
+    }
+
+    const credentials = (instance.credentials as Record<string, any>) || {};
+    const { serverUrl, apiToken, instanceName } = credentials;
+
+    if (!serverUrl || !apiToken || !instanceName) {
+      return null;
+    }
+
+    this.refreshing.add(instance.id);
+    try {
+      const stateUrl = `${serverUrl.replace(/\/$/, '')}/instance/connectionState/${instanceName}`;
+      const response = await this.providerHttp.get(stateUrl, {
+        headers: { apikey: apiToken },
+        breakerKey: instance.id,
+      });
+
+      this.recordState(
+        instance.id,
+        response.data?.instance?.state ?? response.data?.state,
+        'poll',
+      );
+    } catch (error: any) {
+      this.logger.warn(
+        `Não foi possível verificar o status da instância '${instanceName}'`,
+        {
+          error: error.message,
+          status: error.response?.status,
+        },
+      );
+      this.recordState(instance.id, 'unknown', 'poll');
+    } finally {
+      this.refreshing.delete(instance.id);
+    }
+
+    return this.get(instance.id);
+  }
+
+  private async pollAll(): Promise<void> {
+    try {
+      const instances = await this.prisma.serviceInstance.findMany({
+        where: { provider: 'EVOLUTION_API', isActive: true },
+      });
+
+      const activeIds = new Set(instances.map((instance) => instance.id));
+      for (const id of this.health.keys()) {
+        if (!activeIds.has(id)) {
+          this.health.delete(id);
+        }
+      }
+
+      await Promise.allSettled(
+        instances.map((instance) => this.refresh(instance)),
+      );
+    } catch (error: any) {
+      this.logger.error(`Erro ao verificar saúde das instâncias: ${error.message}`);
+    }
+  }
+
+  private normalizeState(rawState: string | null | undefined): InstanceConnectionState {
+    switch ((rawState ?? '').toLowerCase()) {
+      case 'open':
+        return 'open';
+      case 'connecting':
+        return 'connecting';
+      case 'close':
+      case 'closed':
+        return 'close';
+      default:
+        return 'unknown';
+    }
+  }
+}
@@ -47,6 +47,12 @@ export class ServiceInstancesController {
     return this.serviceInstancesService.findOne(id);
   }
 
+  @Get(':id/status')
+  @Roles(Role.ADMIN, Role.SUPERVISOR)
+  getStatus(@Param('id') id: string) {
+    return this.serviceInstancesService.getStatus(id);
+  }
+
   @Get(':id/qrcode')
   @Roles(Role.ADMIN, Role.SUPERVISOR)
   async getQrCode(@Param('id') id: string) {
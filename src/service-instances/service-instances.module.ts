@@ -1,11 +1,12 @@
 import { Module } from '@nestjs/common';
 import { ServiceInstancesService } from './service-instances.service';
 import { ServiceInstancesController } from './service-instances.controller';
+import { InstanceHealthService } from './instance-health.service';
 
 @Module({
   controllers: [ServiceInstancesController],
-  providers: [ServiceInstancesService],
-  exports: [ServiceInstancesService],
+  providers: [ServiceInstancesService, InstanceHealthService],
+  exports: [ServiceInstancesService, InstanceHealthService],
 })
 export class ServiceInstancesModule {}
 
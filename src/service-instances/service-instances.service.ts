@@ -5,9 +5,11 @@ import {
   Logger,
 } from '@nestjs/common';
 import { ServiceInstance } from '@prisma/client';
-import axios from 'axios';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
+import { ProviderHttpService } from '../provider-http/provider-http.service';
+import { InstanceHealthService } from './instance-health.service';
 import { CreateServiceInstanceDto } from './dto/create-service-instance.dto';
 import { UpdateServiceInstanceDto } from './dto/update-service-instance.dto';
 import { ServiceInstanceResponseDto } from './dto/service-instance-response.dto';
@@ -16,12 +18,15 @@ import { ServiceInstanceResponseDto } from './dto/service-instance-response.dto'
 export class ServiceInstancesService {
   private readonly logger = new Logger(ServiceInstancesService.name);
 
-  constructor(private readonly prisma: PrismaService) {}
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly providerHttp: ProviderHttpService,
+    private readonly instanceHealth: InstanceHealthService,
+    private readonly catalogCache: CatalogCacheService,
+  ) {}
 
   async getQrCode(id: string): Promise<{ qrcode?: string; base64?: string; pairingCode?: string; message?: string; instanceName?: string }> {
-    const instance = await this.prisma.serviceInstance.findUnique({
-      where: { id },
-    });
+    const instance = await this.findCachedInstance(id);
 
     if (!instance) {
       throw new NotFoundException('Instância não encontrada');
@@ -43,10 +48,11 @@ export class ServiceInstancesService {
       const connectUrl = `${serverUrl}/instance/connect/${instanceName}`;
       this.logger.log(`Fetching QR Code from: ${connectUrl}`);
 
-      const response = await axios.get(connectUrl, {
+      const response = await this.providerHttp.get(connectUrl, {
         headers: {
           apikey: apiToken,
         },
+        breakerKey: instance.id,
       });
 
       // A Evolution retorna: { instance: { ... }, base64: "..." } ou { code: "..." }
@@ -99,6 +105,9 @@ export class ServiceInstancesService {
         credentials: payload.credentials,
       },
     });
+    await this.catalogCache.invalidate(CATALOG.serviceInstances);
+
+    this.instanceHealth.refreshInBackground(instance);
 
     return this.toResponse(instance);
   }
@@ -118,7 +127,7 @@ export class ServiceInstancesService {
       const createUrl = `${serverUrl.replace(/\/$/, '')}/instance/create`;
       this.logger.log(`Criando instância na Evolution API: ${createUrl}`);
 
-      const response = await axios.post(
+      const response = await this.providerHttp.post(
         createUrl,
         {
           instanceName: instanceName,
@@ -199,7 +208,7 @@ export class ServiceInstancesService {
         url: webhookUrl,
         enabled: true,
         webhook_by_events: true,
-        webhook_base64: true,
+        webhook_base64: false,
         events: [
           'MESSAGES_UPSERT',    // Mensagens recebidas/enviadas
           'MESSAGES_UPDATE',     // Atualização de status (sent, delivered, read)
@@ -209,7 +218,7 @@ export class ServiceInstancesService {
 
       this.logger.debug(`Payload do webhook: ${JSON.stringify(payload)}`);
 
-      const response = await axios.post(
+      const response = await this.providerHttp.post(
         webhookUrlEndpoint,
         payload,
         {
@@ -244,7 +253,7 @@ export class ServiceInstancesService {
               url: webhookUrl,
               enabled: true,
               webhook_by_events: true,
-              webhook_base64: true,
+              webhook_base64: false,
               events: [
                 'MESSAGES_UPSERT',
                 'MESSAGES_UPDATE',
@@ -253,7 +262,7 @@ export class ServiceInstancesService {
             },
           };
 
-          const response = await axios.post(
+          const response = await this.providerHttp.post(
             webhookUrlEndpoint,
             alternativePayload,
             {
@@ -283,22 +292,25 @@ export class ServiceInstancesService {
   }
 
   async findAll(includeInactive = false) {
-    const instances = await this.prisma.serviceInstance.findMany({
-      where: includeInactive
-        ? undefined
-        : {
-            isActive: true,
-          },
-      orderBy: { createdAt: 'desc' },
-    });
+    const instances = await this.catalogCache.getOrLoad(
+      CATALOG.serviceInstances,
+      includeInactive ? 'all' : 'active',
+      () =>
+        this.prisma.serviceInstance.findMany({
+          where: includeInactive
+            ? undefined
+            : {
+                isActive: true,
+              },
+          orderBy: { createdAt: 'desc' },
+        }),
+    );
 
     return instances.map((instance) => this.toResponse(instance));
   }
 
   async findOne(id: string): Promise<ServiceInstanceResponseDto> {
-    const instance = await this.prisma.serviceInstance.findUnique({
-      where: { id },
-    });
+    const instance = await this.findCachedInstance(id);
 
     if (!instance) {
       throw new NotFoundException('Instância não encontrada');
@@ -307,6 +319,24 @@ export class ServiceInstancesService {
     return this.toResponse(instance);
   }
 
+  async getStatus(id: string) {
+    const instance = await this.findCachedInstance(id);
+
+    if (!instance) {
+      throw new NotFoundException('Instância não encontrada');
+    }
+
+    const health = this.instanceHealth.get(instance.id);
+
+    return {
+      id: instance.id,
+      provider: instance.provider,
+      connectionState: health?.state ?? null,
+      checkedAt: health?.checkedAt ?? null,
+      source: health?.source ?? null,
+    };
+  }
+
   async update(
     id: string,
     payload: UpdateServiceInstanceDto,
@@ -347,6 +377,14 @@ export class ServiceInstancesService {
       where: { id },
       data: updateData,
     });
+    // Templates exibem o nome da instância
+    await this.catalogCache.invalidate(CATALOG.serviceInstances, CATALOG.templates);
+
+    if (updated.isActive) {
+      this.instanceHealth.refreshInBackground(updated);
+    } else {
+      this.instanceHealth.forget(updated.id);
+    }
 
     return this.toResponse(updated);
   }
@@ -368,6 +406,17 @@ export class ServiceInstancesService {
       where: { id },
       data: { isActive: false },
     });
+    await this.catalogCache.invalidate(CATALOG.serviceInstances);
+
+    this.instanceHealth.forget(id);
+  }
+
+  private findCachedInstance(id: string) {
+    return this.catalogCache.getOrLoad(CATALOG.serviceInstances, `id:${id}`, () =>
+      this.prisma.serviceInstance.findUnique({
+        where: { id },
+      }),
+    );
   }
 
   private validateCredentials(
@@ -398,6 +447,8 @@ export class ServiceInstancesService {
   }
 
   private toResponse(instance: ServiceInstance): ServiceInstanceResponseDto {
+    const health = this.instanceHealth.get(instance.id);
+
     return {
       id: instance.id,
       name: instance.name,
@@ -405,6 +456,8 @@ export class ServiceInstancesService {
       provider: instance.provider,
       credentials: instance.credentials as Record<string, any>,
       isActive: instance.isActive,
+      connectionState: health?.state ?? null,
+      connectionCheckedAt: health?.checkedAt ?? null,
       createdAt: instance.createdAt,
       updatedAt: instance.updatedAt,
     };
@@ -0,0 +1,35 @@
+import { forEachBounded } from './bounded-parallel';
+
+describe('forEachBounded', () => {
+  it('deve processar todos os itens sem passar do limite de simultaneidade', async () => {
+    let active = 0;
+    let peak = 0;
+    const seen: number[] = [];
+
+    await forEachBounded([1, 2, 3, 4, 5, 6, 7], 3, async (item) => {
+      active++;
+      peak = Math.max(peak, active);
+      await new Promise((resolve) => setTimeout(resolve, 5));
+      seen.push(item);
+      active--;
+    });
+
+    expect(peak).toBe(3);
+    expect(seen.sort()).toEqual([1, 2, 3, 4, 5, 6, 7]);
+  });
+
+  it('deve contar as falhas sem interromper os demais itens', async () => {
+    const seen: number[] = [];
+
+    const failures = await forEachBounded([1, 2, 3, 4], 2, async (item) => {
+      if (item % 2 === 0) {
+        throw new Error('falhou');
+      }
+      seen.push(item);
+    });
+
+    expect(failures).toBe(2);
+    expect(seen.sort()).toEqual([1, 3]);
+    await expect(forEachBounded([], 4, async () => undefined)).resolves.toBe(0);
+  });
+});
@@ -0,0 +1,28 @@
+/**
+ * Executa `worker` para cada item com no máximo `limit` execuções simultâneas.
+ * A falha de um item não interrompe os demais; o total de falhas é devolvido.
+ */
+export async function forEachBounded<T>(
+  items: readonly T[],
+  limit: number,
+  worker: (item: T) => Promise<unknown>,
+): Promise<number> {
+  let next = 0;
+  let failures = 0;
+
+  const run = async () => {
+    while (next < items.length) {
+      const item = items[next++];
+      try {
+        await worker(item);
+      } catch {
+        failures++;
+      }
+    }
+  };
+
+  const lanes = Math.max(1, Math.min(limit, items.length));
+  await Promise.all(Array.from({ length: lanes }, run));
+
+  return failures;
+}
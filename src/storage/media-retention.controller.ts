@@ -0,0 +1,17 @@
+import { Controller, Get } from '@nestjs/common';
+
+import { MediaSweeperService } from './media-sweeper.service';
+import { Roles } from '../common/decorators/roles.decorator';
+import { Role } from '../common/enums/role.enum';
+
+@Controller('storage/media')
+export class MediaRetentionController {
+  constructor(private readonly mediaSweeper: MediaSweeperService) {}
+
+  // Simulação: quanto a retenção e a limpeza de órfãos liberariam agora
+  @Get('retention-report')
+  @Roles(Role.ADMIN)
+  getRetentionReport() {
+    return this.mediaSweeper.buildReport();
+  }
+}
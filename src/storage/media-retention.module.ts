@@ -0,0 +1,9 @@
+import { Module } from '@nestjs/common';
+
+import { MediaRetentionController } from './media-retention.controller';
+
+// Só a rota administrativa; o MediaSweeperService vem do StorageModule (global)
+@Module({
+  controllers: [MediaRetentionController],
+})
+export class MediaRetentionModule {}
@@ -0,0 +1,268 @@
+import { Injectable, Logger } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { Prisma } from '@prisma/client';
+import * as path from 'path';
+import { Readable, Transform } from 'stream';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { forEachBounded } from './bounded-parallel';
+import { StorageService } from './storage.service';
+
+// Caminhos verificados e removidos por transação em `deleteFiles`
+const DELETE_CHUNK_SIZE = 100;
+
+export type StoreMediaOptions = {
+  extension?: string;
+  mimeType?: string | null;
+  transforms?: Transform[];
+};
+
+export type StoredMedia = {
+  storagePath: string;
+  hash: string;
+  size: number;
+  head: Buffer;
+  deduplicated: boolean;
+};
+
+/**
+ * Armazenamento de mídias endereçado por conteúdo.
+ *
+ * Os arquivos são gravados em `media/<aa>/<bb>/<sha256><ext>` e registrados em
+ * `media_blobs` com contagem de referências: a mesma figurinha/imagem recebida
+ * várias vezes ocupa um único arquivo em disco, removido apenas quando a
+ * última mensagem que aponta para ele é liberada. Gravação e remoção do mesmo
+ * hash são serializadas por advisory lock de transação no Postgres.
+ */
+@Injectable()
+export class MediaStoreService {
+  private readonly logger = new Logger(MediaStoreService.name);
+  private readonly maxBytes: number;
+  private readonly deleteConcurrency: number;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly storageService: StorageService,
+    private readonly configService: ConfigService,
+  ) {
+    this.maxBytes =
+      this.configService.get<number>('storage.maxMediaBytes') ?? 64 * 1024 * 1024;
+    this.deleteConcurrency =
+      this.configService.get<number>('storage.mediaSweep.concurrency') ?? 16;
+  }
+
+  /**
+   * Grava o stream em disco (com hash calculado durante a escrita) e retorna o
+   * caminho do blob já com uma referência adquirida para quem chamou.
+   */
+  async storeStream(
+    source: Readable,
+    options: StoreMediaOptions = {},
+  ): Promise<StoredMedia> {
+    const temp = await this.storageService.writeTempStream(source, {
+      transforms: options.transforms,
+      maxBytes: this.maxBytes,
+    });
+
+    if (temp.size === 0) {
+      await this.storageService.discardTemp(temp.tempPath);
+      throw new Error('Conteúdo de mídia vazio');
+    }
+
+    try {
+      // Mesmo lock por hash de `deleteFiles`: o arquivo não é removido entre a
+      // checagem do blob e a gravação
+      return await this.prisma.$transaction(async (tx) => {
+        await this.lockHashes(tx, [temp.hash]);
+
+        const existing = await this.acquireByHash(tx, temp.hash);
+        if (existing) {
+          // Blob compartilhado cujo arquivo sumiu: o download novo ocupa o mesmo caminho
+          if (await this.storageService.fileExists(existing)) {
+            await this.storageService.discardTemp(temp.tempPath);
+          } else {
+            await this.storageService.commitTemp(temp.tempPath, existing);
+          }
+          return {
+            storagePath: existing,
+            hash: temp.hash,
+            size: temp.size,
+            head: temp.head,
+            deduplicated: true,
+          };
+        }
+
+        const storagePath = this.buildStoragePath(temp.hash, options.extension);
+        await this.storageService.commitTemp(temp.tempPath, storagePath);
+        await tx.mediaBlob.create({
+          data: {
+            hash: temp.hash,
+            storagePath,
+            size: temp.size,
+            mimeType: options.mimeType ?? null,
+            refCount: 1,
+          },
+        });
+
+        return {
+          storagePath,
+          hash: temp.hash,
+          size: temp.size,
+          head: temp.head,
+          deduplicated: false,
+        };
+      });
+    } catch (error) {
+      // Arquivo já movido sem blob fica para a varredura de órfãos
+      await this.storageService.discardTemp(temp.tempPath);
+      throw error;
+    }
+  }
+
+  /**
+   * Libera uma referência para cada caminho informado. Blobs sem referências
+   * são removidos do disco; arquivos antigos (sem blob) são apagados direto.
+   */
+  async release(storagePaths: string[]): Promise<number> {
+    const removable = await this.prisma.$transaction((tx) =>
+      this.releaseWithin(tx, storagePaths),
+    );
+    await this.deleteFiles(removable);
+    return removable.length;
+  }
+
+  /**
+   * Parte de banco do `release`, dentro da transação de quem chama: decrementa
+   * as referências, apaga os blobs zerados e devolve os caminhos que podem sair
+   * do disco. Os arquivos só devem ser removidos depois do commit.
+   */
+  async releaseWithin(
+    tx: Prisma.TransactionClient,
+    storagePaths: string[],
+  ): Promise<string[]> {
+    const counts = new Map<string, number>();
+    for (const storagePath of storagePaths) {
+      if (storagePath) {
+        counts.set(storagePath, (counts.get(storagePath) ?? 0) + 1);
+      }
+    }
+    if (counts.size === 0) {
+      return [];
+    }
+
+    const paths = Array.from(counts.keys());
+    const blobs = await tx.mediaBlob.findMany({
+      where: { storagePath: { in: paths } },
+      select: { storagePath: true },
+    });
+    const blobPaths = new Set(blobs.map((blob) => blob.storagePath));
+    const removable = paths.filter((storagePath) => !blobPaths.has(storagePath));
+
+    if (blobPaths.size === 0) {
+      return removable;
+    }
+
+    const decrements = Prisma.join(
+      Array.from(blobPaths).map(
+        (storagePath) => Prisma.sql`(${storagePath}, ${counts.get(storagePath) ?? 1})`,
+      ),
+    );
+    await tx.$executeRaw`
+      UPDATE "media_blobs" AS b
+      SET "refCount" = b."refCount" - v."refs"::int, "updatedAt" = NOW()
+      FROM (VALUES ${decrements}) AS v("storagePath", "refs")
+      WHERE b."storagePath" = v."storagePath"
+    `;
+
+    const removed = await tx.$queryRaw<{ storagePath: string }[]>`
+      DELETE FROM "media_blobs"
+      WHERE "storagePath" IN (${Prisma.join(Array.from(blobPaths))})
+        AND "refCount" <= 0
+      RETURNING "storagePath"
+    `;
+
+    if (removed.length > 0) {
+      this.logger.debug(`${removed.length} blob(s) de mídia sem referências removidos`);
+    }
+
+    return removable.concat(removed.map((blob) => blob.storagePath));
+  }
+
+  /**
+   * Remove os arquivos do disco com no máximo `MEDIA_SWEEP_CONCURRENCY`
+   * remoções simultâneas. Sob o lock por hash, confere antes que nenhum blob
+   * voltou a usar o caminho (ex.: a mesma mídia recebida de novo depois do
+   * commit que zerou as referências).
+   */
+  async deleteFiles(storagePaths: string[]): Promise<void> {
+    const unique = Array.from(new Set(storagePaths.filter(Boolean))).sort();
+
+    for (let offset = 0; offset < unique.length; offset += DELETE_CHUNK_SIZE) {
+      const chunk = unique.slice(offset, offset + DELETE_CHUNK_SIZE);
+
+      await this.prisma.$transaction(async (tx) => {
+        await this.lockHashes(tx, chunk.map((storagePath) => this.hashOf(storagePath)));
+
+        const reused = await tx.mediaBlob.findMany({
+          where: { storagePath: { in: chunk } },
+          select: { storagePath: true },
+        });
+        const reusedPaths = new Set(reused.map((blob) => blob.storagePath));
+
+        await forEachBounded(
+          chunk.filter((storagePath) => !reusedPaths.has(storagePath)),
+          this.deleteConcurrency,
+          (storagePath) => this.storageService.deleteFile(storagePath),
+        );
+      });
+    }
+  }
+
+  private async acquireByHash(
+    tx: Prisma.TransactionClient,
+    hash: string,
+  ): Promise<string | null> {
+    const updated = await tx.mediaBlob.updateMany({
+      where: { hash },
+      data: { refCount: { increment: 1 } },
+    });
+    if (updated.count === 0) {
+      return null;
+    }
+
+    const blob = await tx.mediaBlob.findUnique({
+      where: { hash },
+      select: { storagePath: true },
+    });
+    return blob?.storagePath ?? null;
+  }
+
+  // Locks de transação, sempre em ordem crescente para não haver deadlock
+  private async lockHashes(tx: Prisma.TransactionClient, hashes: string[]) {
+    const keys = Array.from(new Set(hashes)).sort();
+    if (keys.length === 0) {
+      return;
+    }
+    await tx.$executeRaw`
+      SELECT pg_advisory_xact_lock(hashtextextended(k, 0))
+      FROM unnest(${keys}::text[]) WITH ORDINALITY AS t(k, n)
+      ORDER BY n
+    `;
+  }
+
+  // `media/<aa>/<bb>/<sha256><ext>` -> sha256 (caminhos antigos usam o próprio nome)
+  private hashOf(storagePath: string): string {
+    const name = path.posix.basename(storagePath.replace(/\\/g, '/'));
+    const dot = name.indexOf('.');
+    return dot === -1 ? name : name.slice(0, dot);
+  }
+
+  private buildStoragePath(hash: string, extension?: string): string {
+    const safeExtension = (extension ?? '').replace(/[^a-z0-9.]/gi, '').toLowerCase();
+    const suffix =
+      safeExtension && !safeExtension.startsWith('.')
+        ? `.${safeExtension}`
+        : safeExtension;
+    return `media/${hash.slice(0, 2)}/${hash.slice(2, 4)}/${hash}${suffix}`;
+  }
+}
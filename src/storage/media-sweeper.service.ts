@@ -0,0 +1,352 @@
+import { Injectable, Logger } from '@nestjs/common';
+import { ConfigService } from '@nestjs/config';
+import { Prisma } from '@prisma/client';
+import { Dirent, promises as fs } from 'fs';
+import * as path from 'path';
+
+import { PrismaService } from '../prisma/prisma.service';
+import { RedisService } from '../redis/redis.service';
+import { MediaStoreService } from './media-store.service';
+import { StorageService } from './storage.service';
+
+type SweepCursor = { storedAt: Date; id: string };
+
+type SweptRow = { id: string; mediaStoragePath: string; storedAt: Date };
+
+type StoredFile = { storagePath: string; size: number };
+
+export type MediaSweepResult = {
+  messages: number;
+  files: number;
+  completed: boolean;
+};
+
+export type ReclaimableMedia = { files: number; bytes: number };
+
+export type MediaRetentionReport = {
+  cutoff: string;
+  expired: ReclaimableMedia & { messages: number };
+  unreferencedBlobs: ReclaimableMedia;
+  orphanFiles: ReclaimableMedia;
+  totalBytes: number;
+};
+
+// Diretórios varridos em busca de arquivos órfãos (CSVs e exportações ficam de fora)
+const MEDIA_DIR = 'media';
+const TEMP_DIR = 'tmp';
+
+/**
+ * Retenção de mídias.
+ *
+ * A varredura de expiradas percorre `messages` em ordem de (mediaStoredAt, id)
+ * a partir de um cursor salvo no Redis: cada lote limpa `mediaStoragePath` e
+ * libera as referências na mesma transação, grava o cursor e só então remove
+ * os arquivos, em paralelo. Interrompida (deploy, troca de líder, tempo
+ * esgotado), a próxima execução continua de onde parou. Arquivos cuja remoção
+ * não chegou a acontecer são recolhidos pela varredura de órfãos, que compara
+ * o diretório de storage com `media_blobs` e `messages`.
+ *
+ * O cursor só avança (é uma marca d'água). A retenção conta a partir da
+ * gravação do arquivo (`mediaStoredAt`), não da mensagem: mídia rebaixada
+ * depois para uma mensagem antiga recebe um `mediaStoredAt` novo e fica à
+ * frente do cursor. Para revarrer desde o início basta apagar a chave
+ * `<BULLMQ_PREFIX>:media-sweep:cursor`.
+ */
+@Injectable()
+export class MediaSweeperService {
+  private readonly logger = new Logger(MediaSweeperService.name);
+  private readonly cursorKey: string;
+  private readonly retentionDays: number;
+  private readonly batchSize: number;
+  private readonly maxRunMs: number;
+  private readonly orphanGraceMs: number;
+
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly redis: RedisService,
+    private readonly storageService: StorageService,
+    private readonly mediaStore: MediaStoreService,
+    private readonly configService: ConfigService,
+  ) {
+    this.cursorKey = this.redis.key('media-sweep', 'cursor');
+    this.retentionDays =
+      this.configService.get<number>('storage.mediaRetentionDays') ?? 3;
+    this.batchSize =
+      this.configService.get<number>('storage.mediaSweep.batchSize') ?? 500;
+    this.maxRunMs =
+      this.configService.get<number>('storage.mediaSweep.maxRunMs') ?? 600000;
+    this.orphanGraceMs =
+      (this.configService.get<number>('storage.mediaSweep.orphanGraceMinutes') ?? 60) *
+      60 * 1000;
+  }
+
+  retentionCutoff(now = new Date()): Date {
+    const cutoff = new Date(now);
+    cutoff.setDate(cutoff.getDate() - this.retentionDays);
+    return cutoff;
+  }
+
+  /**
+   * Remove as mídias gravadas há mais de `MEDIA_RETENTION_DAYS`, até
+   * acabar o backlog, esgotar `MEDIA_SWEEP_MAX_RUN_MS` ou `shouldContinue`
+   * retornar false.
+   */
+  async sweepExpired(shouldContinue: () => boolean = () => true): Promise<MediaSweepResult> {
+    const cutoff = this.retentionCutoff();
+    const deadline = Date.now() + this.maxRunMs;
+    let cursor = await this.loadCursor();
+    let messages = 0;
+    let files = 0;
+
+    while (shouldContinue() && Date.now() < deadline) {
+      const after = cursor
+        ? Prisma.sql`AND ("mediaStoredAt", "id") > (${cursor.storedAt}, ${cursor.id})`
+        : Prisma.empty;
+
+      const { rows, removable } = await this.prisma.$transaction(async (tx) => {
+        // O IS NOT NULL no UPDATE descarta linhas liberadas em paralelo (ex.: mídia ausente)
+        const rows = await tx.$queryRaw<SweptRow[]>`
+          WITH batch AS (
+            SELECT "id", "mediaStoragePath", "mediaStoredAt"
+            FROM "messages"
+            WHERE "mediaStoragePath" IS NOT NULL
+              AND "mediaStoredAt" < ${cutoff}
+              ${after}
+            ORDER BY "mediaStoredAt", "id"
+            LIMIT ${this.batchSize}
+          )
+          UPDATE "messages" AS m
+          SET "mediaStoragePath" = NULL, "mediaStoredAt" = NULL
+          FROM batch
+          WHERE m."id" = batch."id" AND m."mediaStoragePath" IS NOT NULL
+          RETURNING batch."id", batch."mediaStoragePath", batch."mediaStoredAt" AS "storedAt"
+        `;
+        const removable = await this.mediaStore.releaseWithin(
+          tx,
+          rows.map((row) => row.mediaStoragePath),
+        );
+        return { rows, removable };
+      });
+
+      if (rows.length === 0) {
+        return { messages, files, completed: true };
+      }
+
+      cursor = rows.reduce<SweepCursor>(
+        (last, row) =>
+          row.storedAt > last.storedAt ||
+          (row.storedAt.getTime() === last.storedAt.getTime() && row.id > last.id)
+            ? { storedAt: row.storedAt, id: row.id }
+            : last,
+        { storedAt: rows[0].storedAt, id: rows[0].id },
+      );
+      await this.saveCursor(cursor);
+      await this.mediaStore.deleteFiles(removable);
+
+      messages += rows.length;
+      files += removable.length;
+
+      if (rows.length < this.batchSize) {
+        return { messages, files, completed: true };
+      }
+    }
+
+    return { messages, files, completed: false };
+  }
+
+  /**
+   * Remove blobs sem nenhuma mensagem apontando para eles (contagem de
+   * referências perdida) e arquivos em `media/` e `tmp/` sem blob nem mensagem.
+   * Só considera o que não foi tocado há `MEDIA_ORPHAN_GRACE_MINUTES`, para
+   * não disputar com uploads em andamento. Com `dryRun` apenas contabiliza.
+   */
+  async sweepOrphans(
+    dryRun: boolean,
+    shouldContinue: () => boolean = () => true,
+  ): Promise<{ unreferencedBlobs: ReclaimableMedia; orphanFiles: ReclaimableMedia }> {
+    const graceCutoff = new Date(Date.now() - this.orphanGraceMs);
+    const unreferencedBlobs = await this.sweepUnreferencedBlobs(graceCutoff, dryRun);
+    const orphanFiles: ReclaimableMedia = { files: 0, bytes: 0 };
+
+    let chunk: StoredFile[] = [];
+    const flush = async () => {
+      const orphans = await this.findOrphans(chunk);
+      chunk = [];
+      orphanFiles.files += orphans.length;
+      orphanFiles.bytes += orphans.reduce((total, file) => total + file.size, 0);
+      if (!dryRun) {
+        await this.mediaStore.deleteFiles(orphans.map((file) => file.storagePath));
+      }
+    };
+
+    for await (const file of this.walkFiles(MEDIA_DIR, graceCutoff)) {
+      if (!shouldContinue()) {
+        break;
+      }
+      chunk.push(file);
+      if (chunk.length >= this.batchSize) {
+        await flush();
+      }
+    }
+    if (chunk.length > 0) {
+      await flush();
+    }
+
+    // Sobras de gravações interrompidas (.part) nunca têm referência
+    for await (const file of this.walkFiles(TEMP_DIR, graceCutoff)) {
+      orphanFiles.files++;
+      orphanFiles.bytes += file.size;
+      if (!dryRun) {
+        await this.storageService.deleteFile(file.storagePath);
+      }
+    }
+
+    return { unreferencedBlobs, orphanFiles };
+  }
+
+  /**
+   * Relatório (sem remover nada) do espaço que a retenção liberaria agora.
+   */
+  async buildReport(): Promise<MediaRetentionReport> {
+    const cutoff = this.retentionCutoff();
+
+    // Um blob só sai do disco se todas as suas referências estiverem expiradas
+    const [expired] = await this.prisma.$queryRaw<
+      { messages: number; files: number; bytes: number }[]
+    >`
+      SELECT
+        COALESCE(SUM(e."refs"), 0)::int AS "messages",
+        COUNT(*) FILTER (WHERE b."hash" IS NULL OR b."refCount" <= e."refs")::int AS "files",
+        COALESCE(
+          SUM(COALESCE(b."size", e."size"))
+            FILTER (WHERE b."hash" IS NULL OR b."refCount" <= e."refs"),
+          0
+        )::float8 AS "bytes"
+      FROM (
+        SELECT "mediaStoragePath" AS "storagePath", COUNT(*) AS "refs", MAX("mediaSize") AS "size"
+        FROM "messages"
+        WHERE "mediaStoragePath" IS NOT NULL AND "mediaStoredAt" < ${cutoff}
+        GROUP BY "mediaStoragePath"
+      ) e
+      LEFT JOIN "media_blobs" b ON b."storagePath" = e."storagePath"
+    `;
+
+    const { unreferencedBlobs, orphanFiles } = await this.sweepOrphans(true);
+
+    return {
+      cutoff: cutoff.toISOString(),
+      expired,
+      unreferencedBlobs,
+      orphanFiles,
+      totalBytes: expired.bytes + unreferencedBlobs.bytes + orphanFiles.bytes,
+    };
+  }
+
+  private async sweepUnreferencedBlobs(
+    graceCutoff: Date,
+    dryRun: boolean,
+  ): Promise<ReclaimableMedia> {
+    const orphanCondition = Prisma.sql`
+      b."updatedAt" < ${graceCutoff}
+      AND NOT EXISTS (
+        SELECT 1 FROM "messages" m WHERE m."mediaStoragePath" = b."storagePath"
+      )
+    `;
+
+    if (dryRun) {
+      const [summary] = await this.prisma.$queryRaw<ReclaimableMedia[]>`
+        SELECT COUNT(*)::int AS "files", COALESCE(SUM(b."size"), 0)::float8 AS "bytes"
+        FROM "media_blobs" b
+        WHERE ${orphanCondition}
+      `;
+      return summary;
+    }
+
+    const removed = await this.prisma.$queryRaw<StoredFile[]>`
+      DELETE FROM "media_blobs" b
+      WHERE ${orphanCondition}
+      RETURNING b."storagePath", b."size"
+    `;
+    await this.mediaStore.deleteFiles(removed.map((blob) => blob.storagePath));
+
+    return {
+      files: removed.length,
+      bytes: removed.reduce((total, blob) => total + blob.size, 0),
+    };
+  }
+
+  private async findOrphans(files: StoredFile[]): Promise<StoredFile[]> {
+    const paths = files.map((file) => file.storagePath);
+    const referenced = await this.prisma.$queryRaw<{ storagePath: string }[]>`
+      SELECT "storagePath" FROM "media_blobs"
+      WHERE "storagePath" IN (${Prisma.join(paths)})
+      UNION
+      SELECT "mediaStoragePath" FROM "messages"
+      WHERE "mediaStoragePath" IN (${Prisma.join(paths)})
+    `;
+    const keep = new Set(referenced.map((row) => row.storagePath));
+    return files.filter((file) => !keep.has(file.storagePath));
+  }
+
+  /**
+   * Percorre um diretório do storage devolvendo arquivos (caminho relativo ao
+   * basePath, com `/`) modificados antes de `olderThan`.
+   */
+  private async *walkFiles(
+    relativeDir: string,
+    olderThan: Date,
+  ): AsyncGenerator<StoredFile> {
+    const absoluteDir = this.storageService.resolveRelativePath(relativeDir);
+    let entries: Dirent[];
+    try {
+      entries = await fs.readdir(absoluteDir, { withFileTypes: true });
+    } catch (error: any) {
+      if (error.code !== 'ENOENT') {
+        this.logger.warn(`Falha ao listar ${absoluteDir}: ${error.message}`);
+      }
+      return;
+    }
+
+    for (const entry of entries) {
+      const relativePath = path.posix.join(relativeDir, entry.name);
+      if (entry.isDirectory()) {
+        yield* this.walkFiles(relativePath, olderThan);
+        continue;
+      }
+      if (!entry.isFile()) {
+        continue;
+      }
+
+      const stats = await fs
+        .stat(path.join(absoluteDir, entry.name))
+        .catch(() => null);
+      if (stats && stats.mtime < olderThan) {
+        yield { storagePath: relativePath, size: stats.size };
+      }
+    }
+  }
+
+  private async loadCursor(): Promise<SweepCursor | null> {
+    const raw = await this.redis.get(this.cursorKey);
+    if (!raw) {
+      return null;
+    }
+    try {
+      const parsed = JSON.parse(raw) as { storedAt?: string; id?: string };
+      // Cursor no formato antigo (createdAt) é descartado: a varredura recomeça
+      if (!parsed.storedAt || !parsed.id) {
+        return null;
+      }
+      return { storedAt: new Date(parsed.storedAt), id: parsed.id };
+    } catch {
+      return null;
+    }
+  }
+
+  private async saveCursor(cursor: SweepCursor): Promise<void> {
+    await this.redis.set(
+      this.cursorKey,
+      JSON.stringify({ storedAt: cursor.storedAt.toISOString(), id: cursor.id }),
+    );
+  }
+}
@@ -1,12 +1,14 @@
 import { Global, Module } from '@nestjs/common';
 import { ConfigModule } from '@nestjs/config';
 
+import { MediaStoreService } from './media-store.service';
+import { MediaSweeperService } from './media-sweeper.service';
 import { StorageService } from './storage.service';
 
 @Global()
 @Module({
   imports: [ConfigModule],
-  providers: [StorageService],
-  exports: [StorageService],
+  providers: [StorageService, MediaStoreService, MediaSweeperService],
+  exports: [StorageService, MediaStoreService, MediaSweeperService],
 })
 export class StorageModule {}
@@ -1,7 +1,10 @@
 import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
-import { promises as fs } from 'fs';
+import { createHash, randomUUID } from 'crypto';
+import { createWriteStream, promises as fs } from 'fs';
 import * as path from 'path';
+import { Readable, Transform } from 'stream';
+import { pipeline } from 'stream/promises';
 
 export type SaveFileOptions = {
   buffer: Buffer;
@@ -17,6 +20,28 @@ export type SavedFileMetadata = {
   size: number;
 };
 
+export type TempFileMetadata = {
+  tempPath: string;
+  hash: string;
+  size: number;
+  head: Buffer;
+};
+
+export type WriteTempOptions = {
+  transforms?: Transform[];
+  maxBytes?: number;
+};
+
+export class MediaTooLargeError extends Error {
+  constructor(readonly maxBytes: number) {
+    super(`Mídia excede o limite de ${maxBytes} bytes`);
+    this.name = 'MediaTooLargeError';
+  }
+}
+
+// Quantidade de bytes iniciais mantidos em memória para validação do conteúdo
+const HEAD_BYTES = 64;
+
 @Injectable()
 export class StorageService implements OnModuleInit {
   private readonly logger = new Logger(StorageService.name);
@@ -60,6 +85,77 @@ export class StorageService implements OnModuleInit {
     };
   }
 
+  /**
+   * Grava um stream em um arquivo temporário calculando o SHA-256 durante a
+   * escrita, sem carregar o conteúdo inteiro em memória. Apenas os primeiros
+   * bytes (`head`) ficam disponíveis para validação.
+   */
+  async writeTempStream(
+    source: Readable,
+    options: WriteTempOptions = {},
+  ): Promise<TempFileMetadata> {
+    const tempDir = path.join(this.basePath, 'tmp');
+    await this.ensureDirectory(tempDir);
+    const tempPath = path.join(tempDir, `${randomUUID()}.part`);
+
+    const hash = createHash('sha256');
+    const headChunks: Buffer[] = [];
+    let headLength = 0;
+    let size = 0;
+    const maxBytes = options.maxBytes;
+
+    const meter = new Transform({
+      transform(chunk: Buffer, _encoding, callback) {
+        size += chunk.length;
+        if (maxBytes && size > maxBytes) {
+          callback(new MediaTooLargeError(maxBytes));
+          return;
+        }
+        if (headLength < HEAD_BYTES) {
+          const slice = chunk.subarray(0, HEAD_BYTES - headLength);
+          headChunks.push(slice);
+          headLength += slice.length;
+        }
+        hash.update(chunk);
+        callback(null, chunk);
+      },
+    });
+
+    try {
+      await pipeline([
+        source,
+        ...(options.transforms ?? []),
+        meter,
+        createWriteStream(tempPath),
+      ]);
+    } catch (error) {
+      await this.discardTemp(tempPath);
+      throw error;
+    }
+
+    return {
+      tempPath,
+      hash: hash.digest('hex'),
+      size,
+      head: Buffer.concat(headChunks),
+    };
+  }
+
+  /**
+   * Move um arquivo temporário para o caminho definitivo (relativo ao basePath).
+   */
+  async commitTemp(tempPath: string, relativePath: string): Promise<string> {
+    const absolutePath = this.resolveRelativePath(relativePath);
+    await this.ensureDirectory(path.dirname(absolutePath));
+    await fs.rename(tempPath, absolutePath);
+    this.logger.debug(`Arquivo salvo em ${absolutePath}`);
+    return absolutePath;
+  }
+
+  async discardTemp(tempPath: string): Promise<void> {
+    await fs.rm(tempPath, { force: true }).catch(() => undefined);
+  }
+
   resolveRelativePath(relativePath: string): string {
     const sanitized = this.sanitizeRelativePath(relativePath);
     return path.join(this.basePath, sanitized);
@@ -69,6 +165,15 @@ export class StorageService implements OnModuleInit {
     return this.toPosixPath(this.sanitizeRelativePath(relativePath));
   }
 
+  async fileExists(relativePath: string): Promise<boolean> {
+    try {
+      await fs.access(this.resolveRelativePath(relativePath));
+      return true;
+    } catch {
+      return false;
+    }
+  }
+
   async deleteFile(relativePath: string): Promise<void> {
     if (!relativePath) {
       return;
@@ -6,13 +6,17 @@ import {
 import { Tabulation, Prisma } from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
 import { CreateTabulationDto } from './dto/create-tabulation.dto';
 import { UpdateTabulationDto } from './dto/update-tabulation.dto';
 import { TabulationResponseDto } from './dto/tabulation-response.dto';
 
 @Injectable()
 export class TabulationsService {
-  constructor(private readonly prisma: PrismaService) {}
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly catalogCache: CatalogCacheService,
+  ) {}
 
   async create(payload: CreateTabulationDto): Promise<TabulationResponseDto> {
     try {
@@ -21,6 +25,7 @@ export class TabulationsService {
           name: payload.name.trim(),
         },
       });
+      await this.catalogCache.invalidate(CATALOG.tabulations);
 
       return this.toResponse(tabulation);
     } catch (error) {
@@ -35,17 +40,27 @@ export class TabulationsService {
   }
 
   async findAll() {
-    const tabulations = await this.prisma.tabulation.findMany({
-      orderBy: { name: 'asc' },
-    });
+    const tabulations = await this.catalogCache.getOrLoad(
+      CATALOG.tabulations,
+      'all',
+      () =>
+        this.prisma.tabulation.findMany({
+          orderBy: { name: 'asc' },
+        }),
+    );
 
     return tabulations.map((tabulation) => this.toResponse(tabulation));
   }
 
   async findOne(id: string): Promise<TabulationResponseDto> {
-    const tabulation = await this.prisma.tabulation.findUnique({
-      where: { id },
-    });
+    const tabulation = await this.catalogCache.getOrLoad(
+      CATALOG.tabulations,
+      `id:${id}`,
+      () =>
+        this.prisma.tabulation.findUnique({
+          where: { id },
+        }),
+    );
 
     if (!tabulation) {
       throw new NotFoundException('Tabulação não encontrada');
@@ -73,6 +88,7 @@ export class TabulationsService {
           name: payload.name?.trim(),
         },
       });
+      await this.catalogCache.invalidate(CATALOG.tabulations);
 
       return this.toResponse(updated);
     } catch (error) {
@@ -105,6 +121,7 @@ export class TabulationsService {
     }
 
     await this.prisma.tabulation.delete({ where: { id } });
+    await this.catalogCache.invalidate(CATALOG.tabulations);
   }
 
   private toResponse(tabulation: Tabulation): TabulationResponseDto {
@@ -2,13 +2,17 @@ import { Injectable, NotFoundException, BadRequestException } from '@nestjs/comm
 import { Template } from '@prisma/client';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
 import { CreateTemplateDto } from './dto/create-template.dto';
 import { UpdateTemplateDto } from './dto/update-template.dto';
 import { TemplateResponseDto } from './dto/template-response.dto';
 
 @Injectable()
 export class TemplatesService {
-  constructor(private readonly prisma: PrismaService) {}
+  constructor(
+    private readonly prisma: PrismaService,
+    private readonly catalogCache: CatalogCacheService,
+  ) {}
 
   async create(payload: CreateTemplateDto): Promise<TemplateResponseDto> {
     const serviceInstance = await this.prisma.serviceInstance.findUnique({
@@ -32,40 +36,56 @@ export class TemplatesService {
         serviceInstance: true,
       },
     });
+    await this.catalogCache.invalidate(CATALOG.templates);
 
     return this.toResponse(template);
   }
 
   async findAll() {
-    const templates = await this.prisma.template.findMany({
-      include: {
-        serviceInstance: true,
-      },
-      orderBy: { name: 'asc' },
-    });
+    const templates = await this.catalogCache.getOrLoad(
+      CATALOG.templates,
+      'all',
+      () =>
+        this.prisma.template.findMany({
+          include: {
+            serviceInstance: true,
+          },
+          orderBy: { name: 'asc' },
+        }),
+    );
 
     return templates.map((template) => this.toResponse(template));
   }
 
   async findByServiceInstance(serviceInstanceId: string) {
-    const templates = await this.prisma.template.findMany({
-      where: { serviceInstanceId },
-      include: {
-        serviceInstance: true,
-      },
-      orderBy: { name: 'asc' },
-    });
+    const templates = await this.catalogCache.getOrLoad(
+      CATALOG.templates,
+      `instance:${serviceInstanceId}`,
+      () =>
+        this.prisma.template.findMany({
+          where: { serviceInstanceId },
+          include: {
+            serviceInstance: true,
+          },
+          orderBy: { name: 'asc' },
+        }),
+    );
 
     return templates.map((template) => this.toResponse(template));
   }
 
   async findOne(id: string): Promise<TemplateResponseDto> {
-    const template = await this.prisma.template.findUnique({
-      where: { id },
-      include: {
-        serviceInstance: true,
-      },
-    });
+    const template = await this.catalogCache.getOrLoad(
+      CATALOG.templates,
+      `id:${id}`,
+      () =>
+        this.prisma.template.findUnique({
+          where: { id },
+          include: {
+            serviceInstance: true,
+          },
+        }),
+    );
 
     if (!template) {
       throw new NotFoundException('Template não encontrado');
@@ -110,6 +130,7 @@ export class TemplatesService {
         serviceInstance: true,
       },
     });
+    await this.catalogCache.invalidate(CATALOG.templates);
 
     return this.toResponse(updated);
   }
@@ -133,6 +154,7 @@ export class TemplatesService {
     }
 
     await this.prisma.template.delete({ where: { id } });
+    await this.catalogCache.invalidate(CATALOG.templates);
   }
 
   private toResponse(
@@ -9,6 +9,7 @@ export class UserResponseDto {
   isOnline: boolean;
   onlineSince: Date | null;
   lastConversationAssignedAt: Date | null;
+  maxOpenConversations: number | null;
   createdAt: Date;
   updatedAt: Date;
 }
@@ -16,6 +16,7 @@ import { PaginationQueryDto } from '../common/dto/pagination-query.dto';
 import { UpdateUserDto } from './dto/update-user.dto';
 import { ConversationsService } from '../conversations/conversations.service';
 import { ChatGateway } from '../websockets/chat.gateway';
+import { OperatorAssignmentService } from '../assignment/operator-assignment.service';
 
 @Injectable()
 export class UsersService {
@@ -27,6 +28,7 @@ export class UsersService {
     private readonly conversationsService: ConversationsService,
     @Inject(forwardRef(() => ChatGateway))
     private readonly chatGateway: ChatGateway,
+    private readonly assignment: OperatorAssignmentService,
   ) {}
 
   async create(payload: CreateUserDto): Promise<UserResponseDto> {
@@ -49,6 +51,7 @@ export class UsersService {
           password: hashedPassword,
           role: payload.role,
           isActive: payload.isActive ?? true,
+          maxOpenConversations: payload.maxOpenConversations,
         },
       });
 
@@ -120,10 +123,14 @@ export class UsersService {
         email: payload.email ?? user.email,
         role: payload.role ?? user.role,
         isActive: payload.isActive ?? user.isActive,
+        maxOpenConversations: payload.maxOpenConversations ?? user.maxOpenConversations,
         password,
       },
     });
 
+    // Capacidade, papel ou desativação mudam a elegibilidade na fila de atribuição
+    await this.assignment.setOnline(updated, updated.isOnline);
+
     return this.toResponse(updated);
   }
 
@@ -135,6 +142,7 @@ export class UsersService {
     }
 
     await this.prisma.user.delete({ where: { id } });
+    await this.assignment.setOnline(user, false);
   }
 
   async toggleOnlineStatus(userId: string, isOnline: boolean): Promise<UserResponseDto> {
@@ -154,6 +162,8 @@ export class UsersService {
       },
     });
 
+    await this.assignment.setOnline(updated, isOnline);
+
     // Se o operador ficou online, tentar atribuir conversas da fila
     if (isOnline && (user.role === 'OPERATOR' || user.role === 'SUPERVISOR')) {
       await this.assignQueuedConversationsToOperator(userId);
@@ -205,12 +215,8 @@ export class UsersService {
       const updatedConversation = await this.conversationsService.findOne(conversation.id);
       this.chatGateway.emitConversationUpdate(conversation.id, updatedConversation);
 
-      // Notificar o operador especificamente
-      this.chatGateway.server.emit('conversation:assigned', {
-        conversationId: conversation.id,
-        operatorId,
-        conversation: updatedConversation,
-      });
+      // Notificar o operador atribuído (e a supervisão)
+      this.chatGateway.emitConversationAssigned(updatedConversation);
     } catch (error) {
       this.logger.error(
         `Erro ao atribuir conversas da fila ao operador ${operatorId}: ${error.message}`,
@@ -0,0 +1,72 @@
+import { Base64FieldExtractor } from './base64-field-extractor';
+
+async function extract(json: string, chunkSize: number) {
+  const extractor = new Base64FieldExtractor();
+  const chunks: Buffer[] = [];
+  extractor.on('data', (chunk: Buffer) => chunks.push(chunk));
+  const finished = new Promise((resolve) => extractor.on('end', resolve));
+
+  const input = Buffer.from(json, 'utf8');
+  for (let offset = 0; offset < input.length; offset += chunkSize) {
+    extractor.write(input.subarray(offset, offset + chunkSize));
+  }
+  extractor.end();
+  await finished;
+
+  return { extractor, data: Buffer.concat(chunks) };
+}
+
+describe('Base64FieldExtractor', () => {
+  const media = Buffer.from(
+    Array.from({ length: 1000 }, (_, index) => (index * 37) % 256),
+  );
+
+  it('deve decodificar o campo base64 mesmo dividido em vários chunks', async () => {
+    const json = JSON.stringify({
+      fileName: 'ção.jpg',
+      base64: media.toString('base64'),
+      mimetype: 'image/jpeg',
+    });
+
+    for (const chunkSize of [1, 7, 4096]) {
+      const { extractor, data } = await extract(json, chunkSize);
+
+      expect(data.equals(media)).toBe(true);
+      expect(extractor.found).toBe(true);
+      expect(extractor.getEnvelope()).toEqual({
+        fileName: 'ção.jpg',
+        base64: '',
+        mimetype: 'image/jpeg',
+      });
+    }
+  });
+
+  it('deve aceitar data URI e barras escapadas', async () => {
+    const encoded = media.toString('base64').replace(/\//g, '\\/');
+    const { extractor, data } = await extract(
+      `{"base64" : "data:image/png;base64,${encoded}"}`,
+      13,
+    );
+
+    expect(data.equals(media)).toBe(true);
+    expect(extractor.mimeTypeFromData).toBe('image/png');
+  });
+
+  it('deve aceitar a mídia no campo data', async () => {
+    const { extractor, data } = await extract(
+      JSON.stringify({ data: media.toString('base64'), mimetype: 'audio/ogg' }),
+      64,
+    );
+
+    expect(data.equals(media)).toBe(true);
+    expect(extractor.getEnvelope()).toEqual({ data: '', mimetype: 'audio/ogg' });
+  });
+
+  it('deve sinalizar quando a resposta não tem o campo base64', async () => {
+    const { extractor, data } = await extract('{"error":"not found"}', 5);
+
+    expect(extractor.found).toBe(false);
+    expect(data.length).toBe(0);
+    expect(extractor.getEnvelope()).toEqual({ error: 'not found' });
+  });
+});
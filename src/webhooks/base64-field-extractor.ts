@@ -0,0 +1,145 @@
+import { Transform, TransformCallback } from 'stream';
+
+// Algumas versões da Evolution devolvem a mídia em `data` em vez de `base64`
+const FIELD_PATTERN = /"(?:base64|data)"\s*:\s*"/;
+// Trecho final mantido entre chunks para não perder o início do campo
+const SEARCH_TAIL = 32;
+// Limite do JSON "envelope" (demais campos da resposta) guardado em memória
+const MAX_ENVELOPE_LENGTH = 64 * 1024;
+const MAX_DATA_URI_HEADER = 256;
+
+/**
+ * Decodifica em streaming o campo `"base64"` (ou `"data"`) de uma resposta JSON da Evolution
+ * (`/chat/getBase64FromMediaMessage`), emitindo apenas os bytes da mídia.
+ *
+ * O valor base64 nunca é montado inteiro em memória; os demais campos da
+ * resposta ficam disponíveis em `getEnvelope()` (com `base64` vazio), e o
+ * mimetype de um data URI (`data:image/png;base64,...`) em `mimeTypeFromData`.
+ */
+export class Base64FieldExtractor extends Transform {
+  mimeTypeFromData: string | null = null;
+  found = false;
+
+  private state: 'search' | 'value' | 'done' = 'search';
+  private searchTail = '';
+  private residue = '';
+  private escapeCarry = '';
+  private dataUriChecked = false;
+  private envelope = '';
+
+  _transform(chunk: Buffer, _encoding: BufferEncoding, callback: TransformCallback) {
+    try {
+      // latin1 mapeia byte a byte, evitando quebrar caracteres UTF-8 entre chunks
+      this.consume(chunk.toString('latin1'));
+      callback();
+    } catch (error) {
+      callback(error as Error);
+    }
+  }
+
+  _flush(callback: TransformCallback) {
+    if (this.state === 'search') {
+      this.appendEnvelope(this.searchTail);
+      this.searchTail = '';
+    } else if (this.state === 'value') {
+      this.pushDecoded(true);
+    }
+    callback();
+  }
+
+  getEnvelope(): Record<string, any> | null {
+    try {
+      return JSON.parse(Buffer.from(this.envelope, 'latin1').toString('utf8'));
+    } catch {
+      return null;
+    }
+  }
+
+  private consume(text: string) {
+    if (this.state === 'search') {
+      const buffered = this.searchTail + text;
+      const match = FIELD_PATTERN.exec(buffered);
+
+      if (!match) {
+        const keepFrom = Math.max(0, buffered.length - SEARCH_TAIL);
+        this.appendEnvelope(buffered.slice(0, keepFrom));
+        this.searchTail = buffered.slice(keepFrom);
+        return;
+      }
+
+      const valueStart = match.index + match[0].length;
+      this.appendEnvelope(buffered.slice(0, valueStart));
+      this.searchTail = '';
+      this.state = 'value';
+      this.found = true;
+      text = buffered.slice(valueStart);
+    }
+
+    if (this.state === 'value') {
+      const end = text.indexOf('"');
+      this.appendValue(end === -1 ? text : text.slice(0, end));
+
+      if (end === -1) {
+        return;
+      }
+
+      this.pushDecoded(true);
+      this.state = 'done';
+      text = text.slice(end);
+    }
+
+    this.appendEnvelope(text);
+  }
+
+  private appendValue(raw: string) {
+    let value = this.escapeCarry + raw;
+    this.escapeCarry = '';
+
+    if (value.endsWith('\\')) {
+      this.escapeCarry = '\\';
+      value = value.slice(0, -1);
+    }
+
+    // Base64 em JSON só traz escapes como "\/" ou quebras "\n"
+    value = value.replace(/\\(.)/g, (_, char: string) => (char === '/' ? '/' : ''));
+    this.residue += value.replace(/\s+/g, '');
+
+    if (!this.dataUriChecked) {
+      if (this.residue.length < 5) {
+        return;
+      }
+      if (this.residue.startsWith('data:')) {
+        const comma = this.residue.indexOf(',');
+        if (comma === -1) {
+          if (this.residue.length > MAX_DATA_URI_HEADER) {
+            throw new Error('Cabeçalho data URI inválido na resposta Base64');
+          }
+          return;
+        }
+        const mime = this.residue.slice(5, comma).split(';')[0].toLowerCase();
+        this.mimeTypeFromData = mime || null;
+        this.residue = this.residue.slice(comma + 1);
+      }
+      this.dataUriChecked = true;
+    }
+
+    this.pushDecoded(false);
+  }
+
+  private pushDecoded(final: boolean) {
+    const usable = final
+      ? this.residue.length
+      : this.residue.length - (this.residue.length % 4);
+
+    if (usable > 0) {
+      this.push(Buffer.from(this.residue.slice(0, usable), 'base64'));
+      this.residue = this.residue.slice(usable);
+    }
+  }
+
+  private appendEnvelope(text: string) {
+    if (text && this.envelope.length < MAX_ENVELOPE_LENGTH) {
+      this.envelope += text.slice(0, MAX_ENVELOPE_LENGTH - this.envelope.length);
+    }
+  }
+}
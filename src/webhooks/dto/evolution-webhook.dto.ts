@@ -54,6 +54,7 @@ export interface EvolutionWebhookData {
   messageTimestamp?: number;
   pushName?: string;
   status?: string;
+  state?: string; // connection.update: open | connecting | close
   instanceId?: string;
   source?: string;
 }
@@ -13,13 +13,17 @@ import { WebhooksService } from './webhooks.service';
 import { MetaWebhookDto } from './dto/meta-webhook.dto';
 import { EvolutionWebhookDto } from './dto/evolution-webhook.dto';
 import { Public } from '../common/decorators/public.decorator';
+import { MetricsService } from '../metrics/metrics.service';
 
 @Controller('webhooks')
 @Public()
 export class WebhooksController {
   private readonly logger = new Logger(WebhooksController.name);
 
-  constructor(private readonly webhooksService: WebhooksService) {}
+  constructor(
+    private readonly webhooksService: WebhooksService,
+    private readonly metrics: MetricsService,
+  ) {}
 
   // Webhook da Meta (WhatsApp Business API)
   @Get('meta')
@@ -43,12 +47,19 @@ export class WebhooksController {
   @Post('meta')
   @HttpCode(HttpStatus.OK)
   async handleMetaWebhook(@Body() payload: MetaWebhookDto) {
-    this.logger.log('Webhook Meta recebido');
-    
+    this.logger.debug('Webhook Meta recebido');
+
+    const stopTimer = this.metrics.webhookDuration.startTimer({
+      provider: 'meta',
+      event: payload.object ?? 'unknown',
+    });
+
     try {
       await this.webhooksService.handleMetaWebhook(payload);
+      stopTimer({ outcome: 'success' });
       return { success: true };
     } catch (error) {
+      stopTimer({ outcome: 'error' });
       this.logger.error(`Erro ao processar webhook Meta: ${error.message}`);
       // Retornar 200 mesmo com erro para evitar retry excessivo da Meta
       return { success: false, error: error.message };
@@ -59,34 +70,30 @@ export class WebhooksController {
   @Post('evolution')
   @HttpCode(HttpStatus.OK)
   async handleEvolutionWebhook(@Body() payload: EvolutionWebhookDto) {
-    // Log completo do payload para debug
-    this.logger.log('Webhook Evolution recebido - Payload completo', {
+    // Resumo do payload só em debug; o payload completo pode trazer mídia em base64
+    this.logger.debug('Webhook Evolution recebido', () => ({
       event: payload.event,
       instance: payload.instance,
-      hasData: !!payload.data,
       remoteJid: payload.data?.key?.remoteJid,
       fromMe: payload.data?.key?.fromMe,
-      // Campos opcionais que podem conter informações úteis
       sender: payload.sender,
-      destination: payload.destination,
       date_time: payload.date_time,
-      server_url: payload.server_url,
-      // Todos os campos do data
       dataKeys: payload.data ? Object.keys(payload.data) : [],
-      pushName: payload.data?.pushName,
       messageType: payload.data?.messageType,
-      messageTimestamp: payload.data?.messageTimestamp,
-      instanceId: payload.data?.instanceId,
-      source: payload.data?.source,
       status: payload.data?.status,
-      // Log completo do payload (serializado para evitar problemas de referência circular)
-      fullPayload: JSON.stringify(payload, null, 2),
+    }));
+
+    const stopTimer = this.metrics.webhookDuration.startTimer({
+      provider: 'evolution',
+      event: payload.event ?? 'unknown',
     });
-    
+
     try {
       await this.webhooksService.handleEvolutionWebhook(payload);
+      stopTimer({ outcome: 'success' });
       return { success: true };
     } catch (error) {
+      stopTimer({ outcome: 'error' });
       this.logger.error(`Erro ao processar webhook Evolution: ${error.message}`, error.stack);
       return { success: false, error: error.message };
     }
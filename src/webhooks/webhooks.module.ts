@@ -4,9 +4,15 @@ import { WebhooksController } from './webhooks.controller';
 import { MessagesModule } from '../messages/messages.module';
 import { ConversationsModule } from '../conversations/conversations.module';
 import { WebsocketsModule } from '../websockets/websockets.module';
+import { ServiceInstancesModule } from '../service-instances/service-instances.module';
 
 @Module({
-  imports: [MessagesModule, ConversationsModule, WebsocketsModule],
+  imports: [
+    MessagesModule,
+    ConversationsModule,
+    WebsocketsModule,
+    ServiceInstancesModule,
+  ],
   controllers: [WebhooksController],
   providers: [WebhooksService],
   exports: [WebhooksService],
@@ -4,19 +4,37 @@ import {
   Logger,
   NotFoundException,
 } from '@nestjs/common';
-import axios from 'axios';
-import { ChatStatus, MessageDirection } from '@prisma/client';
+import { ChatStatus, Contact, Conversation, MessageDirection } from '@prisma/client';
+import * as path from 'path';
+import { Readable } from 'stream';
 
 import { PrismaService } from '../prisma/prisma.service';
+import { ProviderHttpService } from '../provider-http/provider-http.service';
 import { MessagesService } from '../messages/messages.service';
-import { ConversationsService } from '../conversations/conversations.service';
-import { ChatGateway } from '../websockets/chat.gateway';
-import { StorageService } from '../storage/storage.service';
+import { MessageStatusBufferService } from '../messages/message-status-buffer.service';
+import { ChatGateway, ConversationSummary } from '../websockets/chat.gateway';
+import { MediaStoreService, StoredMedia } from '../storage/media-store.service';
+import { InstanceHealthService } from '../service-instances/instance-health.service';
+import { OperatorAssignmentService } from '../assignment/operator-assignment.service';
+import { CATALOG, CatalogCacheService } from '../cache/catalog-cache.service';
 import { MetaWebhookDto } from './dto/meta-webhook.dto';
 import { EvolutionWebhookDto } from './dto/evolution-webhook.dto';
+import { Base64FieldExtractor } from './base64-field-extractor';
 
 type EvolutionSupportedMediaType = 'IMAGE' | 'AUDIO' | 'DOCUMENT';
 
+const MEDIA_EXTENSIONS: Record<string, string> = {
+  'image/jpeg': '.jpg',
+  'image/png': '.png',
+  'image/webp': '.webp',
+  'image/gif': '.gif',
+  'audio/ogg': '.ogg',
+  'audio/mpeg': '.mp3',
+  'audio/mp4': '.m4a',
+  'audio/wav': '.wav',
+  'application/pdf': '.pdf',
+};
+
 interface EvolutionMediaPayload {
   type: EvolutionSupportedMediaType;
   url: string | null;
@@ -33,14 +51,16 @@ export class WebhooksService {
   constructor(
     private readonly prisma: PrismaService,
     private readonly messagesService: MessagesService,
-    private readonly conversationsService: ConversationsService,
+    private readonly messageStatusBuffer: MessageStatusBufferService,
     private readonly chatGateway: ChatGateway,
-    private readonly storageService: StorageService,
+    private readonly mediaStore: MediaStoreService,
+    private readonly providerHttp: ProviderHttpService,
+    private readonly instanceHealth: InstanceHealthService,
+    private readonly assignment: OperatorAssignmentService,
+    private readonly catalogCache: CatalogCacheService,
   ) {}
 
   async handleMetaWebhook(payload: MetaWebhookDto): Promise<void> {
-    this.logger.log('Webhook Meta recebido');
-
     for (const entry of payload.entry) {
       for (const change of entry.changes) {
         if (change.value.messages && change.value.messages.length > 0) {
@@ -55,10 +75,7 @@ export class WebhooksService {
   }
 
   async handleEvolutionWebhook(payload: EvolutionWebhookDto): Promise<void> {
-    this.logger.log(`Webhook Evolution recebido: ${payload.event}`, {
-      instance: payload.instance,
-      hasData: !!payload.data,
-    });
+    this.logger.debug(`Webhook Evolution recebido: ${payload.event}`, { instance: payload.instance });
 
     switch (payload.event) {
       case 'messages.upsert':
@@ -67,6 +84,9 @@ export class WebhooksService {
       case 'messages.update':
         await this.processEvolutionMessageUpdate(payload);
         break;
+      case 'connection.update':
+        await this.processEvolutionConnectionUpdate(payload);
+        break;
       default:
         this.logger.debug(`Evento Evolution não tratado: ${payload.event}`);
     }
@@ -125,31 +145,26 @@ export class WebhooksService {
 
       let isNewConversation = false;
       if (!conversation) {
-        // Buscar operador online há mais tempo sem receber conversa
-        const availableOperator = await this.findAvailableOperator();
-
-        conversation = await this.prisma.conversation.create({
-          data: {
-            contactId: contact.id,
-            serviceInstanceId: serviceInstance.id,
-            operatorId: availableOperator?.id,
-            status: ChatStatus.OPEN,
-          },
-        });
+        // Próximo operador da fila (pop atômico, já contabiliza a conversa)
+        conversation = await this.createAssignedConversation(
+          contact.id,
+          serviceInstance.id,
+        );
+        const operatorId = conversation.operatorId;
 
         isNewConversation = true;
 
         // Atualizar timestamp do operador
-        if (availableOperator) {
+        if (operatorId) {
           await this.prisma.user.update({
-            where: { id: availableOperator.id },
+            where: { id: operatorId },
             data: {
               lastConversationAssignedAt: new Date(),
             },
           });
 
           this.logger.log(
-            `Conversa atribuída automaticamente ao operador: ${availableOperator.name}`,
+            `Conversa atribuída automaticamente ao operador: ${operatorId}`,
           );
         } else {
           this.logger.warn('Nenhum operador online disponível. Conversa entrará na fila.');
@@ -166,61 +181,40 @@ export class WebhooksService {
       // Notificar via WebSocket
       this.chatGateway.emitNewMessage(conversation.id, newMessage);
 
-      // Se for uma nova conversa, notificar o frontend com os dados completos
+      // Se for uma nova conversa, notificar operador atribuído e supervisão
       if (isNewConversation) {
-        const fullConversation = await this.conversationsService.findOne(conversation.id);
-        this.chatGateway.emitNewConversation(fullConversation);
+        this.chatGateway.emitNewConversation(
+          this.toConversationSummary(conversation, contact, serviceInstance, newMessage.createdAt),
+        );
         this.logger.log(`Nova conversa criada e notificada: ${conversation.id}`, {
-          serviceInstanceId: fullConversation.serviceInstanceId,
-          serviceInstanceName: fullConversation.serviceInstanceName,
+          serviceInstanceId: serviceInstance.id,
         });
       }
 
-      this.logger.log(`Mensagem Meta processada: ${message.id}`);
+      this.logger.debug(`Mensagem Meta processada: ${message.id}`);
     }
   }
 
   private async processMetaStatuses(statuses: any[]): Promise<void> {
+    // Recibos são agrupados e aplicados em lote pelo MessageStatusBufferService
     for (const status of statuses) {
-      const message = await this.prisma.message.findFirst({
-        where: { externalId: status.id },
-      });
-
-      if (message) {
-        await this.messagesService.updateStatus(message.id, status.status);
-        this.logger.log(
-          `Status atualizado: ${status.id} -> ${status.status}`,
-        );
-      }
+      this.messageStatusBuffer.enqueue(status.id, status.status);
     }
   }
 
   private async processEvolutionMessage(payload: EvolutionWebhookDto): Promise<void> {
     const { instance, data } = payload;
 
-    // Log completo de todos os campos disponíveis
-    this.logger.log(`Processando mensagem Evolution - Todos os campos disponíveis`, {
+    this.logger.debug('Processando mensagem Evolution', () => ({
       instance,
       fromMe: data.key?.fromMe,
       remoteJid: data.key?.remoteJid,
-      hasMessage: !!data.message,
       messageType: data.messageType,
       messageKeys: data.message ? Object.keys(data.message) : [],
-      // Campos do payload raiz que podem conter informações
-      sender: payload.sender,
-      destination: payload.destination,
-      date_time: payload.date_time,
-      // Campos do data que podem conter informações
       pushName: data.pushName,
       messageTimestamp: data.messageTimestamp,
-      instanceId: data.instanceId,
-      source: data.source,
       status: data.status,
-      // Verificar se há outros campos no key
-      keyKeys: data.key ? Object.keys(data.key) : [],
-      // Log completo do data para ver todos os campos
-      dataFull: JSON.stringify(data, null, 2),
-    });
+    }));
 
     if (data.key?.fromMe) {
       // Mensagem enviada pelo sistema, ignorar
@@ -285,10 +279,8 @@ export class WebhooksService {
       });
     }
     
-    this.logger.log(`Telefone normalizado: ${contactPhone}`, {
+    this.logger.debug(`Telefone normalizado: ${contactPhone}`, {
       original: data.key?.remoteJid,
-      rawPhone,
-      normalized: contactPhone,
       suffix: remoteJidSuffix,
       instance,
     });
@@ -296,16 +288,11 @@ export class WebhooksService {
     const mediaPayload = this.extractEvolutionMediaPayload(data, serviceInstance);
     const messageText = this.extractEvolutionMessageText(data);
 
-    this.logger.log(
-      `Conteúdo extraído da mensagem: ${
-        messageText ? `"${messageText.substring(0, 50)}"` : mediaPayload ? '[MÍDIA]' : 'NENHUM'
-      }`,
-      {
-        hasMessage: !!data.message,
-        messageKeys: data.message ? Object.keys(data.message) : [],
-        mediaType: mediaPayload?.type ?? null,
-      },
-    );
+    this.logger.debug('Conteúdo extraído da mensagem', () => ({
+      preview: messageText ? messageText.substring(0, 50) : mediaPayload ? '[MÍDIA]' : 'NENHUM',
+      messageKeys: data.message ? Object.keys(data.message) : [],
+      mediaType: mediaPayload?.type ?? null,
+    }));
 
     // Buscar ou criar contato
     let contact = await this.prisma.contact.findUnique({
@@ -340,11 +327,7 @@ export class WebhooksService {
         throw error;
       }
     } else {
-      this.logger.log(`📋 Contato já existe: ${contact.id}`, {
-        contactId: contact.id,
-        phone: contact.phone,
-        name: contact.name,
-      });
+      this.logger.debug(`📋 Contato já existe: ${contact.id}`);
       // Se o contato existe mas o nome mudou, atualizar
       if (data.pushName && data.pushName !== contact.name) {
         this.logger.log(`Atualizando nome do contato: ${contactPhone}`, {
@@ -369,31 +352,26 @@ export class WebhooksService {
 
       let isNewConversation = false;
       if (!conversation) {
-        // Buscar operador online há mais tempo sem receber conversa
-        const availableOperator = await this.findAvailableOperator();
-
-        conversation = await this.prisma.conversation.create({
-          data: {
-            contactId: contact.id,
-            serviceInstanceId: serviceInstance.id,
-            operatorId: availableOperator?.id,
-            status: ChatStatus.OPEN,
-          },
-        });
+        // Próximo operador da fila (pop atômico, já contabiliza a conversa)
+        conversation = await this.createAssignedConversation(
+          contact.id,
+          serviceInstance.id,
+        );
+        const operatorId = conversation.operatorId;
 
         isNewConversation = true;
 
         // Atualizar timestamp do operador
-        if (availableOperator) {
+        if (operatorId) {
           await this.prisma.user.update({
-            where: { id: availableOperator.id },
+            where: { id: operatorId },
             data: {
               lastConversationAssignedAt: new Date(),
             },
           });
 
           this.logger.log(
-            `Conversa Evolution atribuída automaticamente ao operador: ${availableOperator.name}`,
+            `Conversa Evolution atribuída automaticamente ao operador: ${operatorId}`,
           );
         } else {
           this.logger.warn('Nenhum operador online disponível. Conversa entrará na fila.');
@@ -424,7 +402,6 @@ export class WebhooksService {
       storedMediaMetadata = await this.persistEvolutionMedia(
         mediaPayload,
         serviceInstance,
-        conversation.id,
         data.key?.id,
       );
     }
@@ -444,24 +421,19 @@ export class WebhooksService {
     });
 
     // Notificar via WebSocket
-    this.logger.log(`Emitindo mensagem via WebSocket`, {
-      conversationId: conversation.id,
-      messageId: newMessage.id,
-      content: (messageText ?? mediaPayload?.caption ?? '[conteúdo indisponível]').substring(0, 50),
-    });
     this.chatGateway.emitNewMessage(conversation.id, newMessage);
 
-    // Se for uma nova conversa, notificar o frontend com os dados completos
+    // Se for uma nova conversa, notificar operador atribuído e supervisão
     if (isNewConversation) {
-      const fullConversation = await this.conversationsService.findOne(conversation.id);
-      this.chatGateway.emitNewConversation(fullConversation);
+      this.chatGateway.emitNewConversation(
+        this.toConversationSummary(conversation, contact, serviceInstance, newMessage.createdAt),
+      );
       this.logger.log(`Nova conversa Evolution criada e notificada: ${conversation.id}`, {
-        serviceInstanceId: fullConversation.serviceInstanceId,
-        serviceInstanceName: fullConversation.serviceInstanceName,
+        serviceInstanceId: serviceInstance.id,
       });
     }
 
-    this.logger.log(`Mensagem Evolution processada com sucesso: ${data.key?.id}`);
+    this.logger.debug(`Mensagem Evolution processada com sucesso: ${data.key?.id}`);
   }
 
   private async processEvolutionMessageUpdate(
@@ -473,23 +445,25 @@ export class WebhooksService {
       return;
     }
 
-    const message = await this.prisma.message.findFirst({
-      where: { externalId: data.key.id },
-    });
+    this.messageStatusBuffer.enqueue(data.key.id, data.status);
+  }
+
+  private async processEvolutionConnectionUpdate(
+    payload: EvolutionWebhookDto,
+  ): Promise<void> {
+    const serviceInstance = await this.findServiceInstanceByEvolutionName(
+      payload.instance,
+    );
 
-    if (message) {
-      await this.messagesService.updateStatus(message.id, data.status);
-      this.logger.log(`Status Evolution atualizado: ${data.key.id} -> ${data.status}`);
+    if (!serviceInstance) {
+      return;
     }
+
+    this.instanceHealth.recordState(serviceInstance.id, payload.data?.state, 'webhook');
   }
 
   private async findServiceInstanceByPhoneId(phoneId: string) {
-    const instances = await this.prisma.serviceInstance.findMany({
-      where: {
-        provider: 'OFFICIAL_META',
-        isActive: true,
-      },
-    });
+    const instances = await this.findActiveInstances('OFFICIAL_META');
 
     return instances.find((instance) => {
       const credentials = instance.credentials as any;
@@ -498,12 +472,7 @@ export class WebhooksService {
   }
 
   private async findServiceInstanceByEvolutionName(instanceName: string) {
-    const instances = await this.prisma.serviceInstance.findMany({
-      where: {
-        provider: 'EVOLUTION_API',
-        isActive: true,
-      },
-    });
+    const instances = await this.findActiveInstances('EVOLUTION_API');
 
     return instances.find((instance) => {
       const credentials = instance.credentials as any;
@@ -511,6 +480,21 @@ export class WebhooksService {
     });
   }
 
+  // Instâncias ativas por provedor, em cache: todo webhook resolve a instância por aqui
+  private findActiveInstances(provider: 'OFFICIAL_META' | 'EVOLUTION_API') {
+    return this.catalogCache.getOrLoad(
+      CATALOG.serviceInstances,
+      `active:${provider}`,
+      () =>
+        this.prisma.serviceInstance.findMany({
+          where: {
+            provider,
+            isActive: true,
+          },
+        }),
+    );
+  }
+
   private extractMetaMessageText(message: any): string | null {
     if (message.type === 'text' && message.text?.body) {
       return message.text.body;
@@ -611,79 +595,69 @@ export class WebhooksService {
   private async persistEvolutionMedia(
     mediaPayload: EvolutionMediaPayload,
     serviceInstance: any,
-    conversationId: string,
     messageId?: string,
   ): Promise<{ storagePath: string; size: number } | null> {
     const credentials = (serviceInstance.credentials as Record<string, any>) || {};
 
     try {
-      let buffer: Buffer | null = null;
-      let contentType: string | null = null;
-
-      const urlResult = await this.downloadMediaFromUrl(mediaPayload, credentials);
-      if (urlResult) {
-        buffer = urlResult.buffer;
-        contentType = urlResult.contentType;
-
-        if (
-          !this.isValidMediaContent(
-            mediaPayload.type,
-            contentType ?? mediaPayload.mimeType ?? '',
-            buffer,
-          )
-        ) {
-          this.logger.warn('Mídia recebida via URL inválida, tentando Base64', {
-            requestedType: mediaPayload.type,
-            contentType,
-          });
-          buffer = null;
-          contentType = null;
-        }
+      let stored = await this.downloadMediaFromUrl(
+        mediaPayload,
+        credentials,
+        serviceInstance.id,
+      );
+
+      if (
+        stored &&
+        !this.isValidMediaContent(
+          mediaPayload.type,
+          stored.contentType ?? mediaPayload.mimeType ?? '',
+          stored.media.head,
+        )
+      ) {
+        this.logger.warn('Mídia recebida via URL inválida, tentando Base64', {
+          requestedType: mediaPayload.type,
+          contentType: stored.contentType,
+        });
+        await this.mediaStore.release([stored.media.storagePath]);
+        stored = null;
       }
 
-      if (!buffer && messageId) {
-        const base64Result = await this.downloadMediaFromBase64(
+      if (!stored && messageId) {
+        stored = await this.downloadMediaFromBase64(
           mediaPayload,
           credentials,
           messageId,
+          serviceInstance.id,
         );
-        if (base64Result) {
-          buffer = base64Result.buffer;
-          contentType = base64Result.contentType;
-        }
       }
 
-      if (!buffer) {
+      if (!stored) {
         throw new BadRequestException('Falha ao baixar mídia da Evolution');
       }
 
       if (
         !this.isValidMediaContent(
           mediaPayload.type,
-          contentType ?? mediaPayload.mimeType ?? '',
-          buffer,
+          stored.contentType ?? mediaPayload.mimeType ?? '',
+          stored.media.head,
         )
       ) {
-        const preview = buffer.toString('utf8', 0, 200);
         this.logger.error('Conteúdo inválido ao baixar mídia da Evolution', {
           requestedType: mediaPayload.type,
-          contentType,
-          preview,
+          contentType: stored.contentType,
+          preview: stored.media.head.toString('utf8'),
         });
+        await this.mediaStore.release([stored.media.storagePath]);
         throw new BadRequestException('Falha ao baixar mídia da Evolution (tipo inválido)');
       }
 
-      const savedFile = await this.storageService.saveFile({
-        buffer,
-        originalName:
-          mediaPayload.fileName ??
-          `${mediaPayload.type?.toLowerCase() ?? 'media'}-${conversationId}`,
-        subdirectory: `messages/${conversationId}`,
-      });
+      if (stored.media.deduplicated) {
+        this.logger.debug(`Mídia já armazenada reutilizada: ${stored.media.storagePath}`);
+      }
 
       return {
-        storagePath: savedFile.relativeToBasePath,
-        size: savedFile.size,
+        storagePath: stored.media.storagePath,
+        size: stored.media.size,
       };
     } catch (error: any) {
       this.logger.error('Erro ao baixar/salvar mídia localmente', {
@@ -697,25 +671,39 @@ export class WebhooksService {
   private async downloadMediaFromUrl(
     mediaPayload: EvolutionMediaPayload,
     credentials: Record<string, any>,
-  ): Promise<{ buffer: Buffer; contentType: string | null } | null> {
+    serviceInstanceId: string,
+  ): Promise<{ media: StoredMedia; contentType: string | null } | null> {
     if (!mediaPayload.url) {
       return null;
     }
 
     try {
-      const response = await axios.get(mediaPayload.url, {
-        responseType: 'arraybuffer',
+      const response = await this.providerHttp.get<Readable>(mediaPayload.url, {
+        responseType: 'stream',
         headers: credentials.apiToken ? { apikey: credentials.apiToken } : undefined,
         validateStatus: (status) => status >= 200 && status < 300,
+        breakerKey: serviceInstanceId,
       });
 
       const contentType =
         (response.headers['content-type'] as string | undefined)?.toLowerCase() ?? null;
 
-      return {
-        buffer: Buffer.from(response.data),
-        contentType,
-      };
+      // Páginas de erro não são gravadas em disco
+      if (contentType?.includes('text/html') || contentType?.includes('application/json')) {
+        response.data.destroy();
+        this.logger.warn('URL da Evolution não retornou mídia', {
+          contentType,
+          mediaType: mediaPayload.type,
+        });
+        return null;
+      }
+
+      const media = await this.mediaStore.storeStream(response.data, {
+        extension: this.resolveMediaExtension(mediaPayload, contentType),
+        mimeType: contentType ?? mediaPayload.mimeType,
+      });
+
+      return { media, contentType };
     } catch (error: any) {
       this.logger.warn('Falha ao baixar mídia via URL da Evolution', {
         error: error.message,
@@ -729,7 +717,8 @@ export class WebhooksService {
     mediaPayload: EvolutionMediaPayload,
     credentials: Record<string, any>,
     messageId: string,
-  ): Promise<{ buffer: Buffer; contentType: string | null } | null> {
+    serviceInstanceId: string,
+  ): Promise<{ media: StoredMedia; contentType: string | null } | null> {
     const { serverUrl, apiToken, instanceName } = credentials;
     if (!serverUrl || !apiToken || !instanceName) {
       this.logger.warn(
@@ -742,7 +731,8 @@ export class WebhooksService {
     const endpoint = `${serverUrl.replace(/\/$/, '')}/chat/getBase64FromMediaMessage/${instanceName}`;
 
     try {
-      const response = await axios.post(
+      // Consulta sem efeito colateral: pode ser repetida com segurança
+      const response = await this.providerHttp.post<Readable>(
         endpoint,
         {
           message: {
@@ -756,33 +746,43 @@ export class WebhooksService {
             apikey: apiToken,
             'Content-Type': 'application/json',
           },
+          responseType: 'stream',
           timeout: 20000,
+          retry: true,
+          breakerKey: serviceInstanceId,
         },
       );
 
-      const base64Payload =
-        response.data?.base64 || response.data?.data || response.data?.result?.base64;
-      const contentType =
-        response.data?.mimetype ||
-        response.data?.mimeType ||
-        response.data?.type ||
-        mediaPayload.mimeType ||
-        null;
-
-      if (!base64Payload || typeof base64Payload !== 'string') {
-        this.logger.error('Resposta Base64 da Evolution sem campo base64', {
-          status: response.status,
-          dataKeys: Object.keys(response.data || {}),
+      // O JSON de resposta é decodificado durante a gravação, sem montar o base64 em memória
+      const extractor = new Base64FieldExtractor();
+      let media: StoredMedia;
+      try {
+        media = await this.mediaStore.storeStream(response.data, {
+          extension: this.resolveMediaExtension(mediaPayload, mediaPayload.mimeType),
+          mimeType: mediaPayload.mimeType,
+          transforms: [extractor],
         });
-        return null;
+      } catch (error) {
+        if (!extractor.found) {
+          this.logger.error('Resposta Base64 da Evolution sem campo base64', {
+            status: response.status,
+            dataKeys: Object.keys(extractor.getEnvelope() || {}),
+          });
+          return null;
+        }
+        throw error;
       }
 
-      const { buffer, mimeTypeFromData } = this.decodeBase64Payload(base64Payload);
+      const envelope = extractor.getEnvelope();
+      const contentType =
+        extractor.mimeTypeFromData ||
+        envelope?.mimetype ||
+        envelope?.mimeType ||
+        envelope?.type ||
+        mediaPayload.mimeType ||
+        null;
 
-      return {
-        buffer,
-        contentType: mimeTypeFromData || contentType,
-      };
+      return { media, contentType };
     } catch (error: any) {
       this.logger.error('Erro ao obter mídia em Base64 da Evolution', {
         error: error.message,
@@ -792,23 +792,17 @@ export class WebhooksService {
     }
   }
 
-  private decodeBase64Payload(base64Payload: string): {
-    buffer: Buffer;
-    mimeTypeFromData: string | null;
-  } {
-    const match = /^data:(?<mime>[^;]+);base64,(?<data>.+)$/i.exec(base64Payload);
-
-    if (match?.groups?.mime && match.groups.data) {
-      return {
-        buffer: Buffer.from(match.groups.data, 'base64'),
-        mimeTypeFromData: match.groups.mime.toLowerCase(),
-      };
+  private resolveMediaExtension(
+    mediaPayload: EvolutionMediaPayload,
+    contentType: string | null,
+  ): string {
+    const fromName = mediaPayload.fileName ? path.extname(mediaPayload.fileName) : '';
+    if (fromName) {
+      return fromName;
     }
 
-    return {
-      buffer: Buffer.from(base64Payload, 'base64'),
-      mimeTypeFromData: null,
-    };
+    const mime = (contentType ?? '').split(';')[0].trim();
+    return MEDIA_EXTENSIONS[mime] ?? '';
   }
 
   private isValidMediaContent(
@@ -929,6 +923,50 @@ export class WebhooksService {
     return Math.floor(numericValue);
   }
 
+  /**
+   * Cria uma conversa aberta já com o próximo operador da fila. O claim
+   * contabiliza a conversa antes do INSERT, então a vaga é devolvida se a
+   * criação falhar.
+   */
+  private async createAssignedConversation(contactId: string, serviceInstanceId: string) {
+    const operatorId = await this.assignment.claimOperator();
+
+    try {
+      return await this.prisma.conversation.create({
+        data: {
+          contactId,
+          serviceInstanceId,
+          operatorId,
+          status: ChatStatus.OPEN,
+        },
+      });
+    } catch (error) {
+      await this.assignment.releaseAssignment(operatorId);
+      throw error;
+    }
+  }
+
+  // Monta o evento de nova conversa com o que o webhook já carregou, sem reconsultar
+  private toConversationSummary(
+    conversation: Conversation,
+    contact: Contact,
+    serviceInstance: { id: string; name: string },
+    lastMessageAt: Date,
+  ): ConversationSummary {
+    return {
+      id: conversation.id,
+      contactId: contact.id,
+      contactName: contact.name,
+      contactPhone: contact.phone,
+      serviceInstanceId: serviceInstance.id,
+      serviceInstanceName: serviceInstance.name,
+      operatorId: conversation.operatorId,
+      status: conversation.status,
+      startTime: conversation.startTime,
+      lastMessageAt,
+    };
+  }
+
   private normalizePhone(phone: string): string {
     if (!phone) {
       return '';
@@ -947,24 +985,5 @@ export class WebhooksService {
     
     return cleaned;
   }
-
-  private async findAvailableOperator() {
-    // Busca operadores online, ordenados por:
-    // 1. Que nunca receberam conversa (lastConversationAssignedAt = null)
-    // 2. Que receberam conversa há mais tempo (mais antigo primeiro)
-    const operators = await this.prisma.user.findMany({
-      where: {
-        isOnline: true,
-        isActive: true,
-        role: { in: ['OPERATOR', 'SUPERVISOR'] },
-      },
-      orderBy: [
-        { lastConversationAssignedAt: 'asc' }, // null vem primeiro (nunca recebeu)
-      ],
-      take: 1,
-    });
-
-    return operators[0] || null;
-  }
 }
 
@@ -8,12 +8,53 @@ import {
   MessageBody,
 } from '@nestjs/websockets';
 import { Server, Socket } from 'socket.io';
-import { Logger, UseGuards, Inject, forwardRef } from '@nestjs/common';
+import { Logger, UseGuards, Inject, forwardRef, OnModuleDestroy } from '@nestjs/common';
 import { JwtService } from '@nestjs/jwt';
 import { ConfigService } from '@nestjs/config';
 
 import { MessagesService } from '../messages/messages.service';
 import { ConversationsService } from '../conversations/conversations.service';
+import { OperatorAssignmentService } from '../assignment/operator-assignment.service';
+import { MetricsService } from '../metrics/metrics.service';
+import { dashboardScope } from '../dashboard/dashboard-events.service';
+import { ConversationResponseDto } from '../conversations/dto/conversation-response.dto';
+import { PresenceBuffer } from './presence-buffer';
+
+// Quem acompanha todas as conversas (fila, presença dos operadores)
+const SUPERVISION_ROOMS = ['role:ADMIN', 'role:SUPERVISOR'];
+
+/**
+ * Dados de conversa enviados em eventos de lista (`conversation:new` /
+ * `conversation:assigned`); o detalhe completo vem de `conversation:join` ou da API.
+ */
+export type ConversationSummary = Pick<
+  ConversationResponseDto,
+  | 'id'
+  | 'contactId'
+  | 'contactName'
+  | 'contactPhone'
+  | 'serviceInstanceId'
+  | 'serviceInstanceName'
+  | 'operatorId'
+  | 'status'
+  | 'startTime'
+  | 'lastMessageAt'
+>;
+
+function toConversationSummary(conversation: ConversationSummary): ConversationSummary {
+  return {
+    id: conversation.id,
+    contactId: conversation.contactId,
+    contactName: conversation.contactName,
+    contactPhone: conversation.contactPhone,
+    serviceInstanceId: conversation.serviceInstanceId,
+    serviceInstanceName: conversation.serviceInstanceName,
+    operatorId: conversation.operatorId,
+    status: conversation.status,
+    startTime: conversation.startTime,
+    lastMessageAt: conversation.lastMessageAt,
+  };
+}
 
 @WebSocketGateway({
   cors: {
@@ -22,12 +63,21 @@ import { ConversationsService } from '../conversations/conversations.service';
   },
   namespace: '/chat',
 })
-export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
+export class ChatGateway
+  implements OnGatewayConnection, OnGatewayDisconnect, OnModuleDestroy
+{
   @WebSocketServer()
   server: Server;
 
   private readonly logger = new Logger(ChatGateway.name);
   private connectedUsers: Map<string, string[]> = new Map(); // userId -> socketIds[]
+  private readonly presence = new PresenceBuffer();
+  private presenceTimer: NodeJS.Timeout | null = null;
+  private readonly presenceFlushMs: number;
+  private readonly legacyPresenceEvents: boolean;
+  private readonly typingTimeoutMs: number;
+  // `${socketId}:${conversationId}` -> expiração do "digitando"
+  private readonly typing = new Map<string, NodeJS.Timeout>();
 
   constructor(
     @Inject(forwardRef(() => MessagesService))
@@ -35,7 +85,27 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
     private readonly conversationsService: ConversationsService,
     private readonly jwtService: JwtService,
     private readonly configService: ConfigService,
-  ) {}
+    private readonly assignment: OperatorAssignmentService,
+    private readonly metrics: MetricsService,
+  ) {
+    this.presenceFlushMs =
+      this.configService.get<number>('websocket.presenceFlushMs') ?? 1000;
+    this.legacyPresenceEvents =
+      this.configService.get<boolean>('websocket.legacyPresenceEvents') ?? true;
+    this.typingTimeoutMs =
+      this.configService.get<number>('websocket.typingTimeoutMs') ?? 5000;
+  }
+
+  onModuleDestroy() {
+    if (this.presenceTimer) {
+      clearTimeout(this.presenceTimer);
+      this.presenceTimer = null;
+    }
+    for (const timer of this.typing.values()) {
+      clearTimeout(timer);
+    }
+    this.typing.clear();
+  }
 
   async handleConnection(client: Socket) {
     try {
@@ -56,15 +126,22 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
       client.data.email = payload.email;
       client.data.role = payload.role;
 
+      // Salas de roteamento: eventos do próprio usuário e do papel dele
+      client.join([`user:${userId}`, `role:${payload.role}`]);
+
       // Adicionar socket ao mapa de usuários conectados
       const sockets = this.connectedUsers.get(userId) || [];
       sockets.push(client.id);
       this.connectedUsers.set(userId, sockets);
+      void this.assignment.socketConnected(userId);
+      this.metrics.socketConnections.inc();
 
       this.logger.log(`Cliente conectado: ${client.id} (User: ${userId})`);
 
-      // Notificar outros que o usuário está online
-      this.server.emit('user:online', { userId, email: payload.email });
+      // Primeira conexão do usuário: entra no próximo lote de presença
+      if (sockets.length === 1) {
+        this.recordPresence(userId, true, payload.email);
+      }
     } catch (error) {
       if (error.name === 'TokenExpiredError') {
         this.logger.warn(`Token expirado ao conectar cliente: ${client.id}`);
@@ -84,13 +161,15 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
     const userId = client.data.userId;
 
     if (userId) {
+      this.clearTyping(client);
+      void this.assignment.socketDisconnected(userId);
+      this.metrics.socketConnections.dec();
       const sockets = this.connectedUsers.get(userId) || [];
       const filtered = sockets.filter((id) => id !== client.id);
 
       if (filtered.length === 0) {
         this.connectedUsers.delete(userId);
-        // Notificar que o usuário saiu
-        this.server.emit('user:offline', { userId });
+        this.recordPresence(userId, false);
       } else {
         this.connectedUsers.set(userId, filtered);
       }
@@ -161,17 +240,29 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
     }
   }
 
+  /**
+   * O cliente pode mandar `typing:start` a cada tecla: só a transição para
+   * "digitando" é repassada à sala, e o estado expira sozinho após
+   * `WS_TYPING_TIMEOUT_MS` sem novos sinais.
+   */
   @SubscribeMessage('typing:start')
   handleTypingStart(
     @ConnectedSocket() client: Socket,
     @MessageBody() data: { conversationId: string },
   ) {
-    const userId = client.data.userId;
-    const email = client.data.email;
+    const key = `${client.id}:${data.conversationId}`;
+    const active = this.typing.get(key);
 
-    client
-      .to(`conversation:${data.conversationId}`)
-      .emit('typing:user', { userId, email, isTyping: true });
+    if (active) {
+      clearTimeout(active);
+    } else {
+      this.emitTyping(client, data.conversationId, true);
+    }
+
+    this.typing.set(
+      key,
+      setTimeout(() => this.stopTyping(client, data.conversationId), this.typingTimeoutMs),
+    );
 
     return { success: true };
   }
@@ -181,17 +272,59 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
     @ConnectedSocket() client: Socket,
     @MessageBody() data: { conversationId: string },
   ) {
-    const userId = client.data.userId;
-    const email = client.data.email;
+    this.stopTyping(client, data.conversationId);
+    return { success: true };
+  }
 
-    client
-      .to(`conversation:${data.conversationId}`)
-      .emit('typing:user', { userId, email, isTyping: false });
+  // Admin/supervisor acompanhando um número específico
+  @SubscribeMessage('instance:subscribe')
+  handleInstanceSubscribe(
+    @ConnectedSocket() client: Socket,
+    @MessageBody() data: { serviceInstanceId: string },
+  ) {
+    if (client.data.role === 'OPERATOR') {
+      return { success: false, error: 'Operadores recebem apenas as próprias conversas' };
+    }
+    client.join(`instance:${data.serviceInstanceId}`);
+    return { success: true };
+  }
+
+  @SubscribeMessage('instance:unsubscribe')
+  handleInstanceUnsubscribe(
+    @ConnectedSocket() client: Socket,
+    @MessageBody() data: { serviceInstanceId: string },
+  ) {
+    client.leave(`instance:${data.serviceInstanceId}`);
+    return { success: true };
+  }
 
+  // O escopo vem do usuário autenticado: operador só recebe os próprios números
+  @SubscribeMessage('dashboard:subscribe')
+  handleDashboardSubscribe(@ConnectedSocket() client: Socket) {
+    const scope = dashboardScope(client.data.userId, client.data.role);
+    client.join(`dashboard:${scope}`);
+    return { success: true, scope };
+  }
+
+  @SubscribeMessage('dashboard:unsubscribe')
+  handleDashboardUnsubscribe(@ConnectedSocket() client: Socket) {
+    const scope = dashboardScope(client.data.userId, client.data.role);
+    client.leave(`dashboard:${scope}`);
     return { success: true };
   }
 
   // Métodos auxiliares para emitir eventos de fora do gateway
+  async hasDashboardSubscribers(scope: string): Promise<boolean> {
+    const sockets = await this.server.in(`dashboard:${scope}`).fetchSockets();
+    return sockets.length > 0;
+  }
+
+  emitDashboardUpdate(scope: string, snapshot: Record<string, unknown>) {
+    this.server
+      .to(`dashboard:${scope}`)
+      .emit('dashboard:updated', { scope, ...snapshot });
+  }
+
   emitNewMessage(conversationId: string, message: any) {
     this.server.to(`conversation:${conversationId}`).emit('message:new', message);
   }
@@ -208,13 +341,85 @@ export class ChatGateway implements OnGatewayConnection, OnGatewayDisconnect {
       .emit('conversation:closed', { conversationId });
   }
 
-  emitNewConversation(conversation: any) {
-    // Emitir para todos os clientes conectados (para atualizar lista de conversas)
-    this.server.emit('conversation:new', conversation);
-    // Também emitir para a sala específica da conversa
+  /**
+   * Nova conversa vai para o operador atribuído, supervisão e quem acompanha a
+   * instância; conversas na fila (sem operador) só para a supervisão.
+   */
+  emitNewConversation(conversation: ConversationSummary) {
     this.server
-      .to(`conversation:${conversation.id}`)
-      .emit('conversation:updated', conversation);
+      .to(this.conversationAudience(conversation))
+      .emit('conversation:new', toConversationSummary(conversation));
+  }
+
+  emitConversationAssigned(conversation: ConversationSummary) {
+    this.server.to(this.conversationAudience(conversation)).emit('conversation:assigned', {
+      conversationId: conversation.id,
+      operatorId: conversation.operatorId,
+      conversation: toConversationSummary(conversation),
+    });
+  }
+
+  private conversationAudience(conversation: ConversationSummary): string[] {
+    const rooms = [...SUPERVISION_ROOMS, `instance:${conversation.serviceInstanceId}`];
+    if (conversation.operatorId) {
+      rooms.push(`user:${conversation.operatorId}`);
+    }
+    return rooms;
+  }
+
+  private recordPresence(userId: string, online: boolean, email?: string) {
+    this.presence.record(userId, online, !online, email);
+
+    if (!this.presenceTimer) {
+      this.presenceTimer = setTimeout(() => this.flushPresence(), this.presenceFlushMs);
+    }
+  }
+
+  // Presença só interessa à supervisão; um frame por janela com todas as mudanças
+  private flushPresence() {
+    this.presenceTimer = null;
+    const batch = this.presence.drain();
+    if (!batch) {
+      return;
+    }
+
+    this.server.to(SUPERVISION_ROOMS).emit('presence:changed', batch);
+
+    // Obsoletos: mantidos para clientes que ainda não usam presence:changed
+    if (this.legacyPresenceEvents) {
+      for (const { userId, email } of batch.online) {
+        this.server.emit('user:online', { userId, email });
+      }
+      for (const userId of batch.offline) {
+        this.server.emit('user:offline', { userId });
+      }
+    }
+  }
+
+  private emitTyping(client: Socket, conversationId: string, isTyping: boolean) {
+    client
+      .to(`conversation:${conversationId}`)
+      .emit('typing:user', { userId: client.data.userId, email: client.data.email, isTyping });
+  }
+
+  private stopTyping(client: Socket, conversationId: string) {
+    const key = `${client.id}:${conversationId}`;
+    const active = this.typing.get(key);
+    if (!active) {
+      return;
+    }
+    clearTimeout(active);
+    this.typing.delete(key);
+    this.emitTyping(client, conversationId, false);
+  }
+
+  private clearTyping(client: Socket) {
+    const prefix = `${client.id}:`;
+    for (const key of Array.from(this.typing.keys())) {
+      if (key.startsWith(prefix)) {
+        this.stopTyping(client, key.slice(prefix.length));
+      }
+    }
   }
 
   private extractToken(client: Socket): string | null {
@@ -0,0 +1,26 @@
+import { PresenceBuffer } from './presence-buffer';
+
+describe('PresenceBuffer', () => {
+  it('deve enviar só o estado final de cada usuário', () => {
+    const buffer = new PresenceBuffer();
+    buffer.record('a', true, false, 'a@x.com');
+    buffer.record('b', false, true);
+
+    expect(buffer.drain()).toEqual({
+      online: [{ userId: 'a', email: 'a@x.com' }],
+      offline: ['b'],
+    });
+    expect(buffer.drain()).toBeNull();
+  });
+
+  it('deve descartar reconexões dentro da mesma janela', () => {
+    const buffer = new PresenceBuffer();
+    buffer.record('a', false, true);
+    buffer.record('a', true, false, 'a@x.com');
+    buffer.record('b', true, false);
+    buffer.record('b', false, true);
+
+    expect(buffer.drain()).toBeNull();
+    expect(buffer.size).toBe(0);
+  });
+});
@@ -0,0 +1,49 @@
+export type PresenceChange = { userId: string; email?: string };
+
+export type PresenceBatch = { online: PresenceChange[]; offline: string[] };
+
+type Pending = { email?: string; wasOnline: boolean; online: boolean };
+
+/**
+ * Agrupa mudanças de presença entre dois envios. Só o estado final de cada
+ * usuário sai no lote, e quem conectou e desconectou (ou o contrário) dentro
+ * da mesma janela não gera evento nenhum.
+ */
+export class PresenceBuffer {
+  private pending = new Map<string, Pending>();
+
+  /**
+   * @param wasOnline estado do usuário antes desta mudança
+   */
+  record(userId: string, online: boolean, wasOnline: boolean, email?: string): void {
+    const current = this.pending.get(userId);
+    if (current) {
+      current.online = online;
+      current.email = email ?? current.email;
+      return;
+    }
+    this.pending.set(userId, { email, wasOnline, online });
+  }
+
+  get size(): number {
+    return this.pending.size;
+  }
+
+  drain(): PresenceBatch | null {
+    const batch: PresenceBatch = { online: [], offline: [] };
+
+    for (const [userId, change] of this.pending) {
+      if (change.online === change.wasOnline) {
+        continue;
+      }
+      if (change.online) {
+        batch.online.push({ userId, email: change.email });
+      } else {
+        batch.offline.push(userId);
+      }
+    }
+    this.pending.clear();
+
+    return batch.online.length || batch.offline.length ? batch : null;
+  }
+}
@@ -37,11 +37,57 @@ template_id = None
 tabulation_id = None
 campaign_id = None
 
+# Breakdown do header Server-Timing da última requisição (requer PRISMA_PROFILING=true na API)
+last_timing = None
+# Acima deste número de consultas por requisição o endpoint é marcado como suspeito de N+1
+N_PLUS_ONE_QUERY_THRESHOLD = 10
+
+
+def parse_server_timing(response: requests.Response) -> Dict[str, Any]:
+    """Extrai db/ext/app do header Server-Timing e o tempo total visto pelo cliente"""
+    timing = {
+        "client_ms": round(response.elapsed.total_seconds() * 1000, 1),
+        "db_count": None,
+        "db_ms": None,
+        "ext_count": None,
+        "ext_ms": None,
+        "app_ms": None,
+    }
+
+    header = response.headers.get("Server-Timing")
+    if not header:
+        return timing
+
+    for metric in header.split(","):
+        parts = [part.strip() for part in metric.split(";")]
+        name = parts[0]
+        params = {}
+        for part in parts[1:]:
+            key, _, value = part.partition("=")
+            params[key] = value.strip('"')
+
+        duration = float(params["dur"]) if "dur" in params else None
+        count = None
+        if "=" in params.get("desc", ""):
+            count = int(params["desc"].split("=", 1)[1])
+
+        if name == "db":
+            timing["db_ms"], timing["db_count"] = duration, count
+        elif name == "ext":
+            timing["ext_ms"], timing["ext_count"] = duration, count
+        elif name == "app":
+            timing["app_ms"] = duration
+
+    return timing
+
 
 def log_test(name: str, method: str, path: str, status_code: int, 
              request_data: Optional[Dict] = None, response_data: Any = None,
              error: Optional[str] = None):
     """Registra resultado de um teste"""
+    global last_timing
+    timing, last_timing = last_timing, None
+
     result = {
         "name": name,
         "method": method,
@@ -50,6 +96,7 @@ def log_test(name: str, method: str, path: str, status_code: int,
         "request": request_data,
         "response": response_data,
         "error": error,
+        "timing": timing,
         "timestamp": datetime.now().isoformat()
     }
     results.append(result)
@@ -66,6 +113,7 @@ def log_test(name: str, method: str, path: str, status_code: int,
 def make_request(method: str, path: str, data: Optional[Dict] = None, 
                  files: Optional[Dict] = None, params: Optional[Dict] = None) -> requests.Response:
     """Faz uma requisição HTTP"""
+    global last_timing
     url = f"{BASE_URL}{path}"
     headers = {
         "Content-Type": "application/json"
@@ -93,6 +141,7 @@ def make_request(method: str, path: str, data: Optional[Dict] = None,
         else:
             raise ValueError(f"Método HTTP não suportado: {method}")
         
+        last_timing = parse_server_timing(response)
         return response
     except requests.exceptions.RequestException as e:
         print(f"   Erro de conexão: {str(e)}")
@@ -657,6 +706,42 @@ def test_webhooks():
                 request_data=evolution_data, response_data=response.text)
 
 
+def format_timing(timing: Dict[str, Any]) -> str:
+    """Resumo de uma linha do breakdown de tempo"""
+    if timing.get("db_count") is None:
+        return f"{timing['client_ms']}ms no cliente (sem Server-Timing)"
+    return (
+        f"{timing['client_ms']}ms no cliente, {timing['app_ms']}ms na API, "
+        f"banco {timing['db_ms']}ms em {timing['db_count']} consultas, "
+        f"HTTP externo {timing['ext_ms']}ms em {timing['ext_count']} chamadas"
+    )
+
+
+def generate_timing_section() -> str:
+    """Tabela de tempo por endpoint, marcando possíveis N+1"""
+    timed = [r for r in results if r.get("timing") and r["timing"].get("db_count") is not None]
+
+    section = """
+### Tempo por Endpoint (Server-Timing)
+
+"""
+    if not timed:
+        return section + "- Header `Server-Timing` ausente: habilite `PRISMA_PROFILING=true` na API.\n"
+
+    section += "| Endpoint | Status | Cliente (ms) | API (ms) | Consultas | Banco (ms) | Chamadas externas | Externo (ms) | |\n"
+    section += "|---|---|---|---|---|---|---|---|---|\n"
+    for result in sorted(timed, key=lambda r: r["timing"]["db_count"], reverse=True):
+        timing = result["timing"]
+        flag = "⚠️ possível N+1" if timing["db_count"] > N_PLUS_ONE_QUERY_THRESHOLD else ""
+        section += (
+            f"| `{result['method']} {result['path']}` | {result['status_code']} | "
+            f"{timing['client_ms']} | {timing['app_ms']} | {timing['db_count']} | {timing['db_ms']} | "
+            f"{timing['ext_count']} | {timing['ext_ms']} | {flag} |\n"
+        )
+
+    return section
+
+
 def generate_documentation():
     """Gera documentação com resultados reais"""
     doc = f"""# Documentação de Testes Reais da API - Elsehu Backend
@@ -709,6 +794,10 @@ Esta documentação contém os resultados **REAIS** dos testes de todos os endpo
 
 """
         
+        timing = result.get('timing')
+        if timing:
+            doc += f"**Tempo**: {format_timing(timing)}\n\n"
+        
         if result.get('request'):
             doc += f"""**Request Body**:
 ```json
@@ -760,6 +849,8 @@ Esta documentação contém os resultados **REAIS** dos testes de todos os endpo
     for category, count in sorted(status_counts.items()):
         doc += f"- **{category}**: {count} endpoints\n"
     
+    doc += generate_timing_section()
+    
     doc += """
 ---
 